@@ -3,12 +3,14 @@ import pandas as pd
 import base64
 import io
 from datetime import datetime
-import tempfile
+import time
 import os
-from fpdf import FPDF
-import matplotlib.pyplot as plt
-import seaborn as sns
+from instrumentation import serve_metrics
 from chatbot_agent import DataSummaryChatbot
+from chart_render import CHART_RENDERER
+from ingest import SHARD_READER
+from llm_client import ollama_status
+from backends import make_backend
 
 # --- Streamlit Page Config ---
 st.set_page_config(
@@ -46,15 +48,36 @@ st.markdown("""
 def setup_state():
     if 'chatbot' not in st.session_state:
         st.session_state.chatbot = DataSummaryChatbot()
+        if os.environ.get('INSIGHTBOT_BACKEND'):
+            st.session_state.chatbot.backend = make_backend(os.environ['INSIGHTBOT_BACKEND'])
     if 'data_loaded' not in st.session_state:
         st.session_state.data_loaded = False
     if 'current_chart' not in st.session_state:
         st.session_state.current_chart = None
+    if 'source_file' not in st.session_state:
+        st.session_state.source_file = None
+    if 'loaded_file' not in st.session_state:
+        st.session_state.loaded_file = None
+    if 'report_job' not in st.session_state:
+        st.session_state.report_job = None
+
+def drop_source_file():
+    # Background and streaming loads read the upload after load_data returns, so its temp file lives until replaced or reset
+    if st.session_state.source_file and os.path.exists(st.session_state.source_file):
+        st.session_state.chatbot.cancel_load(wait=True)
+        os.unlink(st.session_state.source_file)
+    st.session_state.source_file = None
 
 # --- Display EDA Results ---
-def show_eda(eda):
+def show_eda(eda, progress):
     st.subheader("Dataset Summary")
-    
+    if progress['pending'] and not progress['error']:
+        st.caption(f"Still computing: {', '.join(progress['pending'])}...")
+
+    if 'shape' not in eda:
+        st.info("Reading file...")
+        return
+
     col1, col2 = st.columns(2)
     
     with col1:
@@ -65,11 +88,14 @@ def show_eda(eda):
     with col2:
         for col in eda['columns']:
             dtype = eda['data_types'][col]
-            nulls = eda['null_counts'][col]
-            null_pct = eda['null_percentage'][col]
-            st.write(f"- **{col}** ({dtype}) → Nulls: {nulls} ({null_pct:.1f}%)")
+            if 'null_counts' in eda:
+                nulls = eda['null_counts'][col]
+                null_pct = eda['null_percentage'][col]
+                st.write(f"- **{col}** ({dtype}) → Nulls: {nulls} ({null_pct:.1f}%)")
+            else:
+                st.write(f"- **{col}** ({dtype})")
 
-    if sum(eda['null_counts'].values()) > 0:
+    if 'null_counts' in eda and sum(eda['null_counts'].values()) > 0:
         st.subheader("Nulls")
         df_null = pd.DataFrame({
             'Column': list(eda['null_counts'].keys()),
@@ -78,107 +104,183 @@ def show_eda(eda):
         })
         st.dataframe(df_null)
 
+    if 'memory' in eda:
+        memory = eda['memory']
+        st.caption(f"Memory: {memory['before_bytes'] / 1024 ** 2:.1f} MB → {memory['after_bytes'] / 1024 ** 2:.1f} MB "
+                   f"({len(memory['converted'])} columns compacted)")
+    if 'approximate' in eda:
+        sample = eda['approximate']
+        st.caption(f"Approximate mode: medians, percentiles and correlations come from a {sample['sample_rows']:,}-row "
+                   f"sample of {sample['rows']:,} rows. Ask for the exact value to compute it from every row.")
+
     st.subheader("Column Data Types")
     df_dtype = pd.DataFrame({
         'Column': list(eda['data_types'].keys()),
-        'Type': list(eda['data_types'].values())
+        'Type': [str(t) for t in eda['data_types'].values()]
     })
     st.dataframe(df_dtype)
 
+    if 'numeric_stats' in eda:
+        st.subheader("Numeric Summary")
+        table = pd.DataFrame(eda['numeric_stats']).T
+        estimated = eda.get('estimated_quantiles', [])
+        if estimated:
+            table = table.astype(object)
+            for col in estimated:
+                for stat in ['25%', '50%', '75%']:
+                    table.at[col, stat] = f"≈{table.at[col, stat]:.2f}"
+            st.caption("≈ quartiles were estimated while streaming; ask for an exact percentile to use every row.")
+        st.dataframe(table)
+
+# --- Live Refresh ---
+@st.fragment(run_every=2)
+def show_live_status():
+    # Merges what the watcher read and reruns the page only when rows arrived
+    chatbot = st.session_state.chatbot
+    if chatbot.watcher is None:
+        return
+    added = chatbot.refresh()
+    if chatbot.watcher.error:
+        st.error(f"Stopped following: {chatbot.watcher.error}")
+    st.caption(f"Following {chatbot.watcher.path}: {chatbot.watcher.rows_seen:,} new rows so far")
+    if added:
+        st.rerun()
+
+def show_live_refresh(chatbot, streaming_mode):
+    with st.expander("Live refresh"):
+        if chatbot.watcher is not None:
+            show_live_status()
+            if st.button("Stop following"):
+                chatbot.stop_watching()
+                st.rerun()
+            return
+        path = st.text_input("Local file or folder to follow",
+                             help="Rows appended to a CSV, TSV or JSON Lines file, or new files saved into a folder, "
+                                  "are merged into the loaded data as they arrive. With nothing loaded, a folder's "
+                                  "current files are loaded first as one dataset.")
+        if st.button("Follow") and path:
+            result = chatbot.watch(path, streaming_mode=streaming_mode)
+            if result['success']:
+                st.session_state.data_loaded = True
+                st.rerun()
+            st.error(result['message'])
+
 # --- PDF Report Generation ---
-def export_pdf(chatbot, filename="report.pdf"):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font('Arial', 'B', 16)
-    pdf.cell(0, 10, 'Data Summary Report', ln=True, align='C')
-    pdf.ln(10)
-
-    if chatbot.summary_stats:
-        stats = chatbot.summary_stats
-        pdf.set_font('Arial', '', 12)
-        pdf.cell(0, 10, f"Rows × Cols: {stats['shape'][0]} × {stats['shape'][1]}", ln=True)
-        pdf.cell(0, 10, f"Columns: {', '.join(stats['columns'])[:80]}...", ln=True)
-        pdf.cell(0, 10, f"Numerics: {len(stats['numeric_columns'])}", ln=True)
-        pdf.cell(0, 10, f"Categoricals: {len(stats['categorical_columns'])}", ln=True)
-
-    pdf.ln(10)
-    pdf.set_font('Arial', 'B', 14)
-    pdf.cell(0, 10, 'Conversation Log', ln=True)
-    pdf.set_font('Arial', '', 10)
-
-    for i, item in enumerate(chatbot.chat_history, 1):
-        pdf.set_font('Arial', 'B', 10)
-        pdf.cell(0, 8, f"Q{i}: {item['user']}", ln=True)
-        pdf.set_font('Arial', '', 10)
-        reply = item.get('assistant', '')
-        pdf.multi_cell(0, 6, f"A{i}: {reply[:500]}{'...' if len(reply) > 500 else ''}")
-
-        if 'chart' in item and item['chart']:
-            try:
-                chart_img = base64.b64decode(item['chart'])
-                temp_img = f"temp_chart_{i}.png"
-                with open(temp_img, "wb") as f:
-                    f.write(chart_img)
-                pdf.image(temp_img, w=120)
-                os.remove(temp_img)
-            except:
-                continue
-        pdf.ln(3)
-
-    pdf.output(filename)
-    return filename
+def show_debug_panel(chatbot):
+    with st.expander("Debug: turn timings"):
+        last = next((item for item in reversed(chatbot.chat_history) if 'timings' in item), None)
+        if last is None:
+            st.caption("No chat turns yet.")
+            return
+        timings = last['timings']
+        st.caption(f"Last turn: {timings['total_seconds'] * 1000:.1f} ms")
+        st.dataframe(pd.DataFrame({
+            'Stage': list(timings['stages']),
+            'ms': [v['seconds'] * 1000 for v in timings['stages'].values()],
+            'Memory Δ (MB)': [v['memory_bytes'] / 1024 ** 2 for v in timings['stages'].values()],
+        }), hide_index=True)
+
+        st.caption("All sessions, recent turns (ms)")
+        summary = chatbot.metrics.summary()
+        st.dataframe(pd.DataFrame({
+            'Stage': list(summary),
+            'Count': [v['count'] for v in summary.values()],
+            'p50': [v['p50'] * 1000 for v in summary.values()],
+            'p95': [v['p95'] * 1000 for v in summary.values()],
+            'p99': [v['p99'] * 1000 for v in summary.values()],
+        }), hide_index=True)
 
 # --- Main App Logic ---
 def main():
     setup_state()
+    # Streamlit's own entry point is guarded, so the app can draw charts and parse shards on worker processes
+    CHART_RENDERER.use_processes()
+    SHARD_READER.use_processes()
+    if os.environ.get('INSIGHTBOT_METRICS_PORT'):
+        serve_metrics(int(os.environ['INSIGHTBOT_METRICS_PORT']))
 
     st.markdown('<h1 class="main-header">InsightBot: Smart Data Chat</h1>', unsafe_allow_html=True)
 
     # --- Sidebar Upload ---
     with st.sidebar:
         st.header(" Upload Data")
-        file = st.file_uploader("Upload a CSV, TSV, XLSX or JSON file", type=['csv', 'tsv', 'xlsx', 'json'])
+        file = st.file_uploader("Upload a CSV, TSV, XLSX, JSON or Parquet file, or a zip of them",
+                                type=['csv', 'tsv', 'xlsx', 'json', 'jsonl', 'parquet', 'zip'])
+        streaming_mode = st.checkbox("Streaming mode (large files)",
+                                     help="Read the file in chunks instead of loading it into memory. CSV, TSV, JSON Lines and Parquet only.")
+        compact_memory = st.checkbox("Compact memory",
+                                     help="Store repeated text as categories and downcast numbers after loading.")
+        approximate = st.checkbox("Approximate answers",
+                                  help="For very large tables: answer medians, percentiles and the correlation heatmap "
+                                       "from a random sample, with a confidence interval.")
+        st.session_state.chatbot.compact_memory = compact_memory
+        st.session_state.chatbot.arrow_strings = compact_memory
+        st.session_state.chatbot.approximate = approximate
 
-        if file:
-            ext = file.name.split('.')[-1]
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f".{ext}") as temp:
-                temp.write(file.read())
-                path = temp.name
+        # Reruns keep the uploaded file, so only load again when it actually changes; following a file pauses uploads
+        if file and st.session_state.chatbot.watcher is None and (file.name, file.size, streaming_mode, compact_memory, approximate) != st.session_state.loaded_file:
+            drop_source_file()
+            load_result = st.session_state.chatbot.load_upload(file.getvalue(), file.name,
+                                                               streaming_mode=streaming_mode, background=True)
+            st.session_state.source_file = load_result.get('source_file')
+            st.session_state.loaded_file = (file.name, file.size, streaming_mode, compact_memory, approximate)
+            st.session_state.data_loaded = load_result['success']
 
-            load_result = st.session_state.chatbot.load_data(path)
-            os.unlink(path)
-
-            if load_result['success']:
-                st.session_state.data_loaded = True
-                st.success(load_result['message'])
-            else:
-                st.error(load_result['message'])
+        progress = st.session_state.chatbot.eda_progress()
+        if progress['error']:
+            st.error(progress['error'])
+        elif st.session_state.data_loaded and progress['done']:
+            st.success(f"Data loaded. Shape: {st.session_state.chatbot.summary_stats['shape']}")
+        elif st.session_state.data_loaded:
+            st.info("Loading data in the background...")
+        show_live_refresh(st.session_state.chatbot, streaming_mode)
 
         st.divider()
 
         st.header(" Ollama Status")
         if st.session_state.chatbot.ollama_available:
             st.success("LLM is running (gemma:2b)")
+        elif not ollama_status(st.session_state.chatbot.llm).checked:
+            st.info("Checking for Ollama...")
         else:
             st.warning("Ollama not detected. Using rule-based fallback.")
+        cache_stats = st.session_state.chatbot.response_cache.stats()
+        st.caption(f"Answer cache: {cache_stats['hits']} exact / {cache_stats['similar_hits']} similar hits, {cache_stats['misses']} misses")
+        shared = st.session_state.chatbot.datasets.stats()
+        st.caption(f"Shared datasets: {shared['datasets']} in memory ({shared['bytes'] / 1024 ** 2:.1f} MB), "
+                   f"{shared['leases']} sessions")
+        charts = st.session_state.chatbot.charts.stats()
+        st.caption(f"Chat charts: {charts['charts']} kept ({charts['bytes'] / 1024 ** 2:.1f} MB), "
+                   f"{charts['thumbnails']} thumbnails ({charts['thumbnail_bytes'] / 1024 ** 2:.1f} MB)")
+        show_debug_panel(st.session_state.chatbot)
 
         if st.session_state.data_loaded and st.session_state.chatbot.chat_history:
             if st.button(" Download PDF Summary"):
-                with st.spinner("Generating PDF..."):
-                    pdf_file = export_pdf(st.session_state.chatbot)
-                    with open(pdf_file, "rb") as f:
-                        st.download_button("Download Report", f, file_name=pdf_file, mime="application/pdf")
-                    os.unlink(pdf_file)
+                from report_pdf import start_report  # fpdf and PIL load on the first export
+                chatbot = st.session_state.chatbot
+                st.session_state.report_job = start_report(chatbot.summary_stats, chatbot.chat_history, chatbot.charts)
+
+        report_job = st.session_state.report_job
+        if report_job is not None:
+            if not report_job.done():
+                st.caption("Generating PDF...")
+            elif report_job.exception() is not None:
+                st.error(f"PDF export failed: {report_job.exception()}")
+            else:
+                st.download_button("Download Report", report_job.result(), file_name="report.pdf", mime="application/pdf")
 
         if st.button(" Reset Chat"):
             st.session_state.chatbot.reset()
+            drop_source_file()
+            st.session_state.loaded_file = None
             st.session_state.data_loaded = False
             st.session_state.current_chart = None
+            st.session_state.report_job = None
             st.rerun()
 
     # --- Main Area ---
-    if st.session_state.data_loaded:
-        show_eda(st.session_state.chatbot.summary_stats)
+    if st.session_state.data_loaded and not progress['error']:
+        show_eda(st.session_state.chatbot.summary_stats, progress)
         st.divider()
 
         st.subheader(" Ask About Your Data")
@@ -186,29 +288,48 @@ def main():
 
         if prompt:
             with st.spinner("Thinking..."):
-                reply = st.session_state.chatbot.process_user_input(prompt)
+                reply = st.session_state.chatbot.process_user_input(prompt, stream=True)
 
             if reply['success']:
-                if 'image_base64' in reply:
+                if 'stream' in reply:
+                    placeholder = st.empty()
+                    text = ''
+                    for token in reply['stream']:
+                        text += token
+                        placeholder.markdown(f'<div class="chat-message bot-message">{text}</div>', unsafe_allow_html=True)
+                elif 'image_base64' in reply:
                     st.image(base64.b64decode(reply['image_base64']), caption=reply['message'])
-                    st.session_state.current_chart = reply['image_base64']
+                    st.session_state.current_chart = st.session_state.chatbot.chat_history[-1].get('chart')
                 else:
                     st.markdown(f'<div class="chat-message bot-message">{reply["message"]}</div>', unsafe_allow_html=True)
             else:
                 st.error(reply['message'])
 
+        st.session_state.chatbot.poll_exact()
         if st.session_state.chatbot.chat_history:
             st.subheader("🗂 Chat Log")
             for msg in st.session_state.chatbot.chat_history:
                 st.markdown(f'<div class="chat-message user-message"><strong>You:</strong> {msg["user"]}</div>', unsafe_allow_html=True)
                 if 'assistant' in msg:
                     st.markdown(f'<div class="chat-message bot-message"><strong>Bot:</strong> {msg["assistant"]}</div>', unsafe_allow_html=True)
-                if 'chart' in msg and msg['chart']:
-                    st.image(base64.b64decode(msg['chart']), caption="Chart")
+                if msg.get('chart'):
+                    # Past charts are redrawn from small memoized thumbnails, not the full 300-dpi PNG
+                    thumbnail = st.session_state.chatbot.charts.thumbnail(msg['chart'])
+                    if thumbnail is not None:
+                        st.image(thumbnail, caption="Chart")
+                    else:
+                        st.caption("Chart no longer kept in memory")
                 st.divider()
 
     else:
         st.info("Upload a data file to get started!")
 
+    # Poll background EDA, report and exact-answer jobs until they finish
+    report_job = st.session_state.report_job
+    if (not progress['done'] or (report_job is not None and not report_job.done())
+            or st.session_state.chatbot.exact_pending):
+        time.sleep(0.3)
+        st.rerun()
+
 if __name__ == "__main__":
     main()
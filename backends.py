@@ -0,0 +1,309 @@
+import os
+import math
+import operator
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import streaming
+from column_stats import ColumnAccumulator
+from streaming import DEFAULT_CHUNKSIZE, StreamingEDA
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+
+# (column, operator, value): value is a float for numeric columns and text otherwise
+Filter = Tuple[str, str, Any]
+
+OPERATORS = {'=': operator.eq, '!=': operator.ne, '>': operator.gt, '>=': operator.ge,
+             '<': operator.lt, '<=': operator.le}
+
+
+def matches(series: pd.Series, op: str, value: Any) -> np.ndarray:
+    """Rows of `series` satisfying `op value`. Missing values match nothing, like SQL; text compares case-insensitively."""
+    if isinstance(value, (int, float)):
+        values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        with np.errstate(invalid='ignore'):
+            return OPERATORS[op](values, value) & ~np.isnan(values)
+    text = series.astype(str).str.lower().to_numpy()
+    return OPERATORS[op](text, str(value).lower()) & series.notna().to_numpy()
+
+
+def _mask(chunk: pd.DataFrame, filters: List[Filter]) -> np.ndarray:
+    mask = np.ones(len(chunk), dtype=bool)
+    for col, op, value in filters:
+        mask &= matches(chunk[col], op, value)
+    return mask
+
+
+def order_statistics(values: Callable[[], Iterable[np.ndarray]], ranks: Tuple[int, int],
+                     limit: int = 1_000_000, bins: int = 4096) -> Tuple[float, float]:
+    """The values at two 0-based `ranks` (lowest first) of the NaN-free arrays `values()` yields, exactly.
+
+    Each pass histograms the values still in range and keeps only the bins
+    holding the ranks, until at most `limit` values are left to sort, so
+    memory stays at `bins` counters plus `limit` values however long the
+    column is. `values` is called once per pass.
+    """
+    lo, hi, closed = -np.inf, np.inf, True
+    below = 0  # values ranked under the current range
+    previous = None
+    while True:
+        inside = lambda v: v[(v >= lo) & ((v <= hi) if closed else (v < hi))]
+        count, low, high = 0, np.inf, -np.inf
+        for part in map(inside, values()):
+            if len(part):
+                count, low, high = count + len(part), min(low, part.min()), max(high, part.max())
+        # A range that stopped shrinking holds only a few distinct, adjacent floats
+        if low == high or count <= limit or count == previous:
+            break
+        previous = count
+        edges = np.linspace(low, high, bins + 1)
+        counts = np.zeros(bins, dtype=np.int64)
+        for part in map(inside, values()):
+            counts += np.bincount(np.minimum(np.searchsorted(edges, part, side='right') - 1, bins - 1), minlength=bins)
+        cumulative = below + np.cumsum(counts)
+        first, last = np.searchsorted(cumulative, ranks[0], side='right'), np.searchsorted(cumulative, ranks[1], side='right')
+        below = int(cumulative[first - 1]) if first else below
+        lo, hi, closed = edges[first], edges[last + 1], last == bins - 1
+
+    if low == high:
+        return float(low), float(low)
+    kept = np.sort(np.concatenate([inside(part) for part in values()] or [np.empty(0)]))
+    return float(kept[ranks[0] - below]), float(kept[ranks[1] - below])
+
+
+class PandasBackend:
+    """Computes over a data file by reading it in chunks with pandas; the default.
+
+    This is the interface for file-backed (streaming mode) data: the EDA scan,
+    column reads, value counts, histograms, quantiles and filtered, grouped
+    statistics each read only the columns they need. Frames loaded into memory are
+    always computed on with pandas directly.
+    """
+
+    name = 'pandas'
+
+    def iter_chunks(self, path: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                    columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        return streaming.iter_chunks(path, chunksize, usecols=columns)
+
+    def scan(self, path: str, chunksize: int = DEFAULT_CHUNKSIZE, sample_size: int = 0) -> StreamingEDA:
+        eda = StreamingEDA(sample_size)
+        for chunk in self.iter_chunks(path, chunksize):
+            eda.update(chunk)
+        return eda
+
+    def read_columns(self, path: str, columns: List[str], chunksize: int = DEFAULT_CHUNKSIZE) -> pd.DataFrame:
+        return streaming.read_columns(path, columns, chunksize)
+
+    def value_counts(self, path: str, column: str, chunksize: int = DEFAULT_CHUNKSIZE) -> pd.Series:
+        return streaming.value_counts(path, column, chunksize)
+
+    def histogram(self, path: str, column: str, edges: np.ndarray, chunksize: int = DEFAULT_CHUNKSIZE) -> np.ndarray:
+        counts = np.zeros(len(edges) - 1, dtype=np.int64)
+        for chunk in self.iter_chunks(path, chunksize, [column]):
+            values = chunk[column].to_numpy(dtype=float, na_value=np.nan)
+            counts += np.histogram(values[~np.isnan(values)], bins=edges)[0]
+        return counts
+
+    def _values(self, path: str, column: str, chunksize: int) -> Iterator[np.ndarray]:
+        for chunk in self.iter_chunks(path, chunksize, [column]):
+            values = chunk[column].to_numpy(dtype=float, na_value=np.nan)
+            yield values[~np.isnan(values)]
+
+    def quantile(self, path: str, column: str, q: float, chunksize: int = DEFAULT_CHUNKSIZE) -> float:
+        # Exact, with the same interpolation as np.quantile, without holding the column in memory
+        n = sum(len(values) for values in self._values(path, column, chunksize))
+        if not n:
+            return np.nan
+        position = (n - 1) * q
+        ranks = (math.floor(position), math.ceil(position))
+        low, high = order_statistics(lambda: self._values(path, column, chunksize), ranks, max(chunksize, 1_000_000))
+        return float(np.quantile([low, high], position - ranks[0]))
+
+    def group_accumulators(self, path: str, column: Optional[str], group_by: Optional[str], filters: List[Filter],
+                           chunksize: int = DEFAULT_CHUNKSIZE, quantiles: Iterable[float] = ()
+                           ) -> Tuple[List[Any], np.ndarray, Optional[List[ColumnAccumulator]]]:
+        """Per-group statistics of the rows matching every filter, merged one chunk at a time.
+
+        Returns the group labels in order of first appearance (one None group
+        without `group_by`), the matching rows per group, and an accumulator
+        per group of `column`'s values, or None when `column` is None. Memory
+        grows with the number of groups, not rows. `quantiles` names the
+        quantiles the caller will ask the accumulators for; the sketches here
+        answer any, so it is only a hint for backends that compute them exactly.
+        """
+        needed = list(dict.fromkeys([c for c in (group_by, column) if c] + [col for col, _, _ in filters]))
+        groups: Dict[Any, int] = {} if group_by else {None: 0}
+        rows = np.zeros(len(groups), dtype=np.int64)
+        accumulators = [ColumnAccumulator() for _ in groups] if column else None
+        for chunk in self.iter_chunks(path, chunksize, needed):
+            chunk = chunk[_mask(chunk, filters)]
+            codes = np.zeros(len(chunk), dtype=np.int64)
+            if group_by:
+                # Codes follow first appearance across chunks, the same order pd.factorize gives the whole column
+                keys, labels = pd.factorize(chunk[group_by])
+                lookup = np.array([groups.setdefault(label, len(groups)) for label in labels], dtype=np.int64)
+                codes[:] = -1
+                codes[keys >= 0] = lookup[keys[keys >= 0]]
+            keep = codes >= 0
+            codes = codes[keep]
+            rows = np.concatenate([rows, np.zeros(len(groups) - len(rows), dtype=np.int64)])
+            rows += np.bincount(codes, minlength=len(groups))
+            if accumulators is None:
+                continue
+            accumulators += [ColumnAccumulator() for _ in range(len(groups) - len(accumulators))]
+            values = pd.to_numeric(chunk[column], errors='coerce').to_numpy(dtype=float, na_value=np.nan)[keep]
+            order = np.argsort(codes, kind='stable')
+            for code, part in zip(np.unique(codes), np.split(values[order], np.flatnonzero(np.diff(codes[order])) + 1)):
+                accumulators[code].update(part)
+        return list(groups), rows, accumulators
+
+
+def _quote(column: str) -> str:
+    return '"' + str(column).replace('"', '""') + '"'
+
+
+def _where(filters: List[Filter]) -> Tuple[List[str], List[Any]]:
+    # SQL conditions with the same meaning as _mask: NULLs match nothing, text compares case-insensitively
+    conditions, params = [], []
+    for column, op, value in filters:
+        if isinstance(value, (int, float)):
+            conditions.append(f'TRY_CAST({_quote(column)} AS DOUBLE) {op} ?')
+            params.append(float(value))
+        else:
+            conditions.append(f'lower(CAST({_quote(column)} AS VARCHAR)) {op} lower(?)')
+            params.append(str(value))
+    return conditions, params
+
+
+class SQLAccumulator(ColumnAccumulator):
+    """A group's statistics as one SQL query computed them, with exact values for the quantiles it was asked for."""
+
+    def __init__(self, quantiles: Dict[float, float]):
+        super().__init__()
+        self.quantiles = quantiles
+
+    def quantile(self, q: float) -> float:
+        return self.quantiles.get(q, np.nan)
+
+
+class DuckDBBackend(PandasBackend):
+    """Pushes the work into an in-process DuckDB, one SQL query per question.
+
+    DuckDB scans CSV, TSV, JSON Lines and Parquet files on every core and
+    reads only the columns a query names, so value counts, histograms,
+    quantiles and filtered or grouped statistics come back as small results
+    instead of chunks to reduce in Python. Needs the duckdb package.
+    """
+
+    name = 'duckdb'
+
+    def __init__(self, threads: Optional[int] = None):
+        if duckdb is None:
+            raise ImportError('The duckdb backend needs the duckdb package (pip install duckdb).')
+        self._con = duckdb.connect(config={'threads': threads or os.cpu_count() or 1})
+
+    def _source(self, path: str) -> str:
+        literal = "'" + path.replace("'", "''") + "'"
+        ext = path.split('.')[-1].lower()
+        if ext == 'csv':
+            return f'read_csv_auto({literal})'
+        if ext == 'tsv':
+            return f"read_csv_auto({literal}, delim='\\t')"
+        if ext == 'parquet':
+            return f'read_parquet({literal})'
+        if ext in ('jsonl', 'ndjson') or (ext == 'json' and streaming._is_json_lines(path)):
+            return f"read_json_auto({literal}, format='newline_delimited')"
+        if ext == 'json':
+            raise ValueError('Streaming mode needs JSON Lines input (one object per line).')
+        raise ValueError(f"Streaming is not supported for .{ext} files")
+
+    def _query(self, sql: str, params: Optional[List[Any]] = None):
+        # A cursor per query: one DuckDB connection must not run queries from several threads at once
+        return self._con.cursor().execute(sql, params or [])
+
+    def iter_chunks(self, path: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                    columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        projection = ', '.join(map(_quote, columns)) if columns else '*'
+        reader = self._query(f'SELECT {projection} FROM {self._source(path)}').fetch_record_batch(chunksize)
+        for batch in reader:
+            yield batch.to_pandas()
+
+    def read_columns(self, path: str, columns: List[str], chunksize: int = DEFAULT_CHUNKSIZE) -> pd.DataFrame:
+        return self._query(f"SELECT {', '.join(map(_quote, columns))} FROM {self._source(path)}").df()
+
+    def value_counts(self, path: str, column: str, chunksize: int = DEFAULT_CHUNKSIZE) -> pd.Series:
+        col = _quote(column)
+        # Ties rank by first appearance, as Series.value_counts does
+        frame = self._query(f'SELECT {col} AS value, count(*) AS n FROM '
+                            f'(SELECT {col}, row_number() OVER () AS position FROM {self._source(path)}) '
+                            f'WHERE {col} IS NOT NULL GROUP BY {col} ORDER BY n DESC, min(position)').df()
+        return pd.Series(frame['n'].to_numpy(dtype=np.int64), index=pd.Index(frame['value'], name=column), name='count')
+
+    def histogram(self, path: str, column: str, edges: np.ndarray, chunksize: int = DEFAULT_CHUNKSIZE) -> np.ndarray:
+        bins, low, high = len(edges) - 1, float(edges[0]), float(edges[-1])
+        col = _quote(column)
+        # The top edge belongs to the last bin, as in np.histogram
+        rows = self._query(f'SELECT least(floor(({col} - ?) / ?), ?)::BIGINT AS bin, count(*) FROM {self._source(path)} '
+                           f'WHERE {col} BETWEEN ? AND ? GROUP BY bin',
+                           [low, (high - low) / bins, bins - 1, low, high]).fetchall()
+        counts = np.zeros(bins, dtype=np.int64)
+        for index, n in rows:
+            counts[index] += n
+        return counts
+
+    def quantile(self, path: str, column: str, q: float, chunksize: int = DEFAULT_CHUNKSIZE) -> float:
+        value = self._query(f'SELECT quantile_cont({_quote(column)}, ?) FROM {self._source(path)}', [q]).fetchone()[0]
+        return float(value) if value is not None else np.nan
+
+    def group_accumulators(self, path: str, column: Optional[str], group_by: Optional[str], filters: List[Filter],
+                           chunksize: int = DEFAULT_CHUNKSIZE, quantiles: Iterable[float] = ()
+                           ) -> Tuple[List[Any], np.ndarray, Optional[List[ColumnAccumulator]]]:
+        # One GROUP BY query; the sketches pandas keeps are replaced by exact quantile_cont values for `quantiles`
+        quantiles = list(quantiles)
+        needed = list(dict.fromkeys([c for c in (group_by, column) if c] + [col for col, _, _ in filters]))
+        conditions, params = _where(filters)
+        aggregates = ['count(*) AS n']
+        if column:
+            value = f'TRY_CAST({_quote(column)} AS DOUBLE)'
+            aggregates += [f'count({value})', f'sum({value})', f'var_pop({value}) * count({value})',
+                           f'min({value})', f'max({value})']
+            if quantiles:
+                aggregates.append(f'quantile_cont({value}, ?)')
+                params = [quantiles] + params
+        source = f"(SELECT {', '.join(map(_quote, needed))}, row_number() OVER () AS position FROM {self._source(path)})"
+        if group_by:
+            conditions.append(f'{_quote(group_by)} IS NOT NULL')
+            aggregates.insert(0, f'{_quote(group_by)} AS label')
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        # Groups in order of first appearance, like pd.factorize and the pandas backend
+        grouping = f' GROUP BY {_quote(group_by)} ORDER BY min(position)' if group_by else ''
+        result = self._query(f"SELECT {', '.join(aggregates)} FROM {source}{where}{grouping}", params).fetchall()
+
+        labels = [row[0] for row in result] if group_by else [None]
+        rows = np.array([row[1 if group_by else 0] for row in result], dtype=np.int64)
+        if not column:
+            return labels, rows, None
+        accumulators = []
+        for row in result:
+            count, total, m2, low, high, *exact = row[2 if group_by else 1:]
+            acc = SQLAccumulator(dict(zip(quantiles, exact[0])) if exact and exact[0] is not None else {})
+            if count:
+                acc.count, acc.total, acc.m2, acc.min, acc.max = count, float(total), float(m2), float(low), float(high)
+            accumulators.append(acc)
+        return labels, rows, accumulators
+
+
+BACKENDS = {'pandas': PandasBackend, 'duckdb': DuckDBBackend}
+
+
+def make_backend(name: str = 'pandas') -> PandasBackend:
+    if name.lower() not in BACKENDS:
+        raise ValueError(f"Unknown compute backend {name!r}; choose from {', '.join(BACKENDS)}")
+    return BACKENDS[name.lower()]()
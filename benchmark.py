@@ -0,0 +1,282 @@
+"""
+Benchmarks for the Data Summary Chatbot.
+
+Times cold start, loading, EDA, query parsing, statistical answers, every
+chart type and PDF export on synthetic datasets of increasing size, records
+peak traced memory, writes the results as JSON and compares them with a
+stored baseline.
+
+    python benchmark.py --tiers small medium --output results.json
+    python benchmark.py --tiers small medium --baseline results.json
+    python benchmark.py --startup-only --max-startup-ms 50
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+import warnings
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Any
+
+import numpy as np
+import pandas as pd
+
+from chatbot_agent import DataSummaryChatbot
+from chart_cache import ChartCache
+from dataset_store import DatasetStore
+from report_pdf import build_report
+
+
+TIERS = {
+    'small': 10_000,
+    'medium': 250_000,
+    'large': 1_000_000,
+    'xlarge': 5_000_000,
+}
+
+QUERIES = [
+    "What is the average of num_0?",
+    "Show me the median num_1",
+    "max of num_2",
+    "Show bar chart of cat_0",
+    "pie chart of cat_1",
+    "line chart of num_0",
+    "scatter plot of num_0",
+    "show the correlation heatmap",
+    "box plot of num_1",
+    "hist of num_2",
+    "What are the main trends in this data?",
+    "Which cat_0 has the most rows?",
+]
+
+STAT_OPERATIONS = ['mean', 'median', 'min', 'max', 'sum', 'std', 'variance']
+
+CHART_QUERIES = {
+    'bar': "bar chart of cat_0",
+    'pie': "pie chart of cat_1",
+    'line': "line chart of num_0",
+    'scatter': "scatter plot of num_0",
+    'histogram': "hist of num_1",
+    'box': "box plot of num_2",
+    'heatmap': "correlation heatmap",
+}
+
+
+# Modules a new session must not import; they load on the first chart, LLM question or PDF export
+LAZY_MODULES = ['matplotlib', 'seaborn', 'requests', 'fpdf']
+
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import chatbot_agent
+imported = time.perf_counter()
+chatbot_agent.DataSummaryChatbot()
+ready = time.perf_counter()
+print(json.dumps({'import': imported - start, 'new_session': ready - imported,
+                  'loaded': [m for m in %r if m in sys.modules]}))
+""" % LAZY_MODULES
+
+
+def measure_startup(repeat: int = 3) -> Dict[str, Any]:
+    """Cold start in fresh interpreters: seconds to import chatbot_agent and to open a session (best of `repeat`)."""
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT], cwd=os.path.dirname(os.path.abspath(__file__)),
+                             capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+    return {'import': min(r['import'] for r in runs), 'new_session': min(r['new_session'] for r in runs),
+            'loaded': sorted({m for r in runs for m in r['loaded']})}
+
+
+def startup_results(repeat: int = 3) -> List[Dict[str, Any]]:
+    startup = measure_startup(repeat)
+    if startup['loaded']:
+        print(f"  startup imported {', '.join(startup['loaded'])} eagerly")
+    results = []
+    for name in ('import', 'new_session'):
+        results.append({'tier': 'startup', 'rows': 0, 'name': name, 'seconds': startup[name]})
+        print(f"  {name:<24} {startup[name] * 1000:10.2f} ms")
+    return results
+
+
+def make_dataset(rows: int, numeric: int = 6, categorical: int = 3, null_rate: float = 0.02,
+                 cardinality: int = 50, seed: int = 0) -> pd.DataFrame:
+    """Synthetic frame with `numeric` float/int columns and `categorical` string columns."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(numeric):
+        if i % 2:
+            data[f'num_{i}'] = rng.integers(0, 1_000_000, rows).astype(float)
+        else:
+            data[f'num_{i}'] = rng.lognormal(3, 1, rows).round(3)
+    for i in range(categorical):
+        labels = np.array([f'label_{i}_{j}' for j in range(cardinality)], dtype=object)
+        # Zipf-like skew so bar/pie charts have a long tail
+        weights = 1 / np.arange(1, cardinality + 1)
+        data[f'cat_{i}'] = labels[rng.choice(cardinality, rows, p=weights / weights.sum())]
+
+    df = pd.DataFrame(data)
+    if null_rate:
+        for col in df.columns:
+            df.loc[rng.random(rows) < null_rate, col] = None
+    return df
+
+
+def new_chatbot() -> DataSummaryChatbot:
+    # Every cache off, so each run measures the real work
+    chatbot = DataSummaryChatbot()
+    chatbot.dataset_cache = None
+    chatbot.datasets = DatasetStore()
+    chatbot.chart_cache = ChartCache(max_bytes=0)
+    chatbot.ollama_available = False
+    return chatbot
+
+
+def measure(fn: Callable[[], Any], repeat: int = 1, memory: bool = True) -> Dict[str, Any]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    result = {'seconds': min(timings), 'median_seconds': float(np.median(timings))}
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            result['peak_mb'] = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_tier(tier: str, rows: int, workdir: str, repeat: int = 3, memory: bool = True,
+             numeric: int = 6, categorical: int = 3, null_rate: float = 0.02) -> List[Dict[str, Any]]:
+    path = os.path.join(workdir, f'{tier}.csv')
+    make_dataset(rows, numeric, categorical, null_rate).to_csv(path, index=False)
+    # Big tiers take long enough that a single run is representative
+    repeat = repeat if rows <= 250_000 else 1
+    results = []
+
+    def record(name: str, fn: Callable[[], Any], times: int = repeat):
+        entry = {'tier': tier, 'rows': rows, 'name': name}
+        entry.update(measure(fn, times, memory))
+        results.append(entry)
+        print(f"  {name:<24} {entry['seconds'] * 1000:10.2f} ms"
+              + (f"  peak {entry['peak_mb']:8.1f} MB" if memory else ''))
+
+    record('load_data', lambda: new_chatbot().load_data(path))
+
+    chatbot = new_chatbot()
+    chatbot.load_data(path)
+    record('run_eda', chatbot._run_eda)
+
+    def parse_all():
+        for query in QUERIES:
+            chatbot.detect_intent(query)
+            chatbot._extract_column(query)
+    record('detect_intent+extract', parse_all, max(repeat, 5))
+
+    for op in STAT_OPERATIONS:
+        record(f'stat_{op}', lambda op=op: chatbot.get_statistical_answer(f"{op} of num_0"), max(repeat, 5))
+
+    history = []
+    for chart_type, query in CHART_QUERIES.items():
+        reply = chatbot.generate_chart(query)
+        if not reply['success'] or reply['chart_type'] != chart_type:
+            raise RuntimeError(f"{query!r} did not produce a {chart_type} chart: {reply['message']}")
+        history.append({'user': query, 'assistant': reply['message'], 'chart': reply['image_base64']})
+        record(f'chart_{chart_type}', lambda query=query: chatbot.generate_chart(query))
+
+    record('export_pdf', lambda: build_report(chatbot.summary_stats, history))
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], threshold: float = 1.25,
+            min_delta: float = 0.005) -> List[Dict[str, Any]]:
+    """Entries slower than `threshold` times their baseline and by more than `min_delta` seconds."""
+    previous = {(r['tier'], r['name']): r for r in baseline}
+    regressions = []
+    for entry in results:
+        base = previous.get((entry['tier'], entry['name']))
+        if base is None:
+            continue
+        ratio = entry['seconds'] / base['seconds'] if base['seconds'] else float('inf')
+        if ratio > threshold and entry['seconds'] - base['seconds'] > min_delta:
+            regressions.append({'tier': entry['tier'], 'name': entry['name'], 'baseline': base['seconds'],
+                                'seconds': entry['seconds'], 'ratio': ratio})
+    return regressions
+
+
+def environment() -> Dict[str, str]:
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tiers', nargs='+', default=['small', 'medium'], choices=list(TIERS))
+    parser.add_argument('--rows', type=int, help='run one custom tier with this many rows instead')
+    parser.add_argument('--numeric', type=int, default=6)
+    parser.add_argument('--categorical', type=int, default=3)
+    parser.add_argument('--null-rate', type=float, default=0.02)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc run')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help='results file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25)
+    parser.add_argument('--startup-only', action='store_true', help='only measure cold start')
+    parser.add_argument('--max-startup-ms', type=float,
+                        help='fail when opening a new session takes longer than this')
+    args = parser.parse_args(argv)
+
+    if args.numeric < 3 or args.categorical < 2:
+        parser.error('the chart and stat queries need at least 3 numeric and 2 categorical columns')
+
+    tiers = {'custom': args.rows} if args.rows else {t: TIERS[t] for t in args.tiers}
+    warnings.filterwarnings('ignore')
+    print("startup (fresh interpreter)")
+    results = startup_results(args.repeat)
+    with tempfile.TemporaryDirectory() as workdir:
+        for tier, rows in ({} if args.startup_only else tiers).items():
+            print(f"{tier} ({rows:,} rows)")
+            results += run_tier(tier, rows, workdir, args.repeat, not args.no_memory,
+                                args.numeric, args.categorical, args.null_rate)
+
+    with open(args.output, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    status = 0
+    if args.max_startup_ms is not None:
+        new_session = next(r['seconds'] for r in results if r['tier'] == 'startup' and r['name'] == 'new_session')
+        if new_session * 1000 > args.max_startup_ms:
+            print(f"STARTUP {new_session * 1000:.1f} ms is over the {args.max_startup_ms:.0f} ms budget")
+            status = 1
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['tier']}/{r['name']}: {r['baseline'] * 1000:.1f} ms -> "
+                  f"{r['seconds'] * 1000:.1f} ms ({r['ratio']:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.2f}x of {args.baseline}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Any, Tuple
+
+
+def file_fingerprint(file_path: str, block_size: int = 1 << 20) -> str:
+    """Content hash of a data file, used to key anything derived from its data."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ChartCache:
+    """LRU cache of rendered chart PNGs with a byte budget.
+
+    Keys are content addressed: the dataset fingerprint plus the resolved
+    chart type, columns and render settings, so differently worded queries
+    for the same chart share an entry. With `disk_dir` set, every PNG is also
+    written there and entries evicted from memory are reloaded from disk.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_dir: Optional[str] = None,
+                 max_disk_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(fingerprint: str, chart_type: str, columns: Tuple, settings: Dict[str, Any]) -> str:
+        raw = repr((fingerprint, chart_type, tuple(columns), sorted(settings.items())))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f'{key}.png')
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return png
+
+        if self.disk_dir and os.path.exists(self._disk_path(key)):
+            try:
+                with open(self._disk_path(key), 'rb') as f:
+                    png = f.read()
+                os.utime(self._disk_path(key))
+            except OSError:
+                png = None
+            if png is not None:
+                self._store(key, png)
+                with self._lock:
+                    self.hits += 1
+                return png
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, png: bytes):
+        self._store(key, png)
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), 'wb') as f:
+                    f.write(png)
+                self._prune_disk()
+            except OSError:
+                pass
+
+    def _store(self, key: str, png: bytes):
+        if len(png) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            self._entries[key] = png
+            self._size += len(png)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def _prune_disk(self):
+        files = [os.path.join(self.disk_dir, name) for name in os.listdir(self.disk_dir) if name.endswith('.png')]
+        stats = sorted(((os.path.getmtime(p), os.path.getsize(p), p) for p in files))
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in stats:
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries), 'bytes': self._size}
@@ -0,0 +1,139 @@
+import io
+import os
+import threading
+import multiprocessing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple, Any
+
+import numpy as np
+
+# matplotlib and seaborn are imported by render() on the first chart, so importing this module stays cheap
+PLOTTING_MODULES = ['matplotlib.figure', 'matplotlib.backends.backend_agg', 'seaborn']
+
+
+@dataclass
+class ChartSpec:
+    """Everything needed to draw one chart, with the data already aggregated.
+
+    `data` holds only picklable payloads (arrays, small Series/DataFrames,
+    box plot statistics), so a spec can be shipped to a worker process
+    without the dataset it came from.
+    """
+    chart_type: str
+    title: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    figsize: Tuple[float, float] = (10, 6)
+    dpi: int = 300
+
+
+def render(spec: ChartSpec) -> bytes:
+    """Draw `spec` with the object-oriented Agg API and return PNG bytes."""
+    import matplotlib.artist
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    import seaborn as sns
+
+    fig = Figure(figsize=spec.figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    data = spec.data
+
+    if spec.chart_type == 'bar':
+        data['counts'].plot(kind='bar', ax=ax)
+    elif spec.chart_type == 'pie':
+        ax.pie(data['values'], labels=data['labels'], autopct='%1.1f%%')
+    elif spec.chart_type == 'line':
+        ax.plot(data['x'], data['y'])
+    elif spec.chart_type == 'scatter' and 'counts' in data:
+        mesh = ax.pcolormesh(data['x_edges'], data['y_edges'], np.ma.masked_equal(data['counts'].T, 0), cmap='viridis')
+        fig.colorbar(mesh, ax=ax, label='rows')
+    elif spec.chart_type == 'scatter':
+        ax.scatter(data['x'], data['y'])
+    elif spec.chart_type == 'histogram':
+        ax.hist(data['edges'][:-1], bins=data['edges'], weights=data['counts'])
+        ax.grid(True)
+    elif spec.chart_type == 'box':
+        # Same colours pandas' Series.plot(kind='box') uses
+        bp = ax.bxp(data['stats'])
+        matplotlib.artist.setp(bp['boxes'], color='C0', alpha=1)
+        matplotlib.artist.setp(bp['whiskers'], color='C0', alpha=1)
+        matplotlib.artist.setp(bp['medians'], color='C2', alpha=1)
+        matplotlib.artist.setp(bp['caps'], color='C0', alpha=1)
+    elif spec.chart_type == 'heatmap':
+        sns.heatmap(data['corr'], annot=True, cmap='coolwarm', center=0, ax=ax)
+    else:
+        raise ValueError(f'Unsupported chart type: {spec.chart_type}')
+
+    ax.set_title(spec.title)
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=spec.dpi)
+    return buf.getvalue()
+
+
+class ChartRenderer:
+    """Renders ChartSpecs on a pool of worker processes.
+
+    Concurrent requests from several sessions render in parallel on all cores
+    instead of queueing behind the GIL on the script thread. With
+    `processes=False` a thread pool is used instead. If the process pool
+    breaks, the chart is rendered in the calling thread and a fresh pool is
+    started on the next request.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, processes: bool = True):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.processes = processes
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if self.processes:
+                    # Forking a process that already runs threads can deadlock, so workers start clean
+                    if 'forkserver' in multiprocessing.get_all_start_methods():
+                        context = multiprocessing.get_context('forkserver')
+                        # Workers fork from a server that already imported matplotlib and seaborn
+                        context.set_forkserver_preload(['chart_render'] + PLOTTING_MODULES)
+                    else:
+                        context = multiprocessing.get_context('spawn')
+                    self._pool = ProcessPoolExecutor(self.max_workers, mp_context=context)
+                else:
+                    self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix='chart')
+            return self._pool
+
+    def use_processes(self, enabled: bool = True):
+        """Switch between worker processes and threads; only call it with processes from a guarded entry point.
+
+        Worker processes import the main module again, so a script without
+        an `if __name__ == "__main__":` guard would run itself in each one.
+        """
+        with self._lock:
+            if enabled != self.processes and self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+            self.processes = enabled
+
+    def submit(self, spec: ChartSpec) -> Future:
+        return self._executor().submit(render, spec)
+
+    def render(self, spec: ChartSpec) -> bytes:
+        try:
+            return self.submit(spec).result()
+        except BrokenProcessPool:
+            with self._lock:
+                self._pool = None
+            return render(spec)
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+
+# Threads by default, so importing scripts need no main guard; app.py opts into worker processes
+CHART_RENDERER = ChartRenderer(processes=False)
@@ -0,0 +1,104 @@
+import io
+import hashlib
+from typing import Any, Dict, Optional
+from PIL import Image
+
+from chart_cache import ChartCache
+
+
+class ChatTurn:
+    """One question and its answer in the chat history.
+
+    Slots rather than a dict per turn, and a chart is the content hash of its
+    PNG in a ChartBlobStore instead of the base64 text itself. Reads like the
+    dicts the history used to hold: turn['user'], turn.get('chart') and
+    'timings' in turn all work, and unset fields count as missing.
+    """
+
+    __slots__ = ('user', 'timestamp', 'intent', 'assistant', 'chart', 'timings')
+
+    def __init__(self, user: str, timestamp: Optional[str] = None, intent: Optional[str] = None,
+                 assistant: Optional[str] = None, chart: Optional[str] = None,
+                 timings: Optional[Dict[str, Any]] = None):
+        self.user = user
+        self.timestamp = timestamp
+        self.intent = intent
+        self.assistant = assistant
+        self.chart = chart
+        self.timings = timings
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __repr__(self) -> str:
+        return f'ChatTurn(user={self.user!r}, intent={self.intent!r}, chart={self.chart!r})'
+
+
+class ChartBlobStore:
+    """Chart PNGs referenced by the chat history, stored once each under their content hash.
+
+    Raw bytes in a ChartCache, so the least recently shown charts go first
+    past `max_bytes`; with `disk_dir` they are also written there and read
+    back once evicted. Thumbnails for redrawing the history are made once
+    per chart and kept in a smaller cache of their own.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_dir: Optional[str] = None,
+                 thumbnail_width: int = 480, max_thumbnail_bytes: int = 8 * 1024 * 1024):
+        self.thumbnail_width = thumbnail_width
+        self._blobs = ChartCache(max_bytes, disk_dir)
+        self._thumbnails = ChartCache(max_thumbnail_bytes)
+
+    @staticmethod
+    def key(png: bytes) -> str:
+        return hashlib.sha256(png).hexdigest()
+
+    def put(self, png: bytes) -> str:
+        key = self.key(png)
+        if self._blobs.get(key) is None:
+            self._blobs.put(key, png)
+        return key
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._blobs.get(key)
+
+    def thumbnail(self, key: str) -> Optional[bytes]:
+        thumb = self._thumbnails.get(key)
+        if thumb is None:
+            png = self.get(key)
+            if png is None:
+                return None
+            thumb = self._shrink(png)
+            self._thumbnails.put(key, thumb)
+        return thumb
+
+    def _shrink(self, png: bytes) -> bytes:
+        img = Image.open(io.BytesIO(png))
+        if img.width <= self.thumbnail_width:
+            return png
+        img.thumbnail((self.thumbnail_width, img.height), Image.LANCZOS)
+        buf = io.BytesIO()
+        img.save(buf, format='PNG', optimize=True)
+        return buf.getvalue()
+
+    def clear(self):
+        self._blobs.clear()
+        self._thumbnails.clear()
+
+    def stats(self) -> Dict[str, int]:
+        blobs, thumbnails = self._blobs.stats(), self._thumbnails.stats()
+        return {'charts': blobs['entries'], 'bytes': blobs['bytes'],
+                'thumbnails': thumbnails['entries'], 'thumbnail_bytes': thumbnails['bytes']}
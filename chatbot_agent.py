@@ -1,25 +1,132 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import requests
 import json
 import re
-from typing import Dict, List, Tuple, Optional, Any
-import io
+from typing import Callable, Dict, List, Tuple, Optional, Any, Iterator
 import base64
 from datetime import datetime
+import os
+import hashlib
+import copy
+import dataclasses
 import warnings
+import threading
+import time
+import streaming
+import ingest
+from backends import PandasBackend
+from column_stats import build_accumulators, ColumnAccumulator, CorrelationAccumulator
+from correlation import CorrelationCache, correlation_accumulator, frame_chunks, relevant_columns, top_pairs
+from chart_cache import ChartCache, file_fingerprint
+import plot_data
+from chart_render import CHART_RENDERER, ChartSpec
+from chat_history import ChatTurn, ChartBlobStore
+from query_parser import QueryParser, ParsedQuery
+from eda_jobs import EDAJob, EDA_EXECUTOR
+from dataset_cache import DatasetCache
+from dataset_store import SHARED_DATASETS, DatasetLease
+from compaction import compact_frame
+from group_index import GroupIndexes, grouped_reduce
+from live_append import APPENDABLE_EXTENSIONS, FileWatcher, append_frame, complete_length
+from sampling import RowSample, DEFAULT_SAMPLE_SIZE
+from instrumentation import METRICS, TurnTrace
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+import tempfile
+from llm_client import OllamaClient, OllamaError, ollama_status
+from prompt_context import PromptContext, build_digest
+from response_cache import ResponseCache, DEFAULT_CACHE_DIR
 warnings.filterwarnings('ignore')
 
+def _ordinal(value: float) -> str:
+    text = f'{value:g}'
+    if not text.isdigit():
+        return f'{text}th'
+    n = int(text)
+    return text + ('th' if 10 <= n % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th'))
+
+
+STAT_LABELS = {'mean': 'Mean', 'median': 'Median', 'min': 'Minimum', 'max': 'Maximum', 'sum': 'Sum',
+               'std': 'Standard Deviation', 'variance': 'Variance', 'count': 'Count'}
+
+def _stat_label(op: str, quantile: Optional[float] = None) -> str:
+    return f'{_ordinal(quantile * 100)} percentile' if op == 'percentile' else STAT_LABELS[op]
+
+
+# What a ColumnAccumulator answers without another pass; its median comes from the sketch
+ACCUMULATOR_STATS = {'mean': lambda acc: acc.mean, 'median': lambda acc: acc.median, 'min': lambda acc: acc.min,
+                     'max': lambda acc: acc.max, 'sum': lambda acc: acc.total, 'std': lambda acc: acc.std,
+                     'variance': lambda acc: acc.variance, 'count': lambda acc: acc.count}
+
 
 class DataSummaryChatbot:
     def __init__(self):
         self.df = None
         self.summary_stats = {}
-        self.chat_history = []
-        self.ollama_url = "http://localhost:11434/api/generate"
-        self.ollama_available = self._is_ollama_running()
+        self.column_stats = {}
+        self.chat_history: List[ChatTurn] = []
+        # Charts in the history are kept here once each, as raw PNG bytes, and referenced by hash
+        self.charts = ChartBlobStore()
+        self.streaming = False
+        self.source_path = None
+        self.chunksize = streaming.DEFAULT_CHUNKSIZE
+        # Computes over the file in streaming mode; make_backend('duckdb') pushes scans and aggregations into DuckDB
+        self.backend = PandasBackend()
+        self.fingerprint = None
+        self.eda_job = None
+        # Bumped by every load; a background load only publishes while its generation is current
+        self._generation = 0
+        self._load_lock = threading.Lock()
+        self._restored = False
+        # Null counts and accumulators merged from per-shard EDA when a folder, archive or workbook is loaded
+        self._shard_stats = None
+        # Opt-in: shrink dtypes after parsing (category / downcast numerics / pyarrow strings)
+        self.compact_memory = False
+        self.arrow_strings = False
+        self.dataset_cache = DatasetCache(os.path.join(DEFAULT_CACHE_DIR, 'datasets'))
+        # The upload key load_upload already looked up on disk, so the parse stage does not count a second miss
+        self._cache_checked = None
+        # Sessions loading the same data share one frame through this registry
+        self.datasets = SHARED_DATASETS
+        self._lease = None
+        self.group_indexes = GroupIndexes()
+        # Follows a growing file or folder; see watch() and refresh()
+        self.watcher = None
+        # Merging copies the whole frame, so between chat turns small arrivals wait until they add up to
+        # batch_fraction of its rows or the oldest has waited max_delay seconds
+        self.live_settings = {'batch_fraction': 0.01, 'max_delay': 10.0}
+        self._pending_rows: List[pd.DataFrame] = []
+        self._pending_since = 0.0
+        # Correlation sums, shared per dataset; computed at load for up to eager_columns numeric columns, else on first use
+        self.correlations = CorrelationCache()
+        self.correlation_settings = {'chunk_rows': 100_000, 'dtype': 'float64', 'eager_columns': 50}
+        # Opt-in: medians, percentiles and the correlation heatmap come from a row sample, with error bounds
+        self.approximate = False
+        self.sample_size = DEFAULT_SAMPLE_SIZE
+        self.sample = None
+        self._exact_jobs = []
+        self.chart_cache = ChartCache()
+        self.renderer = CHART_RENDERER
+        # max_points bounds what any chart draws; top_k caps bar/pie categories before an "Other" slice;
+        # heatmaps show at most heatmap_columns, the most strongly correlated ones
+        self.chart_settings = {'figsize': (10, 6), 'dpi': 300, 'max_points': 2000, 'top_k': 20, 'heatmap_columns': 15}
+        # Grouped answers list this many groups, largest first
+        self.max_groups_shown = 20
+        self.llm = OllamaClient("http://localhost:11434", model="gemma:2b")
+        # digest_tokens bounds the dataset digest every LLM prompt starts with; keep_alive keeps the model,
+        # and the digest it has already read, loaded between questions. Text columns with more than
+        # max_distinct values are described without their most common values.
+        self.llm_settings = {'digest_tokens': 600, 'keep_alive': '30m', 'max_distinct': 10_000}
+        self._prompt_context = None
+        self._prompt_lock = threading.Lock()
+        self.schema_fingerprint = None
+        # Exact prompts only; set response_cache.similarity_threshold to also reuse answers to paraphrases
+        self.response_cache = ResponseCache(os.path.join(DEFAULT_CACHE_DIR, 'responses.sqlite'))
+        # None follows the shared background probe of self.llm's server; True/False pins it
+        self._ollama_available: Optional[bool] = None
+        ollama_status(self.llm)
+        self.metrics = METRICS
+        self._trace = None
 
         self.chart_keywords = {
             'bar': ['bar', 'bar chart', 'barplot', 'histogram'],
@@ -33,81 +140,584 @@ class DataSummaryChatbot:
 
         self.stat_keywords = [
             'mean', 'average', 'median', 'mode', 'min', 'minimum', 'max', 'maximum',
-            'sum', 'count', 'std', 'standard deviation', 'variance', 'percentile',
+            'sum', 'count', 'std', 'standard deviation', 'variance', 'percentile', 'quantile',
             'top', 'bottom', 'highest', 'lowest', 'most', 'least'
         ]
+        self._parser = None
 
-    def _is_ollama_running(self) -> bool:
-        try:
-            res = requests.get("http://localhost:11434/api/tags", timeout=5)
-            return res.status_code == 200
-        except:
-            return False
+    @property
+    def ollama_available(self) -> bool:
+        if self._ollama_available is not None:
+            return self._ollama_available
+        return ollama_status(self.llm).available
 
-    def load_data(self, file_path: str) -> Dict[str, Any]:
-        try:
-            ext = file_path.split('.')[-1].lower()
-            if ext == 'csv':
-                self.df = pd.read_csv(file_path)
-            elif ext == 'tsv':
-                self.df = pd.read_csv(file_path, sep='\t')
-            elif ext == 'xlsx':
-                self.df = pd.read_excel(file_path)
-            elif ext == 'json':
-                self.df = pd.read_json(file_path)
-            else:
-                raise ValueError(f"Unsupported file type: {ext}")
+    @ollama_available.setter
+    def ollama_available(self, value: Optional[bool]):
+        self._ollama_available = value
 
-            self._run_eda()
-            return {'success': True, 'message': f"Data loaded. Shape: {self.df.shape}", 'summary': self.summary_stats}
+    def _ollama_ready(self) -> bool:
+        # A question asked before the first probe has answered waits for it instead of assuming Ollama is down
+        if self._ollama_available is None:
+            status = ollama_status(self.llm)
+            if not status.checked:
+                return status.wait(timeout=self.llm.timeout)
+        return self.ollama_available
+
+    def load_data(self, file_path: str, streaming_mode: bool = False, background: bool = False,
+                  use_cache: bool = False) -> Dict[str, Any]:
+        """Load a file and run EDA.
+
+        `file_path` may also be a folder, a glob pattern such as
+        "exports/2024-*.csv", a zip archive or a workbook; every file, member
+        or sheet is parsed in parallel and they are combined into one dataset.
+        With `background=True` this returns immediately and an EDAJob parses
+        the file and fills `summary_stats` stage by stage (see `eda_progress`).
+        With `use_cache=True` the parsed frame and EDA come from, or are saved
+        to, the dataset cache.
+        """
+        self.stop_watching()
+        self.cancel_load()
+        self._drop_lease()
+        if background:
+            self.df = None
+            self.summary_stats = {}
+            self.column_stats = {}
+            self._parser = None
+            self.eda_job = EDAJob(self._background_stages(file_path, streaming_mode, use_cache))
+            return {'success': True, 'message': 'Loading data in the background...', 'summary': self.summary_stats}
+
+        self.eda_job = None
+        try:
+            for _, stage in self._load_stages(file_path, streaming_mode, use_cache):
+                stage()
+            verb = 'streamed' if self.streaming else 'loaded'
+            sources = self.summary_stats.get('sources', [])
+            origin = f" from {len(sources)} sources" if len(sources) > 1 else ''
+            return {'success': True, 'message': f"Data {verb}{origin}. Shape: {self.summary_stats['shape']}",
+                    'summary': self.summary_stats}
 
         except Exception as e:
             return {'success': False, 'message': str(e), 'summary': {}}
 
+    def load_upload(self, data: bytes, filename: str, streaming_mode: bool = False,
+                    background: bool = False) -> Dict[str, Any]:
+        """Load uploaded bytes, restoring the parsed frame from the dataset cache when seen before.
+
+        On a miss the bytes are written to a temp file and loaded with `load_data`.
+        That file's path is returned as 'source_file'. It must outlive streaming
+        and background loads, so the caller deletes it.
+        """
+        self.stop_watching()
+        self.cancel_load()
+        if not streaming_mode and self.dataset_cache is not None:
+            key = DatasetCache.key_for(data)
+            if self._restore(key):
+                self.eda_job = None
+                return {'success': True, 'message': f"Data loaded from cache. Shape: {self.summary_stats['shape']}",
+                        'summary': self.summary_stats, 'source_file': None}
+
+        ext = filename.split('.')[-1]
+        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{ext}") as temp:
+            temp.write(data)
+        self._cache_checked = None if streaming_mode or self.dataset_cache is None else key
+        try:
+            result = self.load_data(temp.name, streaming_mode=streaming_mode, background=background, use_cache=True)
+        finally:
+            self._cache_checked = None
+        result['source_file'] = temp.name
+        return result
+
+    def _load_stages(self, file_path: str, streaming_mode: bool, use_cache: bool = False) -> List[Tuple[str, Any]]:
+        if streaming_mode:
+            return [('stream', lambda: self._stream_file(file_path))]
+        eda_stages = [
+            ('schema', self._eda_schema),
+            ('nulls', self._eda_nulls),
+            ('numeric', self._eda_numeric),
+            ('correlation', self._eda_correlation),
+            ('groups', self._eda_groups),
+        ]
+        if self.approximate:
+            eda_stages.insert(3, ('sample', self._eda_sample))
+        stages = [('parse', lambda: self._read_file(file_path, use_cache))]
+        if self.compact_memory:
+            stages.append(('compact', self._unless_restored(self._compact)))
+        stages += [(name, self._unless_restored(stage)) for name, stage in eda_stages]
+        if use_cache:
+            stages.append(('cache', self._unless_restored(self._cache_dataset)))
+        stages.append(('share', self._unless_restored(self._share_dataset)))
+        return stages
+
+    # What a load produces; a background load builds it on a private copy and publishes it stage by stage
+    LOAD_STATE = ('df', 'summary_stats', 'column_stats', 'fingerprint', 'schema_fingerprint', 'streaming',
+                  'source_path', 'group_indexes', 'correlations', 'sample', '_shard_stats', '_restored',
+                  '_lease', '_parser')
+
+    def _background_stages(self, file_path: str, streaming_mode: bool, use_cache: bool) -> List[Tuple[str, Any]]:
+        generation = self._generation
+        loader = copy.copy(self)
+        loader.summary_stats = {}
+
+        def published(stage):
+            def run():
+                stage()
+                with self._load_lock:
+                    if generation == self._generation:
+                        for name in self.LOAD_STATE:
+                            value = getattr(loader, name)
+                            setattr(self, name, dict(value) if name == 'summary_stats' else value)
+                        return
+                # Superseded by a newer load: its results, and any dataset it leased, are dropped
+                loader._drop_lease()
+            return run
+
+        return [(name, published(stage)) for name, stage in loader._load_stages(file_path, streaming_mode, use_cache)]
+
+    def cancel_load(self, wait: bool = False):
+        """Supersede a background load still running, so nothing it computes reaches this session.
+
+        With `wait=True` this returns once the job has stopped, e.g. before deleting the file it reads.
+        """
+        with self._load_lock:
+            self._generation += 1
+        if self.eda_job is not None:
+            self.eda_job.cancel()
+            if wait:
+                self.eda_job.wait()
+
+    def _unless_restored(self, stage):
+        return lambda: None if self._restored else stage()
+
+    def _restore(self, key: str, use_cache: bool = True) -> bool:
+        dataset_key = self._dataset_key(key)
+        lease = self.datasets.acquire(dataset_key)
+        if lease is None:
+            hit = self.dataset_cache.get(dataset_key) if use_cache and self.dataset_cache is not None else None
+            if hit is None:
+                return False
+            df, stats = hit
+            lease = self.datasets.publish(dataset_key, df, dict(stats, group_indexes=GroupIndexes(),
+                                                                      correlations=CorrelationCache()))
+        self._adopt(lease)
+        self.fingerprint = key
+        self.streaming = False
+        self.source_path = None
+        self._parser = None
+        self.schema_fingerprint = self._schema_fingerprint()
+        return True
+
+    def _dataset_key(self, fingerprint: str) -> str:
+        # Compacted and plain frames of the same upload are cached separately, as are sampled summaries
+        if self.compact_memory:
+            fingerprint = f"{fingerprint}-compact{'-arrow' if self.arrow_strings else ''}"
+        return f'{fingerprint}-approx' if self.approximate else fingerprint
+
+    def _adopt(self, lease: DatasetLease):
+        old, self._lease = self._lease, lease
+        self.df = lease.frame()
+        self.summary_stats = dict(lease.stats['summary_stats'])
+        self.column_stats = dict(lease.stats['column_stats'])
+        self.group_indexes = lease.stats.get('group_indexes') or GroupIndexes()
+        self.sample = lease.stats.get('sample')
+        self.correlations = lease.stats.get('correlations') or CorrelationCache()
+        if old is not None:
+            old.release()
+
+    def _drop_lease(self):
+        if self._lease is not None:
+            self._lease.release()
+            self._lease = None
+
+    def _share_dataset(self):
+        self._adopt(self.datasets.publish(self._dataset_key(self.fingerprint), self.df,
+                                          {'summary_stats': self.summary_stats, 'column_stats': self.column_stats,
+                                           'group_indexes': self.group_indexes, 'sample': self.sample,
+                                           'correlations': self.correlations}))
+
+    def _cache_dataset(self):
+        if self.dataset_cache is not None:
+            self.dataset_cache.put(self._dataset_key(self.fingerprint), self.df,
+                                   {'summary_stats': self.summary_stats, 'column_stats': self.column_stats})
+
+    def _stream_file(self, file_path: str):
+        if ingest.is_multi_source(file_path):
+            raise ValueError('Streaming mode reads a single CSV, TSV, JSON Lines or Parquet file; '
+                             'load folders, patterns, zip archives and workbooks without it.')
+        self.fingerprint = file_fingerprint(file_path)
+        self._parser = None
+        eda = self.backend.scan(file_path, self.chunksize, self.sample_size if self.approximate else 0)
+        self.df = None
+        self.streaming = True
+        self.source_path = file_path
+        self.column_stats = eda.accumulators()
+        self.summary_stats = eda.summary()
+        if self.column_stats:
+            self._numeric_stats(self.summary_stats, self.column_stats)
+        self.sample = eda.sample
+        self.correlations = CorrelationCache()
+        if self.sample is not None and len(self.summary_stats['numeric_columns']) >= 2:
+            self._sample_correlation(self.summary_stats)
+        self.schema_fingerprint = self._schema_fingerprint()
+
+    def _read_file(self, file_path: str, use_cache: bool = False):
+        shards = ingest.expand(file_path) if ingest.is_multi_source(file_path) else None
+        fingerprint = ingest.fingerprint(shards) if shards else file_fingerprint(file_path)
+        self._restored = self._restore(fingerprint, use_cache and fingerprint != self._cache_checked)
+        if self._restored:
+            return
+
+        self.fingerprint = fingerprint
+        self._parser = None
+        self.streaming = False
+        self.source_path = None
+        self._shard_stats = None
+        self.summary_stats = {}
+        if shards:
+            self.df, self._shard_stats = ingest.load(shards)
+            self.summary_stats['sources'] = [shard.name for shard in shards]
+        else:
+            self.df = ingest.read_frame(file_path, file_path.split('.')[-1].lower())
+
+    def _compact(self):
+        self.df, report = compact_frame(self.df, arrow_strings=self.arrow_strings)
+        self.summary_stats['memory'] = report
+
     def _run_eda(self):
         if self.df is None:
             return
 
-        self.summary_stats = {
+        self.summary_stats = {key: value for key, value in self.summary_stats.items() if key in ('memory', 'sources')}
+        self._shard_stats = None
+        self._eda_schema()
+        self._eda_nulls()
+        self._eda_numeric()
+        if self.approximate:
+            self._eda_sample()
+        self._eda_correlation()
+        self._eda_groups()
+
+    # EDA stages, cheapest first. Each one only adds keys to summary_stats, so partial results stay readable.
+    def _eda_schema(self):
+        self.summary_stats.update({
             'shape': self.df.shape,
             'columns': list(self.df.columns),
             'data_types': self.df.dtypes.to_dict(),
-            'null_counts': self.df.isnull().sum().to_dict(),
-            'null_percentage': (self.df.isnull().sum() / len(self.df) * 100).to_dict(),
             'numeric_columns': self.df.select_dtypes(include=[np.number]).columns.tolist(),
-            'categorical_columns': self.df.select_dtypes(include=['object']).columns.tolist(),
+            'categorical_columns': self.df.select_dtypes(include=['object', 'category', 'string']).columns.tolist(),
             'datetime_columns': self.df.select_dtypes(include=['datetime']).columns.tolist()
-        }
+        })
+        self.schema_fingerprint = self._schema_fingerprint()
+
+    def _eda_nulls(self):
+        if self._shard_stats is not None:
+            nulls = pd.Series(self._shard_stats['null_counts'], dtype='int64').reindex(self.df.columns)
+        else:
+            nulls = self.df.isnull().sum()
+        self.summary_stats['null_counts'] = nulls.to_dict()
+        self.summary_stats['null_percentage'] = (nulls / len(self.df) * 100).to_dict()
 
+    def _eda_numeric(self):
+        # One pass per numeric column; describe() and every statistical answer are served from these
+        numeric = self.summary_stats['numeric_columns']
+        if self._shard_stats is not None:
+            # Merged from the shards' own accumulators rather than another pass over the combined frame
+            merged = self._shard_stats['numeric']
+            missing = build_accumulators(self.df, [col for col in numeric if col not in merged])
+            self.column_stats = {col: merged[col] if col in merged else missing[col] for col in numeric}
+        else:
+            self.column_stats = build_accumulators(self.df, numeric)
         if self.summary_stats['numeric_columns']:
-            self.summary_stats['numeric_stats'] = self.df[self.summary_stats['numeric_columns']].describe().to_dict()
+            self._numeric_stats(self.summary_stats, self.column_stats)
 
-    def detect_intent(self, query: str) -> str:
-        query = query.lower()
+    def _numeric_stats(self, stats: Dict[str, Any], column_stats: Dict[str, ColumnAccumulator]):
+        # Quartiles are exact whenever the frame is in memory; only streaming falls back to the sketches
+        stats['numeric_stats'] = {col: acc.describe() for col, acc in column_stats.items()}
+        stats.pop('estimated_quantiles', None)
+        if self.df is not None:
+            quartiles = self.df[list(column_stats)].quantile([0.25, 0.5, 0.75])
+            for col, values in stats['numeric_stats'].items():
+                values.update({'25%': float(quartiles.at[0.25, col]), '50%': float(quartiles.at[0.5, col]),
+                               '75%': float(quartiles.at[0.75, col])})
+        else:
+            estimated = [col for col, acc in column_stats.items() if not acc.sketch.exact]
+            if estimated:
+                stats['estimated_quantiles'] = estimated
 
-        for chart_type, keywords in self.chart_keywords.items():
-            if any(k in query for k in keywords):
-                return 'chart'
+    def _eda_sample(self):
+        self.sample = RowSample.of(self.df, self.summary_stats['numeric_columns'], self.sample_size)
 
-        if any(k in query for k in self.stat_keywords):
-            return 'statistical'
+    def _eda_correlation(self):
+        self.correlations = CorrelationCache()
+        numeric = self.summary_stats['numeric_columns']
+        if len(numeric) >= 2:
+            if self._sampled():
+                self._sample_correlation(self.summary_stats)
+            elif len(numeric) <= self.correlation_settings['eager_columns']:
+                self._correlation_matrix()
 
-        if any(re.search(p, query) for p in [r'show.*chart', r'plot.*chart', r'chart', r'graph', r'visualize']):
-            return 'chart'
+    def _correlation_matrix(self) -> pd.DataFrame:
+        """Correlation matrix of the numeric columns, computed on first use and then kept in summary_stats."""
+        corr = self.summary_stats.get('correlation')
+        if corr is None:
+            corr = self.summary_stats['correlation'] = self._correlation_sums().matrix()
+        return corr
 
-        return 'textual'
+    def _correlation_sums(self) -> CorrelationAccumulator:
+        return self.correlations.get(self._build_correlation)
 
-    def _extract_column(self, query: str) -> Optional[str]:
-        query = query.lower()
-        for col in self.df.columns:
-            if col.lower() in query:
-                return col
+    def _build_correlation(self) -> CorrelationAccumulator:
+        # Row chunks at a time, so only chunk_rows x columns floats are ever materialized
+        numeric = self.summary_stats['numeric_columns']
+        if self.df is not None:
+            chunks = frame_chunks(self.df, numeric, self.correlation_settings['chunk_rows'])
+        else:
+            chunks = self.backend.iter_chunks(self.source_path, self.chunksize, numeric)
+        return correlation_accumulator(chunks, numeric, self.correlation_settings['dtype'])
+
+    def _sampled(self) -> bool:
+        # True when answers come from a sample that does not hold every row
+        return self.approximate and self.sample is not None and not self.sample.exact
+
+    def _sample_correlation(self, stats: Dict[str, Any]):
+        stats['correlation'] = self.sample.correlation(stats['numeric_columns'])
+        if not self.sample.exact:
+            stats['approximate'] = {'sample_rows': len(self.sample), 'rows': self.sample.rows_seen,
+                                    'correlation_margin': self.sample.correlation_margin()}
+
+    def _eda_groups(self):
+        # Factorized codes for the categorical columns, so grouped and filtered questions skip pandas groupby
+        self.group_indexes = GroupIndexes()
+        self.group_indexes.build(self.df, self.summary_stats['categorical_columns'])
+
+    def watch(self, path: str, interval: float = 2.0, streaming_mode: bool = False) -> Dict[str, Any]:
+        """Follow a growing file, or a folder new export files land in, merging new rows as they appear.
+
+        A file is loaded first and followed from where that load ended. For a
+        folder the loaded data stays and every file created in it afterwards
+        is appended. New rows are merged by `refresh`, which every chat turn calls.
+        """
+        self.stop_watching()
+        try:
+            if os.path.isdir(path):
+                if not self._has_data():
+                    # Nothing loaded yet: the folder's current files become the dataset
+                    result = self.load_data(path)
+                    if not result['success']:
+                        return result
+                self.watcher = FileWatcher(path, interval)
+                return {'success': True, 'message': f"Following new files in {path}"}
+
+            ext = path.split('.')[-1].lower()
+            if ext not in APPENDABLE_EXTENSIONS:
+                return {'success': False, 'message': f"Only {', '.join(APPENDABLE_EXTENSIONS)} files can be followed."}
+            # The watcher starts right after the last complete row the load parsed, so no row is read twice or cut
+            # in half. A file that grew, or ended mid-row, while it was parsed is loaded again.
+            for _ in range(3):
+                end = complete_length(path)
+                result = self.load_data(path, streaming_mode=streaming_mode)
+                if not result['success'] or os.path.getsize(path) == end:
+                    break
+            else:
+                # Still being written to: parse exactly the complete rows seen last
+                result = self._load_prefix(path, end, streaming_mode)
+            if not result['success']:
+                return result
+            self.watcher = FileWatcher(path, interval, offset=end)
+            return {'success': True, 'message': f"Following {path}. Shape: {self.summary_stats['shape']}"}
+        except OSError as e:
+            return {'success': False, 'message': str(e)}
+
+    def _load_prefix(self, path: str, length: int, streaming_mode: bool) -> Dict[str, Any]:
+        # A copy of the first `length` bytes is parsed; streaming answers then read the followed file itself
+        with open(path, 'rb') as f:
+            data = f.read(length)
+        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{path.split('.')[-1]}") as temp:
+            temp.write(data)
+        try:
+            result = self.load_data(temp.name, streaming_mode=streaming_mode)
+        finally:
+            os.unlink(temp.name)
+        if self.streaming:
+            self.source_path = path
+        return result
+
+    def stop_watching(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        self._pending_rows = []
+
+    def refresh(self, force: bool = False) -> int:
+        """Merge the rows the watcher has read since the last call; returns how many were added.
+
+        Unless `force` is set, rows for a frame in memory are held back until
+        they reach `batch_fraction` of its rows or `max_delay` seconds, so
+        frequent small appends do not copy the whole frame every time.
+        """
+        if self.watcher is None or not self.wait_for_eda(0):
+            return 0
+        drained = self.watcher.drain()
+        if drained and not self._pending_rows:
+            self._pending_since = time.monotonic()
+        self._pending_rows += drained
+        if not self._pending_rows:
+            return 0
+        waiting = sum(len(rows) for rows in self._pending_rows)
+        if (not force and self.df is not None and waiting < self.live_settings['batch_fraction'] * len(self.df)
+                and time.monotonic() - self._pending_since < self.live_settings['max_delay']):
+            return 0
+        pending, self._pending_rows = self._pending_rows, []
+        return self.append_rows(pd.concat(pending, ignore_index=True))
+
+    def append_rows(self, rows: pd.DataFrame) -> int:
+        """Merge new rows into the loaded data, updating the EDA from just those rows.
+
+        Null counts, the numeric accumulators and the correlation sums absorb
+        the new rows, and the fingerprint is chained with them so cached charts
+        and answers for the old data are not reused. If the new rows change
+        which columns are numeric, the EDA is recomputed in full.
+        """
+        if not len(rows) or not self._has_data():
+            return 0
+
+        numeric = self.summary_stats['numeric_columns']
+        # Correlations already computed are extended with the new rows; otherwise they wait until asked for
+        extend = 'correlation' in self.summary_stats and len(numeric) >= 2 and not self._sampled()
+        correlation = self._correlation_sums() if extend else None
+        # The frame, stats and accumulators may be shared with other sessions, so nothing is modified in place
+        self._drop_lease()
+        if self.df is not None:
+            self.df = append_frame(self.df, rows)
+            rows = self.df.iloc[-len(rows):]
+        else:
+            rows = rows.reindex(columns=self.summary_stats['columns'])
+
+        digest = hashlib.sha256(self.fingerprint.encode())
+        digest.update(pd.util.hash_pandas_object(rows, index=False).to_numpy().tobytes())
+        self.fingerprint = digest.hexdigest()
+
+        if self.df is not None and self.df.select_dtypes(include=[np.number]).columns.tolist() != numeric:
+            self._run_eda()
+        else:
+            self._append_eda(rows, correlation)
+        return len(rows)
+
+    def _append_eda(self, rows: pd.DataFrame, correlation: Optional[CorrelationAccumulator] = None):
+        stats = dict(self.summary_stats)
+        total = stats['shape'][0] + len(rows)
+        stats['shape'] = (total, stats['shape'][1])
+        nulls = rows.isnull().sum()
+        stats['null_counts'] = {col: count + int(nulls[col]) for col, count in stats['null_counts'].items()}
+        stats['null_percentage'] = {col: count / total * 100 for col, count in stats['null_counts'].items()}
+        if self.df is not None:
+            stats['data_types'] = self.df.dtypes.to_dict()
+            stats['categorical_columns'] = self.df.select_dtypes(include=['object', 'category', 'string']).columns.tolist()
+            stats['datetime_columns'] = self.df.select_dtypes(include=['datetime']).columns.tolist()
+
+        column_stats = {}
+        for col, acc in self.column_stats.items():
+            acc = copy.deepcopy(acc)
+            acc.update(pd.to_numeric(rows[col], errors='coerce').to_numpy(dtype=float, na_value=np.nan))
+            column_stats[col] = acc
+        if column_stats:
+            self._numeric_stats(stats, column_stats)
+        if self.sample is not None:
+            self.sample = copy.deepcopy(self.sample)
+            self.sample.update(rows)
+        if self._sampled() and len(stats['numeric_columns']) >= 2:
+            self._sample_correlation(stats)
+        elif correlation is not None:
+            correlation = copy.deepcopy(correlation)
+            correlation.update(rows[correlation.columns].apply(pd.to_numeric, errors='coerce')
+                               .to_numpy(dtype=float, na_value=np.nan))
+            stats['correlation'] = correlation.matrix()
+        else:
+            stats.pop('correlation', None)
+        self.correlations = CorrelationCache(correlation)
+
+        self.summary_stats = stats
+        self.column_stats = column_stats
+        # Rebuilt for the grown frame the first time a question groups or filters
+        self.group_indexes = GroupIndexes()
+        self.schema_fingerprint = self._schema_fingerprint()
+
+    def eda_progress(self) -> Dict[str, Any]:
+        if self.eda_job is None:
+            return {'ready': [], 'pending': [], 'done': True, 'error': None}
+        return self.eda_job.progress()
+
+    def wait_for_eda(self, timeout: Optional[float] = None) -> bool:
+        return self.eda_job is None or self.eda_job.wait(timeout)
+
+    def _schema_fingerprint(self) -> str:
+        stats = self.summary_stats
+        schema = repr((tuple(stats['shape']), [(c, str(stats['data_types'][c])) for c in stats['columns']]))
+        return hashlib.sha256(schema.encode()).hexdigest()
+
+    def _has_data(self) -> bool:
+        return self.df is not None or self.streaming
+
+    def _columns(self) -> List[str]:
+        if self.df is not None:
+            return list(self.df.columns)
+        return self.summary_stats.get('columns', [])
+
+    def _column_frame(self, columns: List[str]) -> pd.DataFrame:
+        if self.df is not None:
+            return self.df[columns]
+        return self.backend.read_columns(self.source_path, columns, self.chunksize)
+
+    def _column_series(self, col: str) -> pd.Series:
+        return self._column_frame([col])[col]
+
+    def _column_chunks(self, col: str) -> Iterator[np.ndarray]:
+        # Streaming mode: the column as float arrays, one chunk at a time
+        for chunk in self.backend.iter_chunks(self.source_path, self.chunksize, [col]):
+            yield chunk[col].to_numpy(dtype=float, na_value=np.nan)
+
+    def _value_counts(self, col: str) -> pd.Series:
+        if self.df is not None:
+            series = self.df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # Same order as for plain strings: by count, ties in order of first appearance
+                codes = series.cat.codes.to_numpy()
+                seen = pd.unique(codes[codes >= 0])
+                counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))[seen]
+                index = pd.Index(series.cat.categories.take(seen), name=col)
+                return pd.Series(counts, index=index, name='count').sort_values(ascending=False, kind='stable')
+            return series.value_counts()
+        return self.backend.value_counts(self.source_path, col, self.chunksize)
+
+    def _histogram(self, col: str, bins: int) -> Tuple[np.ndarray, np.ndarray]:
+        if self.df is not None:
+            values = self.df[col].to_numpy(dtype=float, na_value=np.nan)
+            return np.histogram(values[~np.isnan(values)], bins=bins)
+
+        stats = self.column_stats[col]
+        edges = np.histogram_bin_edges([], bins=bins, range=(stats.min, stats.max))
+        return self.backend.histogram(self.source_path, col, edges, self.chunksize), edges
+
+    def parse_query(self, query: str) -> ParsedQuery:
+        # Built lazily and dropped on every load, so it always matches the current columns
+        if self._parser is None:
+            self._parser = QueryParser(self.chart_keywords, self.stat_keywords, self._columns())
+        return self._parser.parse(query)
 
+    def detect_intent(self, query: str) -> str:
+        return self.parse_query(query).intent
+
+    def _extract_column(self, query: str, parsed: Optional[ParsedQuery] = None) -> Optional[str]:
+        parsed = parsed or self.parse_query(query)
+        if parsed.columns:
+            return parsed.columns[0]
+
+        query = query.lower()
+        columns = self._columns()
         quoted = re.search(r'"(.*?)"', query)
-        if quoted and quoted.group(1) in self.df.columns:
+        if quoted and quoted.group(1) in columns:
             return quoted.group(1)
 
-        if 'heatmap' in query or 'correlation' in query:
+        if parsed.flags:
             return None
 
         context_map = {
@@ -119,169 +729,643 @@ class DataSummaryChatbot:
         for key, options in context_map.items():
             if key in query:
                 for col in options:
-                    if col in self.df.columns:
+                    if col in columns:
                         return col
 
         return None
 
-    def generate_chart(self, query: str) -> Dict[str, Any]:
-        if self.df is None:
+    def generate_chart(self, query: str, parsed: Optional[ParsedQuery] = None) -> Dict[str, Any]:
+        if not self._has_data():
             return {'success': False, 'message': 'No data loaded'}
 
-        query_lower = query.lower()
-        chart_type = next((k for k, v in self.chart_keywords.items() if any(word in query_lower for word in v)), 'bar')
-        col = self._extract_column(query)
+        parsed = parsed or self.parse_query(query)
+        chart_type, col = self._chart_target(query, parsed)
+        if chart_type == 'heatmap' and parsed.exact and self._sampled():
+            message = self._start_exact(query, self._exact_heatmap)
+            return {'success': True, 'message': message, 'response_type': 'text'}
+        return self.render_chart(chart_type, col)
+
+    def _chart_target(self, query: str, parsed: Optional[ParsedQuery] = None) -> Tuple[str, Optional[str]]:
+        parsed = parsed or self.parse_query(query)
+        chart_type = parsed.chart_type or 'bar'
+        with self._stage('extract_column'):
+            col = self._extract_column(query, parsed)
 
-        if 'heatmap' in query_lower:
-            chart_type, col = 'heatmap', None
+        if 'heatmap' in parsed.flags:
+            chart_type = 'heatmap'
+        if chart_type in ('heatmap', 'scatter') and col not in self.summary_stats['numeric_columns']:
+            col = None  # the strongest correlations pick the columns instead
+        return chart_type, col
 
-        if col and col not in self.df.columns:
+    def render_chart(self, chart_type: str, col: Optional[str]) -> Dict[str, Any]:
+        # Safe from worker threads: the spec is built from read-only data and drawn by the renderer's pool
+        if col and col not in self._columns():
             return {'success': False, 'message': f'Column "{col}" not found.'}
 
+        label = {'heatmap': 'correlation_matrix', 'scatter': col or 'strongest_correlation'}.get(chart_type, col)
+        sampled = chart_type == 'heatmap' and 'approximate' in self.summary_stats
+        cache_key = ChartCache.make_key(self.fingerprint + ('-sample' if sampled else ''), chart_type, (col,),
+                                        self.chart_settings)
+        with self._stage('chart_cache'):
+            png = self.chart_cache.get(cache_key)
+        if png is not None:
+            with self._stage('encode'):
+                return self._chart_result(chart_type, label, png)
+
         try:
-            fig, ax = plt.subplots(figsize=(10, 6))
-
-            if chart_type == 'bar' and self.df[col].dtype == 'object':
-                self.df[col].value_counts().plot(kind='bar', ax=ax)
-                ax.set_title(f'Bar Chart: {col}')
-
-            elif chart_type == 'pie' and self.df[col].dtype == 'object':
-                counts = self.df[col].value_counts()
-                plt.pie(counts.values, labels=counts.index, autopct='%1.1f%%')
-                plt.title(f'Pie Chart: {col}')
-
-            elif chart_type == 'line' and self.df[col].dtype in ['int64', 'float64']:
-                self.df[col].plot(kind='line', ax=ax)
-                ax.set_title(f'Line Chart: {col}')
-
-            elif chart_type == 'scatter':
-                nums = self.summary_stats['numeric_columns']
-                if len(nums) >= 2:
-                    x, y = col, next(c for c in nums if c != col)
-                    plt.scatter(self.df[x], self.df[y])
-                    plt.title(f'Scatter: {x} vs {y}')
-                else:
-                    raise ValueError('At least 2 numeric columns required for scatter plot')
+            with self._stage('compute'):
+                spec = self._chart_spec(chart_type, col)
+            with self._stage('render'):
+                png = self.renderer.render(spec)
+            with self._stage('encode'):
+                self.chart_cache.put(cache_key, png)
+                return self._chart_result(chart_type, label, png)
+
+        except Exception as e:
+            return {'success': False, 'message': str(e)}
 
-            elif chart_type == 'histogram' and self.df[col].dtype in ['int64', 'float64']:
-                self.df[col].hist(bins=30, ax=ax)
-                ax.set_title(f'Histogram: {col}')
+    def _chart_spec(self, chart_type: str, col: Optional[str]) -> ChartSpec:
+        # Aggregates here, on the caller's side, so only small payloads travel to the renderer
+        is_categorical = col in self.summary_stats['categorical_columns']
+        is_numeric = col in self.summary_stats['numeric_columns']
+        max_points = self.chart_settings['max_points']
+        spec = ChartSpec(chart_type, '', figsize=self.chart_settings['figsize'], dpi=self.chart_settings['dpi'])
 
-            elif chart_type == 'box' and self.df[col].dtype in ['int64', 'float64']:
-                self.df[col].plot(kind='box', ax=ax)
-                ax.set_title(f'Box Plot: {col}')
+        if chart_type == 'bar' and is_categorical:
+            spec.data['counts'] = plot_data.top_k_counts(self._value_counts(col), self.chart_settings['top_k'])
+            spec.title = f'Bar Chart: {col}'
 
-            elif chart_type == 'heatmap':
-                corr = self.df[self.summary_stats['numeric_columns']].corr()
-                sns.heatmap(corr, annot=True, cmap='coolwarm', center=0, ax=ax)
-                ax.set_title('Correlation Heatmap')
-                col = 'correlation_matrix'
+        elif chart_type == 'pie' and is_categorical:
+            counts = plot_data.top_k_counts(self._value_counts(col), self.chart_settings['top_k'])
+            spec.data.update(values=counts.values, labels=counts.index)
+            spec.title = f'Pie Chart: {col}'
 
+        elif chart_type == 'line' and is_numeric:
+            if self.df is not None:
+                spec.data['x'], spec.data['y'] = plot_data.line_points(self.df[col], max_points)
             else:
-                raise ValueError(f'Unsupported chart or invalid column for chart type: {chart_type}')
-
-            plt.tight_layout()
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png', dpi=300)
-            buf.seek(0)
-            encoded_img = base64.b64encode(buf.read()).decode()
-            plt.close()
-
-            return {
-                'success': True,
-                'message': f'Generated {chart_type} chart for {col}',
-                'chart_type': chart_type,
-                'column_name': col,
-                'image_base64': encoded_img
-            }
+                spec.data['x'], spec.data['y'] = plot_data.minmax_points(self._column_chunks(col),
+                                                                         self.summary_stats['shape'][0], max_points)
+            spec.title = f'Line Chart: {col}'
 
-        except Exception as e:
-            plt.close()
-            return {'success': False, 'message': str(e)}
+        elif chart_type == 'scatter':
+            nums = self.summary_stats['numeric_columns']
+            if len(nums) < 2:
+                raise ValueError('At least 2 numeric columns required for scatter plot')
+            # col against the column it correlates with most, or the strongest pair overall when none was named
+            pairs = top_pairs(self._correlation_matrix(), 1, col)
+            x = pairs[0][0] if pairs else col or nums[0]
+            y = pairs[0][1] if pairs else next(c for c in nums if c != x)
+            if self.df is None and self.summary_stats['shape'][0] > max_points:
+                spec.data.update(self._streamed_scatter_bins(x, y, max_points))
+            else:
+                frame = self._column_frame([x, y]).dropna()
+                if len(frame) > max_points:
+                    counts, x_edges, y_edges = plot_data.scatter_bins(frame[x].to_numpy(dtype=float), frame[y].to_numpy(dtype=float), max_points)
+                    spec.data.update(counts=counts, x_edges=x_edges, y_edges=y_edges)
+                else:
+                    spec.data.update(x=frame[x], y=frame[y])
+            spec.title = f'Scatter: {x} vs {y}'
 
-    def get_statistical_answer(self, query: str) -> str:
-        if self.df is None:
+        elif chart_type == 'histogram' and is_numeric:
+            spec.data['counts'], spec.data['edges'] = self._histogram(col, bins=30)
+            spec.title = f'Histogram: {col}'
+
+        elif chart_type == 'box' and is_numeric:
+            # Quartiles, whiskers and outliers only, computed the way Axes.boxplot would
+            spec.title = f'Box Plot: {col}'
+            if self.df is not None:
+                values = self.df[col].to_numpy(dtype=float, na_value=np.nan)
+                from matplotlib import cbook  # matplotlib loads on the first chart, not at startup
+                spec.data['stats'] = cbook.boxplot_stats(values[~np.isnan(values)], labels=[col])
+            else:
+                # Streaming: quartiles from the column's sketch, whiskers and the most extreme outliers from one pass
+                acc = self.column_stats[col]
+                quartiles = (acc.quantile(0.25), acc.quantile(0.5), acc.quantile(0.75))
+                spec.data['stats'] = plot_data.box_stats((values[~np.isnan(values)] for values in self._column_chunks(col)),
+                                                         quartiles, acc.mean, acc.count, col, max_points // 2)
+                if not acc.sketch.exact:
+                    spec.title += ' (≈ quartiles, estimated while streaming)'
+
+        elif chart_type == 'heatmap':
+            if not self.summary_stats['numeric_columns']:
+                raise ValueError('No numeric columns for a correlation heatmap')
+            spec = self._heatmap_spec(self._correlation_matrix(), col)
+            if 'approximate' in self.summary_stats:
+                spec.title += f" (approximate, {self.summary_stats['approximate']['sample_rows']:,}-row sample)"
+
+        else:
+            raise ValueError(f'Unsupported chart or invalid column for chart type: {chart_type}')
+        return spec
+
+    def _streamed_scatter_bins(self, x: str, y: str, max_points: int) -> Dict[str, np.ndarray]:
+        # Fixed cells over the columns' known ranges, so each chunk's counts are added up and no rows are kept
+        bounds = [(self.column_stats[c].min, self.column_stats[c].max) for c in (x, y)]
+        counts = None
+        for chunk in self.backend.iter_chunks(self.source_path, self.chunksize, [x, y]):
+            xs, ys = (chunk[c].to_numpy(dtype=float, na_value=np.nan) for c in (x, y))
+            both = ~(np.isnan(xs) | np.isnan(ys))
+            part, x_edges, y_edges = plot_data.scatter_bins(xs[both], ys[both], max_points, bounds)
+            counts = part if counts is None else counts + part
+        return {'counts': counts, 'x_edges': x_edges, 'y_edges': y_edges}
+
+    def _heatmap_spec(self, corr: pd.DataFrame, col: Optional[str] = None) -> ChartSpec:
+        # Wide tables show only their most strongly correlated columns, or those of col, so the cells stay legible
+        shown = relevant_columns(corr, self.chart_settings['heatmap_columns'], col)
+        title = 'Correlation Heatmap'
+        if len(shown) < len(corr.columns):
+            title += f' ({len(shown)} most correlated of {len(corr.columns)} columns)'
+        return ChartSpec('heatmap', title, {'corr': corr.loc[shown, shown]},
+                         figsize=self.chart_settings['figsize'], dpi=self.chart_settings['dpi'])
+
+    def _chart_result(self, chart_type: str, col: Optional[str], png: bytes) -> Dict[str, Any]:
+        message = f'Generated {chart_type} chart for {col}'
+        if chart_type == 'heatmap' and 'approximate' in self.summary_stats:
+            sample = self.summary_stats['approximate']
+            message += (f" (approximate: from a {sample['sample_rows']:,}-row sample, each correlation within "
+                        f"±{sample['correlation_margin']:.3f} at 95%; ask for the exact heatmap to use every row)")
+        return {
+            'success': True,
+            'message': message,
+            'chart_type': chart_type,
+            'column_name': col,
+            'image_base64': base64.b64encode(png).decode()
+        }
+
+    def get_statistical_answer(self, query: str, parsed: Optional[ParsedQuery] = None) -> str:
+        if not self._has_data():
             return 'No data loaded.'
 
-        col = self._extract_column(query)
-        if not col or col not in self.df.columns:
+        parsed = parsed or self.parse_query(query)
+        if parsed.group_by or parsed.filters:
+            return self._conditional_answer(query, parsed)
+
+        with self._stage('extract_column'):
+            col = self._extract_column(query, parsed)
+        if not col or col not in self._columns():
             return 'Could not identify column for statistical analysis.'
 
         if col not in self.summary_stats['numeric_columns']:
             return f'Column "{col}" is not numeric.'
 
-        series = self.df[col].dropna()
-        query = query.lower()
+        try:
+            if parsed.stat_op in ('percentile', 'median'):
+                return self._quantile_answer(query, col, parsed)
+            return self._format_stat(col, parsed.stat_op, self._aggregate(col, [parsed.stat_op]))
+        except Exception as e:
+            return f'Error calculating statistics: {str(e)}'
+
+    def _quantile_answer(self, query: str, col: str, parsed: ParsedQuery) -> str:
+        q = 0.5 if parsed.stat_op == 'median' else parsed.quantile
+        label = _stat_label(parsed.stat_op, q)
+        if self.df is not None and not self._sampled():
+            return f'{label} of {col}: {self._exact_quantile(col, q):.2f}'
+        sketch = self.column_stats[col].sketch
+        if not self._sampled() and sketch.exact:
+            return f'{label} of {col}: {sketch.quantile(q):.2f}'
+        if parsed.exact:
+            exact = lambda: {'message': f'{label} of {col}: {self._exact_quantile(col, q):.2f} (exact)'}
+            return self._start_exact(query, exact)
+
+        if not self._sampled():
+            return (f'{label} of {col}: ≈{sketch.quantile(q):.2f} (estimated while streaming, within about '
+                    f'{1.7 / sketch.k:.1%} in rank; ask for the exact {label.lower()} to use every row)')
+        estimate, low, high = self.sample.quantile(col, q)
+        return (f'{label} of {col}: {estimate:.2f} (approximate: 95% CI {low:.2f} to {high:.2f} from a '
+                f'{len(self.sample):,}-row sample; ask for the exact {label.lower()} to use every row)')
+
+    def _exact_quantile(self, col: str, q: float) -> float:
+        if self.df is None:
+            return self.backend.quantile(self.source_path, col, q, self.chunksize)
+        values = self._column_series(col).to_numpy(dtype=float, na_value=np.nan)
+        return float(np.quantile(values[~np.isnan(values)], q))
+
+    def _exact_heatmap(self) -> Dict[str, Any]:
+        spec = self._heatmap_spec(self._correlation_sums().matrix())
+        png = self.renderer.render(spec)
+        self.chart_cache.put(ChartCache.make_key(self.fingerprint, 'heatmap', (None,), self.chart_settings), png)
+        return {'message': 'Generated heatmap chart for correlation_matrix (exact)',
+                'image_base64': base64.b64encode(png).decode()}
+
+    def _start_exact(self, query: str, compute) -> str:
+        # Runs on the background pool; poll_exact adds the result to the chat once it is ready
+        self._exact_jobs.append({'query': query, 'fingerprint': self.fingerprint, 'future': EDA_EXECUTOR.submit(compute)})
+        return 'Computing the exact answer from every row in the background; it will be added to the chat when ready.'
+
+    @property
+    def exact_pending(self) -> bool:
+        return bool(self._exact_jobs)
+
+    def poll_exact(self) -> int:
+        """Add the exact answers that finished since the last call to the chat; returns how many were added."""
+        added = 0
+        for job in [job for job in self._exact_jobs if job['future'].done()]:
+            self._exact_jobs.remove(job)
+            if job['fingerprint'] != self.fingerprint:
+                continue  # the data changed while it ran
+            try:
+                result = job['future'].result()
+            except Exception as e:
+                result = {'message': f'Exact computation failed: {str(e)}'}
+            entry = ChatTurn(job['query'], datetime.now().isoformat(), assistant=result['message'])
+            self._keep_chart(entry, result)
+            self.chat_history.append(entry)
+            added += 1
+        return added
+
+    def _aggregate(self, col: str, ops: List[Optional[str]]) -> Dict[str, float]:
+        # Every operation is answered from the column's one-pass accumulator, so no column is rescanned
+        # Medians are not among them: _quantile_answer computes those exactly when it can
+        stats = self.column_stats[col]
+        getters = {op: get for op, get in ACCUMULATOR_STATS.items() if op != 'median'}
+        wanted = set(ops)
+        if wanted - set(getters):
+            wanted |= {'count', 'mean', 'min', 'max'}
+        return {op: getters[op](stats) for op in wanted if op in getters}
 
+    def _format_stat(self, col: str, op: Optional[str], values: Dict[str, float]) -> str:
+        if op in STAT_LABELS and op != 'count':
+            return f'{STAT_LABELS[op]} of {col}: {values[op]:.2f}'
+        return (f"Stats for {col}:\nCount: {values['count']:.0f}, Mean: {values['mean']:.2f}, "
+                f"Min: {values['min']:.2f}, Max: {values['max']:.2f}")
+
+    def _conditional_answer(self, query: str, parsed: ParsedQuery) -> str:
+        """Answer "<op> of <col> per <group>" and "<op> of <col> where <filters>" from the group indexes."""
+        numeric = self.summary_stats['numeric_columns']
+        # The column being aggregated is the one mentioned outside the conditions ("mean views where views > 10" aside)
+        conditions = {parsed.group_by} | {column for column, _, _ in parsed.filters}
+        col = (next((c for c in parsed.columns if c not in conditions), None)
+               or next((c for c in parsed.columns if c in numeric), None)
+               or self._extract_column(query, parsed))
+        if parsed.group_by is not None and parsed.group_by == col:
+            # "top channels by views": the column is what to rank by, not a grouping
+            parsed = dataclasses.replace(parsed, group_by=None)
+            if not parsed.filters:
+                return self.get_statistical_answer(query, parsed)
+        op = parsed.stat_op or ('count' if parsed.group_by else None)
+        if not col or col not in self._columns():
+            return 'Could not identify column for statistical analysis.'
+        if op != 'count' and col not in numeric:
+            return f'Column "{col}" is not numeric.'
+        if not parsed.stat_op and parsed.group_by and col in numeric:
+            # "top views by title": ranking words name no statistic, and counting a numeric column is rarely meant
+            return (f'Which statistic of {col} should each {parsed.group_by} be ranked by? Ask for example '
+                    f'"max {col} by {parsed.group_by}" or "sum of {col} by {parsed.group_by}".')
+
+        where = ' and '.join(f'{column} {operator} {value}' for column, operator, value in parsed.filters)
         try:
-            if 'mean' in query or 'average' in query:
-                return f'Mean of {col}: {series.mean():.2f}'
-            elif 'median' in query:
-                return f'Median of {col}: {series.median():.2f}'
-            elif 'min' in query:
-                return f'Minimum of {col}: {series.min():.2f}'
-            elif 'max' in query:
-                return f'Maximum of {col}: {series.max():.2f}'
-            elif 'sum' in query:
-                return f'Sum of {col}: {series.sum():.2f}'
-            elif 'std' in query:
-                return f'Standard Deviation of {col}: {series.std():.2f}'
-            elif 'variance' in query:
-                return f'Variance of {col}: {series.var():.2f}'
+            if self.df is None:
+                reduce, labels, matched, estimated = self._streamed_groups(col, op, parsed)
             else:
-                stats = series.describe()
-                return f"Stats for {col}:\nCount: {stats['count']:.0f}, Mean: {stats['mean']:.2f}, Min: {stats['min']:.2f}, Max: {stats['max']:.2f}"
+                with self._stage('filter'):
+                    rows = self._filter_rows(parsed.filters)
+                values = self.group_indexes.values(self.df, col) if col in numeric else None
+                if parsed.group_by:
+                    index = self.group_indexes.category(self.df, parsed.group_by)
+                    codes, labels = index.codes, index.labels
+                else:
+                    codes, labels = np.zeros(len(self.df), dtype=np.int32), None
+                if rows is not None:
+                    codes = codes[rows]
+                    values = values[rows] if values is not None else None
+                reduce = lambda name: grouped_reduce(codes, len(labels) if labels else 1, values, name, parsed.quantile)
+                matched, estimated = len(codes), False
+
+            label = _stat_label(op, parsed.quantile) if op else None
+            if labels is None:
+                return self._format_filtered(col, op, label, where, reduce, matched, estimated)
+            return self._format_grouped(col, op, label, parsed.group_by, where, reduce, labels, col in numeric, estimated)
+        except ValueError as e:
+            return str(e)
         except Exception as e:
             return f'Error calculating statistics: {str(e)}'
 
+    def _streamed_groups(self, col: str, op: Optional[str], parsed: ParsedQuery):
+        # Streaming mode: the backend filters and merges per-group accumulators chunk by chunk, so no rows are kept
+        numeric = col in self.summary_stats['numeric_columns']
+        quantiles = {'median': [0.5], 'percentile': [parsed.quantile]}.get(op, [])
+        with self._stage('filter'):
+            labels, rows, accumulators = self.backend.group_accumulators(
+                self.source_path, col if numeric else None, parsed.group_by, self._filter_values(parsed.filters),
+                self.chunksize, quantiles)
+
+        def reduce(name: str) -> Tuple[np.ndarray, np.ndarray]:
+            if accumulators is None:
+                return rows.astype(float), rows
+            if name == 'percentile':
+                get = lambda acc: acc.quantile(parsed.quantile)
+            elif name in ACCUMULATOR_STATS:
+                get = ACCUMULATOR_STATS[name]
+            else:
+                raise ValueError(f'Unsupported operation: {name}')
+            counts = np.array([acc.count for acc in accumulators], dtype=np.int64)
+            return np.array([get(acc) for acc in accumulators], dtype=float), counts
+
+        estimated = op in ('median', 'percentile') and any(not acc.sketch.exact for acc in accumulators or [])
+        labels = [str(label) for label in labels] if parsed.group_by else None
+        return reduce, labels, int(rows.sum()), estimated
+
+    def _filter_values(self, filters: List[Tuple[str, str, str]]) -> List[Tuple[str, str, Any]]:
+        # Filters with numeric columns' values parsed; text columns only support = and !=
+        checked = []
+        for col, op, value in filters:
+            if col in self.summary_stats['numeric_columns']:
+                try:
+                    value = float(value)
+                except ValueError:
+                    raise ValueError(f'Cannot compare numeric column "{col}" with "{value}".')
+            elif op not in ('=', '!='):
+                raise ValueError(f'Column "{col}" is not numeric, so it can only be filtered with = or !=.')
+            checked.append((col, op, value))
+        return checked
+
+    def _filter_rows(self, filters: List[Tuple[str, str, str]]) -> Optional[np.ndarray]:
+        # Sorted ids of the rows matching every filter, or None for no filters
+        rows = None
+        for col, op, value in self._filter_values(filters):
+            if col in self.summary_stats['numeric_columns']:
+                matched = self.group_indexes.sorted_index(self.df, col).rows(op, value)
+            else:
+                matched = self.group_indexes.category(self.df, col).rows(op, value)
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+        return rows
+
+    # `reduce(op)` returns (result, values counted) per group, from grouped_reduce or merged accumulators
+    def _format_filtered(self, col: str, op: Optional[str], label: Optional[str], where: str, reduce: Callable,
+                         matched: int, estimated: bool = False) -> str:
+        if not matched:
+            return f'No rows match {where}.'
+        if op is None:
+            stats = {name: reduce(name)[0][0] for name in ('count', 'mean', 'min', 'max')}
+            return (f"Stats for {col} where {where}:\nCount: {stats['count']:.0f}, Mean: {stats['mean']:.2f}, "
+                    f"Min: {stats['min']:.2f}, Max: {stats['max']:.2f}")
+        result, _ = reduce(op)
+        rows = 'row' if matched == 1 else 'rows'
+        return f"{label} of {col} where {where}: {'≈' if estimated else ''}{result[0]:.2f} ({matched:,} {rows})"
+
+    def _format_grouped(self, col: str, op: str, label: str, group: str, where: str, reduce: Callable,
+                        labels: List[str], numeric: bool, estimated: bool = False) -> str:
+        result, counts = reduce(op)
+        title = f'{label} of {col} by {group}' if numeric else f'Rows by {group}'
+        if where:
+            title += f' where {where}'
+        present = np.flatnonzero((counts > 0) & ~np.isnan(result))
+        if not len(present):
+            return f'No rows match {where}.' if where else f'No values to group for {title}.'
+
+        order = present[np.argsort(-result[present], kind='stable')]
+        shown = order[:self.max_groups_shown]
+        fmt = ('≈' if estimated else '') + ('{:.0f}' if op == 'count' else '{:.2f}')
+        lines = [f'{title}:'] + [f'- {labels[g]}: {fmt.format(result[g])}' for g in shown]
+        if len(order) > len(shown):
+            more = len(order) - len(shown)
+            lines.append(f"... and {more} more {'group' if more == 1 else 'groups'}")
+        return '\n'.join(lines)
+
     def get_llm_response(self, query: str) -> str:
-        if not self.ollama_available:
+
+        with self._stage('cache_lookup'):
+            cached = self.response_cache.get(self.llm.model, self._llm_context().key, query)
+        if cached is not None:
+            return cached
+
+        if not self._ollama_ready():
             return "Ollama is not running. Start Ollama with gemma:2b."
 
         try:
-            context = f"Dataset shape: {self.df.shape}, Columns: {list(self.df.columns)}"
-            payload = {
-                "model": "gemma:2b",
-                "prompt": f"You are a helpful assistant.\n\n{context}\n\nUser: {query}\n\nAssistant:",
-                "stream": False
-            }
-            res = requests.post(self.ollama_url, json=payload, timeout=30)
-            if res.status_code == 200:
-                return res.json().get('response', '')
-            return f'LLM error: {res.status_code}'
+            with self._stage('llm'):
+                prompt, options = self._llm_request(query)
+                response = self.llm.generate(prompt, **options)
+            self.response_cache.put(self.llm.model, self._llm_context().key, query, response)
+            return response
+        except OllamaError as e:
+            return f'LLM error: {e.status_code}'
         except Exception as e:
             return f'LLM exception: {str(e)}'
 
-    def process_user_input(self, query: str) -> Dict[str, Any]:
-        if self.df is None:
-            return {'success': False, 'message': 'No data loaded.', 'response_type': 'text'}
+    def stream_llm_response(self, query: str) -> Iterator[str]:
+        cached = self.response_cache.get(self.llm.model, self._llm_context().key, query)
+        if cached is not None:
+            yield cached
+            return
+
+        if not self._ollama_ready():
+            yield "Ollama is not running. Start Ollama with gemma:2b."
+            return
+
+        try:
+            parts = []
+            prompt, options = self._llm_request(query)
+            for token in self.llm.stream(prompt, **options):
+                parts.append(token)
+                yield token
+            self.response_cache.put(self.llm.model, self._llm_context().key, query, ''.join(parts))
+        except OllamaError as e:
+            yield f'LLM error: {e.status_code}'
+        except Exception as e:
+            yield f'LLM exception: {str(e)}'
+
+    def _llm_context(self) -> PromptContext:
+        # Built once per dataset and rebuilt only when the data changes; answers are cached under its key
+        dataset = (self.fingerprint, self.schema_fingerprint)
+        with self._prompt_lock:
+            if self._prompt_context is None or self._prompt_context.dataset != dataset:
+                with self._stage('digest'):
+                    digest = build_digest(self.summary_stats, self._category_counts(), self.llm_settings['digest_tokens'])
+                self._prompt_context = PromptContext(digest, dataset)
+            return self._prompt_context
+
+    def _llm_request(self, query: str) -> Tuple[str, Dict[str, Any]]:
+        # The model reads the digest once per dataset; later questions continue from Ollama's encoded context
+        context = self._llm_context()
+        options = {'keep_alive': self.llm_settings['keep_alive']}
+        with self._prompt_lock:
+            primed = context.primed.get(self.llm.model)
+            if primed is None:
+                try:
+                    primed = context.primed[self.llm.model] = self.llm.prime(context.priming_prompt(), **options)
+                except Exception:
+                    # Not remembered, so the next question tries again; this one sends the whole digest
+                    primed = []
+        if primed:
+            return query, dict(options, context=primed)
+        return context.prompt(query), options
 
-        self.chat_history.append({'user': query, 'timestamp': datetime.now().isoformat()})
-        intent = self.detect_intent(query)
+    def _category_counts(self) -> Dict[str, Optional[pd.Series]]:
+        # Value counts of each text column, or None for columns with more than max_distinct values
+        limit = self.llm_settings['max_distinct']
+        columns = self.summary_stats['categorical_columns']
+        if self.df is not None:
+            counts = {col: self._value_counts(col) for col in columns}
+            return {col: c if len(c) <= limit else None for col, c in counts.items()}
+
+        # Streaming mode: one pass over the text columns
+        counts = {col: pd.Series(dtype='int64') for col in columns}
+        if columns:
+            for chunk in self.backend.iter_chunks(self.source_path, self.chunksize, columns):
+                for col in columns:
+                    if counts[col] is not None:
+                        counts[col] = counts[col].add(chunk[col].value_counts(), fill_value=0)
+                        if len(counts[col]) > limit:
+                            counts[col] = None
+        return {col: c.astype('int64').sort_values(ascending=False, kind='stable') if c is not None else None
+                for col, c in counts.items()}
+
+    def _keep_chart(self, entry: ChatTurn, result: Dict[str, Any]):
+        if result.get('image_base64'):
+            entry.chart = self.charts.put(base64.b64decode(result['image_base64']))
+
+    def _record_stream(self, entry: ChatTurn, tokens: Iterator[str], trace: TurnTrace) -> Iterator[str]:
+        parts = []
+        with trace.stage('llm'):
+            for token in tokens:
+                parts.append(token)
+                yield token
+        entry.assistant = ''.join(parts)
+        self._record_timings(entry, trace)
+
+    def _stage(self, name: str):
+        # Timed only while process_user_input is tracing a turn
+        return self._trace.stage(name) if self._trace is not None else nullcontext()
+
+    def _record_timings(self, entry: ChatTurn, trace: TurnTrace):
+        entry.timings = trace.summary()
+        self.metrics.observe(entry.timings, entry.intent)
+
+    def process_user_input(self, query: str, stream: bool = False) -> Dict[str, Any]:
+        trace = TurnTrace()
+        self._trace = trace
+        try:
+            with trace.stage('wait_eda'):
+                self.wait_for_eda()
+            if self.watcher is not None:
+                with trace.stage('refresh'):
+                    self.refresh(force=True)
+            self.poll_exact()
+            if not self._has_data():
+                return {'success': False, 'message': 'No data loaded.', 'response_type': 'text'}
+
+            entry = ChatTurn(query, datetime.now().isoformat())
+            self.chat_history.append(entry)
+            with trace.stage('parse'):
+                parsed = self.parse_query(query)
+            entry.intent = parsed.intent
+            result = self._answer(query, parsed, entry, stream)
+        finally:
+            self._trace = None
+
+        if 'stream' in result:
+            # The caller drains 'stream'; the history entry is filled in once it is exhausted
+            result['stream'] = self._record_stream(entry, result['stream'], trace)
+        else:
+            self._record_timings(entry, trace)
+        return result
+
+    def _answer(self, query: str, parsed: ParsedQuery, entry: ChatTurn, stream: bool) -> Dict[str, Any]:
+        intent = parsed.intent
 
         if intent == 'chart':
-            result = self.generate_chart(query)
-            self.chat_history[-1]['assistant'] = result['message']
-            if result.get('image_base64'):
-                self.chat_history[-1]['chart'] = result['image_base64']
+            result = self.generate_chart(query, parsed)
+            entry.assistant = result['message']
+            self._keep_chart(entry, result)
             return result
 
         elif intent == 'statistical':
-            msg = self.get_statistical_answer(query)
-            self.chat_history[-1]['assistant'] = msg
+            with self._stage('compute'):
+                msg = self.get_statistical_answer(query, parsed)
+            entry.assistant = msg
             return {'success': True, 'message': msg, 'response_type': 'text'}
 
+        elif stream:
+            return {'success': True, 'message': '', 'stream': self.stream_llm_response(query), 'response_type': 'text'}
+
         else:
             msg = self.get_llm_response(query)
-            self.chat_history[-1]['assistant'] = msg
+            entry.assistant = msg
             return {'success': True, 'message': msg, 'response_type': 'text'}
 
+    def process_batch(self, queries: List[str], max_workers: int = 4,
+                      record_history: bool = False) -> List[Dict[str, Any]]:
+        """Answer many queries at once, returning results in input order.
+
+        Every query is parsed up front. Statistical queries are grouped by
+        column and each column is aggregated once for all of its operations,
+        each distinct chart is rendered once, and charts and LLM answers run
+        on a pool of `max_workers` threads.
+        """
+        self.wait_for_eda()
+        self.refresh()
+        if not self._has_data():
+            return [{'success': False, 'message': 'No data loaded.', 'response_type': 'text'} for _ in queries]
+
+        parsed = [self.parse_query(query) for query in queries]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+        stat_groups: Dict[str, List[int]] = {}
+        charts: Dict[int, Tuple[str, Optional[str]]] = {}
+        textual: List[int] = []
+
+        for i, (query, p) in enumerate(zip(queries, parsed)):
+            if p.intent == 'chart' and p.exact and self._sampled():
+                results[i] = self.generate_chart(query, p)
+            elif p.intent == 'chart':
+                charts[i] = self._chart_target(query, p)
+            elif p.intent == 'statistical':
+                single = p.group_by or p.filters or p.stat_op in ('percentile', 'median')
+                col = None if single else self._extract_column(query, p)
+                if col in self.summary_stats['numeric_columns']:
+                    stat_groups.setdefault(col, []).append(i)
+                else:
+                    # Grouped, filtered, quantiles and unknown or non-numeric columns; the single-query path answers those
+                    results[i] = {'success': True, 'message': self.get_statistical_answer(query, p), 'response_type': 'text'}
+            else:
+                textual.append(i)
+
+        for col, indices in stat_groups.items():
+            try:
+                values = self._aggregate(col, [parsed[i].stat_op for i in indices])
+                messages = [self._format_stat(col, parsed[i].stat_op, values) for i in indices]
+            except Exception as e:
+                messages = [f'Error calculating statistics: {str(e)}'] * len(indices)
+            for i, msg in zip(indices, messages):
+                results[i] = {'success': True, 'message': msg, 'response_type': 'text'}
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='batch') as pool:
+            rendered = {target: pool.submit(self.render_chart, *target) for target in set(charts.values())}
+            answers = {i: pool.submit(self.get_llm_response, queries[i]) for i in textual}
+            for i, target in charts.items():
+                results[i] = dict(rendered[target].result())
+            for i, future in answers.items():
+                results[i] = {'success': True, 'message': future.result(), 'response_type': 'text'}
+
+        if record_history:
+            for query, result in zip(queries, results):
+                entry = ChatTurn(query, datetime.now().isoformat(), assistant=result['message'])
+                self._keep_chart(entry, result)
+                self.chat_history.append(entry)
+        return results
+
     def get_summary_report(self) -> Dict[str, Any]:
-        if self.df is None:
+        if not self._has_data():
             return {'success': False, 'message': 'No data loaded'}
         return {'success': True, 'summary': self.summary_stats, 'chat_history': self.chat_history}
 
     def reset(self):
+        self.stop_watching()
+        self.cancel_load()
+        self._drop_lease()
         self.df = None
         self.summary_stats = {}
+        self.column_stats = {}
         self.chat_history = []
+        self.charts.clear()
+        self.streaming = False
+        self.source_path = None
+        self.fingerprint = None
+        self.schema_fingerprint = None
+        self._parser = None
+        self.group_indexes = GroupIndexes()
+        self.correlations = CorrelationCache()
+        self._shard_stats = None
+        self.sample = None
+        self._exact_jobs = []
+        self.eda_job = None
@@ -0,0 +1,233 @@
+import math
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Iterable
+
+
+class QuantileSketch:
+    """KLL quantile sketch over float values.
+
+    Keeps every value until `k` items have been seen, so small columns get
+    exact (pandas-identical) quantiles. Past that, compactors halve the
+    lowest levels and the rank error stays around 1.7 / k.
+    """
+
+    def __init__(self, k: int = 512, seed: Optional[int] = None):
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def exact(self) -> bool:
+        return len(self.levels) == 1
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        # Adding a level shrinks the capacity of every level below it, so sweep until stable
+        while True:
+            full = [level for level, items in enumerate(self.levels) if len(items) > self._capacity(level)]
+            if not full:
+                return
+            level = full[0]
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(self.levels[level])
+            leftover = items[-1:] if len(items) % 2 else items[:0]
+            paired = items[:len(items) - len(leftover)]
+            promoted = paired[int(self._rng.integers(2))::2]
+            self.levels[level] = leftover
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+    def update(self, values: np.ndarray):
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q: float) -> float:
+        if self.n == 0:
+            return np.nan
+        if self.exact:
+            return float(np.quantile(self.levels[0], q))
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        idx = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        return float(values[order][min(idx, len(values) - 1)])
+
+
+class ColumnAccumulator:
+    """Mergeable one-pass statistics for a numeric column.
+
+    Holds count, sum, the sum of squared deviations from the mean (Chan's
+    parallel form of the sum of squares, which keeps the variance stable for
+    large means), min, max and a quantile sketch.
+    """
+
+    def __init__(self, sketch_size: int = 512, seed: Optional[int] = None):
+        self.count = 0
+        self.total = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sketch = QuantileSketch(sketch_size, seed)
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, sketch_size: int = 512, seed: Optional[int] = None) -> 'ColumnAccumulator':
+        acc = cls(sketch_size, seed)
+        acc.update(values)
+        return acc
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        part = ColumnAccumulator(self.sketch.k)
+        part.count = len(values)
+        part.total = float(values.sum())
+        part.m2 = float(((values - part.total / part.count) ** 2).sum())
+        part.min = float(values.min())
+        part.max = float(values.max())
+        self._merge_moments(part)
+        self.sketch.update(values)
+
+    def _merge_moments(self, other: 'ColumnAccumulator'):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.total, self.m2 = other.count, other.total, other.m2
+        else:
+            count = self.count + other.count
+            delta = other.total / other.count - self.total / self.count
+            self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+            self.count = count
+            self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def merge(self, other: 'ColumnAccumulator') -> 'ColumnAccumulator':
+        self._merge_moments(other)
+        self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else np.nan
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance) if self.count > 1 else np.nan
+
+    @property
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    def quantile(self, q: float) -> float:
+        return self.sketch.quantile(q)
+
+    def describe(self) -> Dict[str, float]:
+        if self.count == 0:
+            return {k: np.nan for k in ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']}
+        return {
+            'count': float(self.count), 'mean': self.mean, 'std': self.std, 'min': self.min,
+            '25%': self.quantile(0.25), '50%': self.quantile(0.5), '75%': self.quantile(0.75), 'max': self.max
+        }
+
+
+def build_accumulators(df: pd.DataFrame, columns: Iterable[str]) -> Dict[str, ColumnAccumulator]:
+    """One vectorized pass per numeric column."""
+    return {col: ColumnAccumulator.from_values(df[col].to_numpy(dtype=float, na_value=np.nan), seed=0)
+            for col in columns}
+
+
+def merge_accumulators(parts: Iterable[Dict[str, ColumnAccumulator]]) -> Dict[str, ColumnAccumulator]:
+    merged: Dict[str, ColumnAccumulator] = {}
+    for part in parts:
+        for col, acc in part.items():
+            if col in merged:
+                merged[col].merge(acc)
+            else:
+                merged[col] = acc
+    return merged
+
+
+class CorrelationAccumulator:
+    """Pairwise-complete Pearson correlation that can be extended with new rows.
+
+    Keeps, for every pair of columns, the row count and the sums, squared
+    sums and cross products over the rows where both are present, the same
+    rows DataFrame.corr() uses. Values are shifted by the first batch's means
+    before summing, so large means do not cancel away the variance.
+
+    `dtype` is the precision of the per-batch products; float32 halves their
+    memory and roughly doubles their speed on wide tables, while the running
+    sums stay float64. Batches without missing values need one product
+    instead of four.
+    """
+
+    def __init__(self, columns: List[str], dtype=np.float64):
+        self.columns = list(columns)
+        self.dtype = np.dtype(dtype)
+        k = len(self.columns)
+        self.shift: Optional[np.ndarray] = None
+        self.n = np.zeros((k, k))
+        self.sx = np.zeros((k, k))
+        self.sxx = np.zeros((k, k))
+        self.sxy = np.zeros((k, k))
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            return
+        present = ~np.isnan(values)
+        if self.shift is None:
+            with np.errstate(invalid='ignore'):
+                self.shift = np.nan_to_num(np.nanmean(values, axis=0)) if present.any() else np.zeros(values.shape[1])
+        if present.all():
+            z = (values - self.shift).astype(self.dtype, copy=False)
+            sums = z.sum(axis=0, dtype=float)[:, None]
+            self.n += len(z)
+            self.sx += sums
+            self.sxx += np.einsum('ij,ij->j', z, z, dtype=float)[:, None]
+            self.sxy += z.T @ z
+            return
+        z = np.where(present, values - self.shift, 0.0).astype(self.dtype, copy=False)
+        mask = present.astype(self.dtype)
+        self.n += mask.T @ mask
+        self.sx += z.T @ mask  # sx[i, j]: sum of column i over rows where j is present too
+        self.sxx += (z * z).T @ mask
+        self.sxy += z.T @ z
+
+    def matrix(self) -> pd.DataFrame:
+        sy, syy = self.sx.T, self.sxx.T
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = self.n * self.sxy - self.sx * sy
+            var_x = self.n * self.sxx - self.sx ** 2
+            var_y = self.n * syy - sy ** 2
+            corr = cov / np.sqrt(var_x * var_y)
+        corr[(self.n < 2) | (var_x <= 0) | (var_y <= 0)] = np.nan
+        corr = np.clip(corr, -1, 1)
+        diagonal = np.diag(corr).copy()
+        np.fill_diagonal(corr, np.where(np.isnan(diagonal), np.nan, 1.0))
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
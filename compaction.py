@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Tuple, Any
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def memory_usage(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _lossless_float32(series: pd.Series) -> bool:
+    values = series.to_numpy()
+    narrowed = values.astype(np.float32).astype(values.dtype)
+    return bool(np.all((narrowed == values) | (np.isnan(values) & np.isnan(narrowed))))
+
+
+def compact_frame(df: pd.DataFrame, category_ratio: float = 0.5,
+                  arrow_strings: bool = False) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Shrink a frame's dtypes without changing any value.
+
+    Integers are downcast to the narrowest signed type that holds their range, floats
+    become float32 only when every value round-trips exactly, and text columns
+    whose distinct/row ratio is at most `category_ratio` become `category`.
+    With `arrow_strings` (and pyarrow installed) the remaining text columns
+    use pyarrow-backed strings.
+    """
+    before = memory_usage(df)
+    out = {}
+    converted = {}
+
+    for col in df.columns:
+        series = df[col]
+        new = series
+        if pd.api.types.is_bool_dtype(series.dtype):
+            pass
+        elif pd.api.types.is_integer_dtype(series.dtype) and isinstance(series.dtype, np.dtype):
+            new = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series.dtype) and series.dtype == np.float64:
+            if _lossless_float32(series):
+                new = series.astype(np.float32)
+        elif pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype):
+            if len(series) and series.nunique(dropna=True) / len(series) <= category_ratio:
+                new = series.astype('category')
+            elif arrow_strings and pyarrow is not None and series.map(type, na_action='ignore').eq(str).all():
+                new = series.astype('string[pyarrow]')
+
+        if new.dtype != series.dtype:
+            converted[col] = f'{series.dtype} -> {new.dtype}'
+        out[col] = new
+
+    compacted = pd.DataFrame(out, index=df.index)
+    return compacted, {'before_bytes': before, 'after_bytes': memory_usage(compacted), 'converted': converted}
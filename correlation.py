@@ -0,0 +1,97 @@
+import threading
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from column_stats import CorrelationAccumulator
+
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+def correlation_accumulator(chunks: Iterable[pd.DataFrame], columns: List[str],
+                            dtype=np.float64) -> CorrelationAccumulator:
+    """Pairwise-complete correlation sums of `columns` over frames read one chunk at a time.
+
+    Only one chunk is converted to a float block at a time, so memory stays
+    at chunk rows x columns however long the table is.
+    """
+    acc = CorrelationAccumulator(columns, dtype)
+    for chunk in chunks:
+        acc.update(np.column_stack([
+            pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=float, na_value=np.nan) for col in columns
+        ]))
+    return acc
+
+
+def frame_chunks(df: pd.DataFrame, columns: List[str], chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows][columns]
+
+
+class CorrelationCache:
+    """The correlation sums of one dataset, computed the first time anything asks for them.
+
+    Sessions sharing a dataset share one instance, so however many of them
+    ask, the matrix is computed once; the lock makes latecomers wait for the
+    first computation instead of starting their own.
+    """
+
+    def __init__(self, accumulator: Optional[CorrelationAccumulator] = None):
+        self._accumulator = accumulator
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._accumulator is not None
+
+    def get(self, build: Callable[[], CorrelationAccumulator]) -> CorrelationAccumulator:
+        with self._lock:
+            if self._accumulator is None:
+                self._accumulator = build()
+            return self._accumulator
+
+
+def top_pairs(corr: pd.DataFrame, k: int = 10, column: Optional[str] = None) -> List[Tuple[str, str, float]]:
+    """The k column pairs with the largest |r|, strongest first, as (a, b, r).
+
+    With `column`, only its pairs, so b is the column most correlated with it.
+    Pairs whose correlation is undefined are left out.
+    """
+    names = list(corr.columns)
+    values = corr.to_numpy()
+    if column is not None:
+        i = names.index(column)
+        rows, cols = np.full(len(names), i), np.arange(len(names))
+        keep = cols != i
+        rows, cols = rows[keep], cols[keep]
+    else:
+        rows, cols = np.triu_indices(len(names), 1)
+    r = values[rows, cols]
+    valid = ~np.isnan(r)
+    rows, cols, r = rows[valid], cols[valid], r[valid]
+    order = np.argsort(-np.abs(r), kind='stable')[:k]
+    return [(names[rows[i]], names[cols[i]], float(r[i])) for i in order]
+
+
+def relevant_columns(corr: pd.DataFrame, limit: int, column: Optional[str] = None) -> List[str]:
+    """Up to `limit` columns to show from a wide matrix, in their original order.
+
+    Columns are taken from the strongest pairs first, so a heatmap of a
+    hundred columns shows the ones with something to see. With `column`,
+    it and its strongest partners.
+    """
+    names = list(corr.columns)
+    if len(names) <= limit:
+        return names
+    chosen = [column] if column is not None else []
+    for a, b, _ in top_pairs(corr, len(names) ** 2, column):
+        for name in (a, b):
+            if name not in chosen and len(chosen) < limit:
+                chosen.append(name)
+        if len(chosen) >= limit:
+            break
+    # Columns with no defined correlation at all only fill leftover space
+    chosen += [name for name in names if name not in chosen][:limit - len(chosen)]
+    return sorted(chosen, key=names.index)
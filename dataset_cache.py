@@ -0,0 +1,134 @@
+import os
+import pickle
+import hashlib
+import threading
+import pandas as pd
+from typing import Dict, Optional, Any, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:
+    pa = None
+
+# What a truncated, corrupt or version-skewed entry can raise while being read back
+READ_ERRORS = (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError)
+if pa is not None:
+    READ_ERRORS += (pa.ArrowException,)
+
+
+class DatasetCache:
+    """On-disk cache of parsed datasets keyed by the SHA-256 of the raw upload.
+
+    Frames are stored as Arrow IPC files and memory-mapped back on a hit, so a
+    re-upload skips CSV/Excel parsing entirely. Without pyarrow, or for
+    columns Arrow cannot represent, the frame is pickled instead. The EDA
+    results are stored next to it. Least recently used entries are evicted
+    once the directory grows past `max_bytes`.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 2 * 1024 ** 3):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _paths(self, key: str) -> Dict[str, str]:
+        return {
+            'arrow': os.path.join(self.root, f'{key}.arrow'),
+            'pickle': os.path.join(self.root, f'{key}.frame.pkl'),
+            'stats': os.path.join(self.root, f'{key}.stats.pkl'),
+        }
+
+    def get(self, key: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        paths = self._paths(key)
+        try:
+            with open(paths['stats'], 'rb') as f:
+                stats = pickle.load(f)
+            if os.path.exists(paths['arrow']) and pa is not None:
+                with pa.memory_map(paths['arrow']) as source:
+                    df = pa.ipc.open_file(source).read_all().to_pandas()
+                used = paths['arrow']
+            else:
+                df = pd.read_pickle(paths['pickle'])
+                used = paths['pickle']
+        except READ_ERRORS:
+            # Whatever is left of a damaged entry is removed so the next load parses and rewrites it
+            self._discard(key)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            for path in [used, paths['stats']]:
+                os.utime(path)
+        except FileNotFoundError:
+            # Another session evicted the entry after it was read; treat it as gone
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return df, stats
+
+    def _discard(self, key: str):
+        for path in self._paths(key).values():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def put(self, key: str, df: pd.DataFrame, stats: Dict[str, Any]):
+        os.makedirs(self.root, exist_ok=True)
+        paths = self._paths(key)
+        written = False
+        if pa is not None:
+            try:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                tmp = paths['arrow'] + '.tmp'
+                with pa.OSFile(tmp, 'wb') as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+                os.replace(tmp, paths['arrow'])
+                written = True
+            except (pa.ArrowException, TypeError, ValueError):
+                pass
+        if not written:
+            df.to_pickle(paths['pickle'])
+
+        tmp = paths['stats'] + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(stats, f)
+        os.replace(tmp, paths['stats'])
+        self._evict()
+
+    def _evict(self):
+        entries: Dict[str, list] = {}
+        for name in os.listdir(self.root):
+            key = name.split('.')[0]
+            path = os.path.join(self.root, name)
+            try:
+                entry = (os.path.getmtime(path), os.path.getsize(path), path)
+            except FileNotFoundError:
+                continue  # removed by another session's eviction since listdir
+            entries.setdefault(key, []).append(entry)
+
+        total = sum(size for files in entries.values() for _, size, _ in files)
+        for key in sorted(entries, key=lambda k: max(m for m, _, _ in entries[k])):
+            if total <= self.max_bytes:
+                break
+            for _, size, path in entries[key]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
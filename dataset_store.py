@@ -0,0 +1,86 @@
+import threading
+import weakref
+import pandas as pd
+from typing import Dict, Optional, Any
+
+# Leases hand out shallow views, which is only safe with copy-on-write: always on from pandas 3, opt-in before
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+class DatasetLease:
+    """One session's hold on a shared dataset.
+
+    `frame()` returns a shallow view of the shared DataFrame. With pandas
+    copy-on-write any write to it copies the touched columns, so a session
+    can never change what the others see. The lease is released explicitly
+    or when it is garbage collected, e.g. when a browser session goes away.
+    """
+
+    def __init__(self, store: 'DatasetStore', key: str, df: pd.DataFrame, stats: Dict[str, Any]):
+        self.key = key
+        self.stats = stats
+        self._df = df
+        self._finalizer = weakref.finalize(self, store._release, key)
+
+    def frame(self) -> pd.DataFrame:
+        return self._df.copy(deep=False)
+
+    def release(self):
+        self._finalizer()
+
+
+class DatasetStore:
+    """Process-wide, reference-counted registry of loaded datasets.
+
+    Entries are keyed by the content hash of the data, so every session that
+    loads the same file shares one frame and its EDA results. An entry is
+    dropped as soon as its last lease is released.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str) -> Optional[DatasetLease]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry['refs'] += 1
+        return DatasetLease(self, key, entry['df'], entry['stats'])
+
+    def publish(self, key: str, df: pd.DataFrame, stats: Dict[str, Any]) -> DatasetLease:
+        # If another session published the same data first, share its copy and let ours go
+        size = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {'df': df, 'stats': stats, 'refs': 0, 'bytes': size}
+            entry['refs'] += 1
+        return DatasetLease(self, key, entry['df'], entry['stats'])
+
+    def _release(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry['refs'] -= 1
+            if entry['refs'] <= 0:
+                del self._entries[key]
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            'datasets': len(entries),
+            'leases': sum(e['refs'] for e in entries),
+            'bytes': sum(e['bytes'] for e in entries),
+        }
+
+
+SHARED_DATASETS = DatasetStore()
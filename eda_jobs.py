@@ -0,0 +1,58 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+
+EDA_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='eda')
+
+
+class EDAJob:
+    """Runs load and EDA stages in order on a worker thread.
+
+    Each stage publishes its results as soon as it finishes, so callers can
+    render what is `ready` and poll for the rest. A failing stage stops the
+    job and is reported through `error`; `cancel` stops it before the next stage.
+    """
+
+    def __init__(self, stages: List[Tuple[str, Callable[[], None]]],
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.stages = stages
+        self.ready: List[str] = []
+        self.error: Optional[str] = None
+        self._finished = threading.Event()
+        self._cancelled = threading.Event()
+        self._future = (executor or EDA_EXECUTOR).submit(self._run)
+
+    def _run(self):
+        try:
+            for name, stage in self.stages:
+                if self._cancelled.is_set():
+                    break
+                stage()
+                self.ready.append(name)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self._finished.set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._finished.wait(timeout)
+
+    def progress(self) -> Dict[str, Any]:
+        return {
+            'ready': list(self.ready),
+            'pending': [name for name, _ in self.stages if name not in self.ready],
+            'done': self.done,
+            'error': self.error
+        }
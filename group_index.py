@@ -0,0 +1,152 @@
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+
+class CategoryIndex:
+    """Factorized codes plus a code-sorted row index for one categorical column.
+
+    `codes[i]` is the group of row i (-1 for missing), and the rows of group g
+    are `order[offsets[g]:offsets[g + 1]]`, in ascending row order. Grouped
+    aggregates become bincount-style reductions over `codes`, and an equality
+    filter is a slice of `order`.
+    """
+
+    def __init__(self, codes: np.ndarray, labels):
+        self.codes = codes.astype(np.int32)
+        self.labels = [str(label) for label in labels]
+        valid = np.flatnonzero(self.codes >= 0)
+        self.order = valid[np.argsort(self.codes[valid], kind='stable')]
+        counts = np.bincount(self.codes[valid], minlength=len(self.labels))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self._lookup = {label.lower(): g for g, label in enumerate(self.labels)}
+
+    @classmethod
+    def of(cls, series: pd.Series) -> 'CategoryIndex':
+        return cls(*pd.factorize(series))
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def group(self, value: str) -> Optional[int]:
+        return self._lookup.get(str(value).lower())
+
+    def rows(self, op: str, value: str) -> np.ndarray:
+        g = self.group(value)
+        if op == '=':
+            return self.order[self.offsets[g]:self.offsets[g + 1]] if g is not None else np.empty(0, dtype=np.int64)
+        # Like SQL, missing values match neither = nor !=
+        return np.flatnonzero((self.codes >= 0) & (self.codes != (-1 if g is None else g)))
+
+
+class SortedIndex:
+    """Row ids of a numeric column sorted by value, for range filters by binary search."""
+
+    def __init__(self, values: np.ndarray):
+        valid = np.flatnonzero(~np.isnan(values))
+        self.ids = valid[np.argsort(values[valid], kind='stable')]
+        self.values = values[self.ids]
+
+    def rows(self, op: str, value: float) -> np.ndarray:
+        left = np.searchsorted(self.values, value, side='left')
+        right = np.searchsorted(self.values, value, side='right')
+        spans = {
+            '=': [(left, right)], '!=': [(0, left), (right, len(self.ids))],
+            '>': [(right, len(self.ids))], '>=': [(left, len(self.ids))],
+            '<': [(0, left)], '<=': [(0, right)],
+        }
+        return np.sort(np.concatenate([self.ids[lo:hi] for lo, hi in spans[op]]))
+
+
+class GroupIndexes:
+    """The group-by and filter indexes of one loaded dataset.
+
+    `build` indexes the categorical columns at load time; any other column is
+    indexed the first time a question groups or filters by it. Sessions
+    sharing a dataset share one instance, so every index is built once.
+    """
+
+    def __init__(self):
+        self.categories: Dict[str, CategoryIndex] = {}
+        self.sorted: Dict[str, SortedIndex] = {}
+        self._values: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def build(self, df: pd.DataFrame, columns: List[str], max_ratio: float = 0.5):
+        for col in columns:
+            codes, labels = pd.factorize(df[col])
+            # Near-unique text such as titles is not worth grouping by; it is indexed on demand if asked for
+            if len(labels) <= max(1, len(df) * max_ratio):
+                self.categories[col] = CategoryIndex(codes, labels)
+
+    def _cached(self, cache: Dict[str, object], col: str, build):
+        with self._lock:
+            if col in cache:
+                return cache[col]
+        value = build()
+        with self._lock:
+            return cache.setdefault(col, value)
+
+    def category(self, df: pd.DataFrame, col: str) -> CategoryIndex:
+        return self._cached(self.categories, col, lambda: CategoryIndex.of(df[col]))
+
+    def values(self, df: pd.DataFrame, col: str) -> np.ndarray:
+        return self._cached(self._values, col, lambda: df[col].to_numpy(dtype=float, na_value=np.nan))
+
+    def sorted_index(self, df: pd.DataFrame, col: str) -> SortedIndex:
+        return self._cached(self.sorted, col, lambda: SortedIndex(self.values(df, col)))
+
+
+def grouped_reduce(codes: np.ndarray, n_groups: int, values: Optional[np.ndarray], op: str,
+                   quantile: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduce `values` per group code with op; returns (result, rows per group).
+
+    Rows with code -1 or a NaN value are skipped. `values` may be None for 'count'.
+    'percentile' takes `quantile` as a fraction and interpolates linearly, like pandas.
+    """
+    keep = codes >= 0
+    if values is not None:
+        keep &= ~np.isnan(values)
+        values = values[keep]
+    codes = codes[keep]
+    counts = np.bincount(codes, minlength=n_groups)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if op == 'count':
+            return counts.astype(float), counts
+        sums = np.bincount(codes, weights=values, minlength=n_groups)
+        if op == 'sum':
+            return sums, counts
+        means = sums / counts
+        if op == 'mean':
+            return means, counts
+        if op in ('std', 'variance'):
+            # Two passes, sample variance, the same as ColumnAccumulator and pandas
+            squares = np.bincount(codes, weights=(values - means[codes]) ** 2, minlength=n_groups)
+            variance = np.where(counts > 1, squares / (counts - 1), np.nan)
+            return (np.sqrt(variance) if op == 'std' else variance), counts
+
+        # Sorting by (code, value) lays every group out as an ordered segment
+        order = np.lexsort((values, codes))
+        ordered = values[order]
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        ends = starts + counts - 1
+        result = np.full(n_groups, np.nan)
+        present = counts > 0
+        if op == 'min':
+            result[present] = ordered[starts[present]]
+        elif op == 'max':
+            result[present] = ordered[ends[present]]
+        elif op == 'median':
+            lo = starts + (counts - 1) // 2
+            hi = starts + counts // 2
+            result[present] = (ordered[lo[present]] + ordered[hi[present]]) / 2
+        elif op == 'percentile':
+            position = starts + (counts - 1) * quantile
+            lo, hi = np.floor(position).astype(np.int64), np.ceil(position).astype(np.int64)
+            low, high = ordered[lo[present]], ordered[hi[present]]
+            result[present] = low + (high - low) * (position[present] - lo[present])
+        else:
+            raise ValueError(f'Unsupported operation: {op}')
+        return result, counts
@@ -0,0 +1,275 @@
+import io
+import os
+import glob
+import hashlib
+import zipfile
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from chart_cache import file_fingerprint
+from column_stats import ColumnAccumulator, build_accumulators, merge_accumulators
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+
+READABLE_EXTENSIONS = ['csv', 'tsv', 'xlsx', 'json', 'jsonl', 'ndjson', 'parquet']
+
+
+@dataclass(frozen=True)
+class Shard:
+    """One part of a dataset: a file, a member of a zip archive, or one sheet of a workbook."""
+    path: str
+    member: Optional[str] = None
+    sheet: Optional[str] = None
+
+    @property
+    def ext(self) -> str:
+        return (self.member or self.path).split('.')[-1].lower()
+
+    @property
+    def name(self) -> str:
+        return ':'.join([os.path.basename(self.path)] + [p for p in (self.member, self.sheet) if p is not None])
+
+    def open(self):
+        if self.member is None:
+            return self.path
+        with zipfile.ZipFile(self.path) as archive:
+            return io.BytesIO(archive.read(self.member))
+
+
+def is_multi_source(path: str) -> bool:
+    """True for paths read as shards: a folder, a glob pattern, a zip archive or a workbook."""
+    return (os.path.isdir(path) or any(ch in path for ch in '*?[')
+            or path.split('.')[-1].lower() in ('zip', 'xlsx'))
+
+
+def _readable(name: str) -> bool:
+    base = os.path.basename(name)
+    return bool(base) and not base.startswith('.') and base.split('.')[-1].lower() in READABLE_EXTENSIONS + ['zip']
+
+
+def expand(path: str) -> List[Shard]:
+    """The shards behind a path, in a stable order: files by name, then members, then sheets."""
+    if os.path.isdir(path):
+        files = sorted(os.path.join(path, name) for name in os.listdir(path))
+    elif any(ch in path for ch in '*?['):
+        files = sorted(glob.glob(path))
+    else:
+        files = [path]
+
+    shards = []
+    for name in files:
+        if not os.path.isfile(name) or not _readable(name):
+            continue
+        ext = name.split('.')[-1].lower()
+        if ext == 'zip':
+            with zipfile.ZipFile(name) as archive:
+                members = sorted(m for m in archive.namelist() if _readable(m) and not m.startswith('__MACOSX/'))
+            for member in members:
+                shards += _sheets(Shard(name, member)) if member.lower().endswith('.xlsx') else [Shard(name, member)]
+        elif ext == 'xlsx':
+            shards += _sheets(Shard(name))
+        else:
+            shards.append(Shard(name))
+    if not shards:
+        raise ValueError(f"No {', '.join(READABLE_EXTENSIONS)} files found in {path}")
+    return shards
+
+
+def _sheets(shard: Shard) -> List[Shard]:
+    with pd.ExcelFile(shard.open()) as workbook:
+        return [Shard(shard.path, shard.member, sheet) for sheet in workbook.sheet_names]
+
+
+def fingerprint(shards: List[Shard]) -> str:
+    """Content hash of every file behind the shards, so an edited or added shard is a new dataset.
+
+    A single archive or workbook is keyed by its content alone, like a plain
+    file, so an upload saved under a new temp name still matches its cache entry.
+    """
+    paths = sorted({shard.path for shard in shards})
+    if len(paths) == 1 and os.path.isfile(paths[0]) and paths[0].split('.')[-1].lower() in ('zip', 'xlsx'):
+        return file_fingerprint(paths[0])
+    digest = hashlib.sha256(b'shards')
+    for path in paths:
+        digest.update(f'{os.path.basename(path)}:{file_fingerprint(path)}'.encode())
+    return digest.hexdigest()
+
+
+def _read_csv_arrow(source, sep: str) -> pd.DataFrame:
+    table = pa_csv.read_csv(source, parse_options=pa_csv.ParseOptions(delimiter=sep),
+                            convert_options=pa_csv.ConvertOptions(strings_can_be_null=True))
+    # Arrow parses ISO dates and timestamps; the C parser leaves them as text, and so does this.
+    # An all-empty column is null-typed in Arrow; the C parser reads it as float NaN.
+    columns = [col.cast(pa.string()) if pa.types.is_temporal(col.type)
+               else col.cast(pa.float64()) if pa.types.is_null(col.type) else col
+               for col in table.columns]
+    return pa.table(columns, names=table.column_names).to_pandas()
+
+
+def read_frame(source, ext: str, sheet: Optional[str] = None) -> pd.DataFrame:
+    """Parse one file, or an open zip member, the way load_data always has; CSV goes through pyarrow when installed."""
+    if ext in ('csv', 'tsv'):
+        sep = '\t' if ext == 'tsv' else ','
+        if pa is not None:
+            try:
+                return _read_csv_arrow(source, sep)
+            except pa.ArrowInvalid:
+                if hasattr(source, 'seek'):
+                    source.seek(0)  # quirks the C parser tolerates, such as ragged quoting
+        return pd.read_csv(source, sep=sep)
+    if ext == 'xlsx':
+        return pd.read_excel(source, sheet_name=sheet if sheet is not None else 0)
+    if ext == 'json':
+        return pd.read_json(source)
+    if ext in ('jsonl', 'ndjson'):
+        return pd.read_json(source, lines=True)
+    if ext == 'parquet':
+        return pd.read_parquet(source)
+    raise ValueError(f"Unsupported file type: {ext}")
+
+
+def read_shard(shard: Shard) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Parse a shard and compute its part of the EDA: row count, null counts and numeric accumulators."""
+    df = read_frame(shard.open(), shard.ext, shard.sheet)
+    numeric = df.select_dtypes(include=[np.number]).columns.tolist()
+    return df, {'rows': len(df), 'null_counts': df.isnull().sum().to_dict(), 'numeric': build_accumulators(df, numeric)}
+
+
+class ShardReader:
+    """Parses shards on a pool of worker processes, the same way ChartRenderer draws charts.
+
+    With one shard, one worker, or less than `min_pool_bytes` of files (where
+    starting workers and sending frames back costs more than it saves) they
+    are read in the calling process. If the pool breaks the read is retried
+    there and a fresh pool is started on the next load. With
+    `processes=False` a thread pool is used instead, for every size.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, min_pool_bytes: int = 32 * 1024 * 1024,
+                 processes: bool = True):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_pool_bytes = min_pool_bytes
+        self.processes = processes
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def use_processes(self, enabled: bool = True):
+        """Switch between worker processes and threads, like ChartRenderer.use_processes."""
+        with self._lock:
+            if enabled != self.processes and self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+            self.processes = enabled
+
+    def _executor(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if not self.processes:
+                    self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix='shard')
+                elif 'forkserver' in multiprocessing.get_all_start_methods():
+                    # The fork server is shared with the chart pool; whichever starts it first picks the preloads
+                    context = multiprocessing.get_context('forkserver')
+                    context.set_forkserver_preload(['ingest'])
+                else:
+                    context = multiprocessing.get_context('spawn')
+                self._pool = ProcessPoolExecutor(self.max_workers, mp_context=context)
+            return self._pool
+
+    def read(self, shards: List[Shard]) -> List[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        size = sum(os.path.getsize(path) for path in {shard.path for shard in shards})
+        if len(shards) == 1 or self.max_workers == 1 or (self.processes and size < self.min_pool_bytes):
+            return [read_shard(shard) for shard in shards]
+        try:
+            return list(self._executor().map(read_shard, shards))
+        except BrokenProcessPool:
+            with self._lock:
+                self._pool = None
+            return [read_shard(shard) for shard in shards]
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+
+# Threads by default, so importing scripts need no main guard; app.py opts into worker processes
+SHARD_READER = ShardReader(processes=False)
+
+
+def _canonical(name) -> str:
+    return str(name).strip().lower()
+
+
+def reconcile(parts: List[Tuple[pd.DataFrame, Dict[str, Any]]]) -> List[Tuple[pd.DataFrame, Dict[str, Any]]]:
+    """Line the shards' schemas up so they concatenate into one frame.
+
+    Column names that differ only in case or surrounding spaces take the
+    spelling of the first shard that has them. A column that is numeric in
+    some shards and text in others is converted to numbers in the text
+    shards when every value parses; otherwise it stays text everywhere.
+    """
+    spelling: Dict[str, Any] = {}
+    renamed = []
+    for df, stats in parts:
+        names = {}
+        for col in df.columns:
+            key = _canonical(col)
+            spelling.setdefault(key, col)
+            names[col] = spelling[key]
+        if len(set(names.values())) == len(names):
+            df = df.rename(columns=names)
+            stats = dict(stats, null_counts={names[c]: n for c, n in stats['null_counts'].items()},
+                         numeric={names[c]: acc for c, acc in stats['numeric'].items()})
+        renamed.append((df, stats))
+
+    numeric_somewhere = {col for _, stats in renamed for col in stats['numeric']}
+    reconciled = []
+    for df, stats in renamed:
+        for col in numeric_somewhere & set(df.columns) - set(stats['numeric']):
+            if pd.api.types.is_bool_dtype(df[col].dtype):
+                continue
+            values = pd.to_numeric(df[col], errors='coerce')
+            if values.isna().sum() == df[col].isna().sum():
+                df = df.assign(**{col: values})
+                stats = dict(stats, numeric=dict(stats['numeric'], **build_accumulators(df, [col])))
+        reconciled.append((df, stats))
+    return reconciled
+
+
+def combine(parts: List[Tuple[pd.DataFrame, Dict[str, Any]]]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Concatenate reconciled shards and merge their EDA parts instead of recomputing them.
+
+    Returns the frame and {'null_counts', 'numeric'}: null counts over every
+    column (a shard without a column counts as all missing there) and one
+    merged accumulator per column that is numeric in the combined frame.
+    """
+    parts = [(df, stats) for df, stats in reconcile(parts) if len(df.columns)]
+    if not parts:
+        raise ValueError('The data files contain no columns')
+    df = pd.concat([part for part, _ in parts], ignore_index=True, sort=False)
+
+    null_counts = {col: sum(stats['null_counts'].get(col, stats['rows']) for _, stats in parts) for col in df.columns}
+    merged = merge_accumulators(stats['numeric'] for _, stats in parts)
+    numeric: Dict[str, ColumnAccumulator] = {
+        col: merged[col] if col in merged else build_accumulators(df, [col])[col]
+        for col in df.select_dtypes(include=[np.number]).columns
+    }
+    return df, {'null_counts': null_counts, 'numeric': numeric}
+
+
+def load(shards: List[Shard], reader: Optional[ShardReader] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Parse the shards concurrently and combine them into one dataset."""
+    return combine((reader or SHARD_READER).read(shards))
@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import bisect
+import threading
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# Upper bounds, in seconds, of the Prometheus histogram buckets
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def rss_bytes() -> Optional[int]:
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class TurnTrace:
+    """Per-stage timers and resident-memory deltas for one chat turn.
+
+    Stages can nest; each one is charged only for the time and memory not
+    spent in the stages inside it, so the stage times add up to the turn.
+    A stage entered several times accumulates.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._stack: List[List[float]] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        start, memory = time.perf_counter(), rss_bytes()
+        frame = [0.0, 0]  # time and memory spent in nested stages
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - start
+            delta = rss_bytes() - memory if memory is not None else 0
+            if self._stack:
+                self._stack[-1][0] += elapsed
+                self._stack[-1][1] += delta
+            totals = self.stages.setdefault(name, {'seconds': 0.0, 'memory_bytes': 0})
+            totals['seconds'] += elapsed - frame[0]
+            totals['memory_bytes'] += delta - frame[1]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'total_seconds': time.perf_counter() - self.started,
+            'stages': {name: dict(values) for name, values in self.stages.items()},
+        }
+
+
+class StageMetrics:
+    """Process-wide latency histograms fed with every turn's trace.
+
+    Keeps cumulative Prometheus-style bucket counters plus a rolling window
+    of the last `window` observations per stage for percentiles. With
+    `json_log` set, every turn is also appended to that file as one JSON line.
+    """
+
+    def __init__(self, window: int = 1000, buckets=STAGE_BUCKETS, json_log: Optional[str] = None):
+        self.window = window
+        self.buckets = tuple(buckets)
+        self.json_log = json_log
+        self._recent: Dict[str, deque] = {}
+        self._counts: Dict[str, List[int]] = {}
+        self._sums: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _observe(self, stage: str, seconds: float):
+        if stage not in self._recent:
+            self._recent[stage] = deque(maxlen=self.window)
+            self._counts[stage] = [0] * (len(self.buckets) + 1)
+            self._sums[stage] = 0.0
+        self._recent[stage].append(seconds)
+        self._counts[stage][bisect.bisect_left(self.buckets, seconds)] += 1
+        self._sums[stage] += seconds
+
+    def observe(self, timings: Dict[str, Any], intent: Optional[str] = None):
+        with self._lock:
+            self._observe('total', timings['total_seconds'])
+            for stage, values in timings['stages'].items():
+                self._observe(stage, values['seconds'])
+
+        if self.json_log:
+            record = {'time': time.time(), 'intent': intent}
+            record.update(timings)
+            try:
+                with open(self.json_log, 'a') as f:
+                    f.write(json.dumps(record) + '\n')
+            except OSError:
+                pass
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            recent = {stage: np.array(values) for stage, values in self._recent.items()}
+        return {
+            stage: {
+                'count': len(values),
+                'mean': float(values.mean()),
+                'p50': float(np.percentile(values, 50)),
+                'p95': float(np.percentile(values, 95)),
+                'p99': float(np.percentile(values, 99)),
+            }
+            for stage, values in recent.items() if len(values)
+        }
+
+    def to_prometheus(self) -> str:
+        lines = [
+            '# HELP insightbot_stage_seconds Time spent per chat turn stage.',
+            '# TYPE insightbot_stage_seconds histogram',
+        ]
+        with self._lock:
+            for stage in sorted(self._counts):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), self._counts[stage]):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'insightbot_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'insightbot_stage_seconds_sum{{stage="{stage}"}} {self._sums[stage]}')
+                lines.append(f'insightbot_stage_seconds_count{{stage="{stage}"}} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = StageMetrics(json_log=os.environ.get('INSIGHTBOT_METRICS_LOG'))
+
+_servers: Dict[int, ThreadingHTTPServer] = {}
+_servers_lock = threading.Lock()
+
+
+def serve_metrics(port: int, metrics: StageMetrics = METRICS, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """Serve `metrics` as Prometheus text on http://host:port/metrics from a daemon thread.
+
+    Calling it again for the same port returns the running server, so it is
+    safe from a Streamlit script that reruns on every interaction.
+    """
+    with _servers_lock:
+        if port in _servers:
+            return _servers[port]
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True, name='metrics').start()
+        _servers[port] = server
+        return server
@@ -0,0 +1,202 @@
+import io
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from compaction import _lossless_float32
+
+
+APPENDABLE_EXTENSIONS = ['csv', 'tsv', 'jsonl', 'ndjson']
+
+
+def complete_length(path: str, block_size: int = 1 << 16) -> int:
+    """Bytes of `path` up to and including its last newline, i.e. the part made of complete rows."""
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(0, end - block_size)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b'\n')
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return 0
+
+
+class FileReset(Exception):
+    """The watched file shrank or was rewritten, so its new rows cannot be told apart."""
+
+
+class AppendReader:
+    """Reads the rows appended to a CSV, TSV or JSON Lines file since the last call.
+
+    Remembers the byte offset just past the last complete line, so a row
+    still being written is picked up by the next read. CSV and TSV rows are
+    parsed with the header from the file's first line.
+    """
+
+    def __init__(self, path: str, offset: int = 0):
+        self.path = path
+        self.ext = path.split('.')[-1].lower()
+        if self.ext not in APPENDABLE_EXTENSIONS:
+            raise ValueError(f"Appending is not supported for .{self.ext} files")
+        self.offset = offset
+        self.header: Optional[bytes] = None
+
+    def _read_header(self, f) -> bytes:
+        f.seek(0)
+        return f.readline()
+
+    def read_new(self) -> Optional[pd.DataFrame]:
+        """New complete rows since the last call, or None when nothing was appended."""
+        size = os.path.getsize(self.path)
+        if size < self.offset:
+            raise FileReset(f"{self.path} shrank from {self.offset} to {size} bytes")
+        if size == self.offset:
+            return None
+
+        with open(self.path, 'rb') as f:
+            if self.ext in ('csv', 'tsv'):
+                header = self._read_header(f)
+                if not header.endswith(b'\n'):
+                    return None  # the header itself is still being written
+                if self.header is not None and header != self.header:
+                    raise FileReset(f"{self.path} was rewritten with a different header")
+                self.header = header
+                self.offset = max(self.offset, len(header))
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return None
+        self.offset += end
+        data = data[:end]
+        if not data.strip():
+            return None
+
+        if self.ext in ('jsonl', 'ndjson'):
+            return pd.read_json(io.BytesIO(data), lines=True)
+        sep = '\t' if self.ext == 'tsv' else ','
+        return pd.read_csv(io.BytesIO(self.header + data), sep=sep)
+
+
+class FileWatcher:
+    """Polls a file, or every appendable file in a directory, for new rows.
+
+    A daemon thread checks sizes every `interval` seconds and parses what was
+    appended; parsed frames queue up until `drain` collects them, so the
+    caller merges them on its own thread. A watched file starts at `offset`.
+    In a directory, files present when watching starts are skipped from
+    their current end, and files created later are read from the start.
+    Errors stop the thread and are reported through `error`.
+    """
+
+    def __init__(self, path: str, interval: float = 2.0, offset: Optional[int] = None):
+        self.path = path
+        self.interval = interval
+        self.error: Optional[str] = None
+        self.rows_seen = 0
+        self._readers: Dict[str, AppendReader] = {}
+        self._pending: List[pd.DataFrame] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        if os.path.isdir(path):
+            for name in self._appendable():
+                self._readers[name] = AppendReader(name, os.path.getsize(name))
+        else:
+            self._readers[path] = AppendReader(path, os.path.getsize(path) if offset is None else offset)
+        self._thread = threading.Thread(target=self._run, daemon=True, name='file-watcher')
+        self._thread.start()
+
+    def _appendable(self) -> List[str]:
+        names = sorted(os.listdir(self.path))
+        return [os.path.join(self.path, name) for name in names
+                if name.split('.')[-1].lower() in APPENDABLE_EXTENSIONS and not name.startswith('.')]
+
+    def poll(self) -> int:
+        """Check for new rows once; returns how many were queued."""
+        if os.path.isdir(self.path):
+            for name in self._appendable():
+                if name not in self._readers:
+                    self._readers[name] = AppendReader(name)
+        added = 0
+        for reader in self._readers.values():
+            rows = reader.read_new()
+            if rows is not None and len(rows):
+                with self._lock:
+                    self._pending.append(rows)
+                    self.rows_seen += len(rows)
+                added += len(rows)
+        return added
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                self.error = str(e)
+                return
+
+    def drain(self) -> List[pd.DataFrame]:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        return pending
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def stop(self):
+        self._stop.set()
+
+
+def conform(rows: pd.DataFrame, dtypes: pd.Series) -> pd.DataFrame:
+    """Cast freshly parsed rows to the dtypes of the frame they are appended to.
+
+    A small batch infers its own dtypes (int64 where the frame holds float
+    with nulls, text where it holds dates, new labels for a category), so
+    without this every append would widen or scramble the frame's columns.
+    Values that do not fit are left for pd.concat to widen.
+    """
+    rows = rows.reindex(columns=dtypes.index)
+    out = {}
+    for col, dtype in dtypes.items():
+        series = rows[col]
+        if series.dtype == dtype:
+            out[col] = series
+        elif isinstance(dtype, pd.CategoricalDtype):
+            new = pd.Index(series.dropna().unique()).difference(dtype.categories)
+            out[col] = series.astype(pd.CategoricalDtype(dtype.categories.append(new)))
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            out[col] = pd.to_datetime(series, errors='coerce')
+        elif pd.api.types.is_integer_dtype(dtype) and pd.api.types.is_integer_dtype(series.dtype):
+            info = np.iinfo(dtype)
+            fits = not len(series) or (info.min <= series.min() and series.max() <= info.max)
+            out[col] = series.astype(dtype) if fits else series
+        elif pd.api.types.is_float_dtype(dtype) and pd.api.types.is_numeric_dtype(series.dtype):
+            widened = series.astype(float)
+            lossless = dtype != np.float32 or _lossless_float32(widened)
+            out[col] = widened.astype(dtype) if lossless else widened
+        elif pd.api.types.is_string_dtype(dtype) and not pd.api.types.is_numeric_dtype(series.dtype):
+            out[col] = series.astype(dtype)
+        else:
+            out[col] = series
+    return pd.DataFrame(out, index=rows.index)
+
+
+def append_frame(df: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    """`df` with `rows` appended, keeping df's dtypes wherever the new values fit."""
+    rows = conform(rows, df.dtypes)
+    columns = {}
+    for col in df.columns:
+        old = df[col]
+        if isinstance(old.dtype, pd.CategoricalDtype) and rows[col].dtype != old.dtype:
+            # Categoricals only concatenate as categoricals when their categories match
+            old = old.cat.set_categories(rows[col].dtype.categories)
+        columns[col] = old
+    return pd.concat([pd.DataFrame(columns, index=df.index), rows], ignore_index=True)
@@ -0,0 +1,221 @@
+import json
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Iterator, AsyncIterator
+
+
+class OllamaError(Exception):
+    def __init__(self, status_code: int, message: str = ''):
+        super().__init__(message or f'Ollama returned HTTP {status_code}')
+        self.status_code = status_code
+
+
+class OllamaClient:
+    """Ollama /api/generate client over one pooled requests.Session.
+
+    Connections are kept alive between questions, and `stream` yields the
+    response text as Ollama's NDJSON chunks arrive. requests is imported and
+    the session opened on the first request, not at construction.
+    """
+
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "gemma:2b",
+                 timeout: float = 30, pool_size: int = 8):
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                self._session.mount('http://', adapter)
+                self._session.mount('https://', adapter)
+            return self._session
+
+    def is_available(self, timeout: float = 5) -> bool:
+        import requests
+        try:
+            res = self.session.get(f"{self.base_url}/api/tags", timeout=timeout)
+            return res.status_code == 200
+        except requests.RequestException:
+            return False
+
+    def _payload(self, prompt: str, stream: bool, options: Dict[str, Any]) -> Dict[str, Any]:
+        payload = {"model": self.model, "prompt": prompt, "stream": stream}
+        payload.update(options)
+        return payload
+
+    def generate(self, prompt: str, **options) -> str:
+        res = self.session.post(f"{self.base_url}/api/generate", json=self._payload(prompt, False, options),
+                                timeout=self.timeout)
+        if res.status_code != 200:
+            raise OllamaError(res.status_code)
+        return res.json().get('response', '')
+
+    def prime(self, prompt: str, **options) -> List[int]:
+        """Have the model read `prompt` and return Ollama's encoded conversation, to pass as `context` later.
+
+        Empty when the server returns no context.
+        """
+        options.setdefault('options', {'num_predict': 1})
+        res = self.session.post(f"{self.base_url}/api/generate", json=self._payload(prompt, False, options),
+                                timeout=self.timeout)
+        if res.status_code != 200:
+            raise OllamaError(res.status_code)
+        return res.json().get('context') or []
+
+    def stream(self, prompt: str, **options) -> Iterator[str]:
+        with self.session.post(f"{self.base_url}/api/generate", json=self._payload(prompt, True, options),
+                               timeout=self.timeout, stream=True) as res:
+            if res.status_code != 200:
+                raise OllamaError(res.status_code)
+            for line in res.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if 'error' in chunk:
+                    raise OllamaError(res.status_code, chunk['error'])
+                if chunk.get('response'):
+                    yield chunk['response']
+                if chunk.get('done'):
+                    break
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+class OllamaStatus:
+    """Whether an Ollama server is up, probed in the background and cached.
+
+    Reading `available` never blocks: it returns the last probe's answer
+    (False until the first one finishes) and, when that answer is older than
+    `refresh_seconds`, starts a new probe on a daemon thread. Sessions share
+    one status per server through `ollama_status`.
+    """
+
+    def __init__(self, client: OllamaClient, refresh_seconds: float = 30):
+        self.client = client
+        self.refresh_seconds = refresh_seconds
+        self._available = False
+        self._checked: Optional[float] = None
+        self._probing: Optional[threading.Event] = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        self.refresh()
+        return self._available
+
+    @property
+    def checked(self) -> bool:
+        return self._checked is not None
+
+    def refresh(self, force: bool = False) -> threading.Event:
+        """Start a probe unless one is running or the last answer is still fresh; returns an Event set when done."""
+        with self._lock:
+            if self._probing is not None:
+                return self._probing
+            done = threading.Event()
+            if not force and self._checked is not None and time.monotonic() - self._checked < self.refresh_seconds:
+                done.set()
+                return done
+            self._probing = done
+        threading.Thread(target=self._probe, args=(done,), daemon=True, name='ollama-probe').start()
+        return done
+
+    def _probe(self, done: threading.Event):
+        available = False
+        try:
+            available = self.client.is_available()
+        finally:
+            with self._lock:
+                self._available = available
+                self._checked = time.monotonic()
+                self._probing = None
+            done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until a probe has answered, or `timeout` passes; returns the status."""
+        if not self.checked:
+            self.refresh().wait(timeout)
+        return self._available
+
+
+_statuses: Dict[str, OllamaStatus] = {}
+_statuses_lock = threading.Lock()
+
+
+def ollama_status(client: OllamaClient) -> OllamaStatus:
+    """The shared status of the server `client` talks to, probing it for the first time in the background."""
+    with _statuses_lock:
+        status = _statuses.get(client.base_url)
+        if status is None:
+            status = _statuses[client.base_url] = OllamaStatus(client)
+    status.refresh()
+    return status
+
+
+class AsyncOllamaClient:
+    """asyncio front end for OllamaClient.
+
+    Each request runs on a bounded thread pool sharing the pooled session, so
+    several chat sessions can generate or stream at the same time without
+    blocking the event loop.
+    """
+
+    def __init__(self, client: Optional[OllamaClient] = None, max_concurrency: int = 8):
+        self.client = client or OllamaClient(pool_size=max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='ollama')
+
+    async def is_available(self) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.client.is_available)
+
+    async def generate(self, prompt: str, **options) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: self.client.generate(prompt, **options))
+
+    async def stream(self, prompt: str, **options) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        cancelled = threading.Event()
+
+        def pump():
+            try:
+                for token in self.client.stream(prompt, **options):
+                    if cancelled.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, token)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        loop.run_in_executor(self._executor, pump)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.client.close()
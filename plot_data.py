@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Largest-Triangle-Three-Buckets downsampling of a line to `n_out` points."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.floor(np.linspace(1, n - 1, n_out - 1)).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            avg_x, avg_y = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return x[selected], y[selected]
+
+
+def line_points(series: pd.Series, max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    values = series.to_numpy(dtype=float, na_value=np.nan)
+    x = np.arange(len(values), dtype=float)
+    mask = ~np.isnan(values)
+    return lttb(x[mask], values[mask], max_points)
+
+
+def minmax_points(chunks: Iterable[np.ndarray], rows: int, max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Min/max decimation of a line read in chunks, for streaming mode.
+
+    The rows are split into about `max_points / 2` equal buckets and only the
+    lowest and highest point of each is kept, so peaks survive and memory
+    stays at O(max_points) whatever the length. Missing values are skipped;
+    x is the row number, as in `line_points`.
+    """
+    width = max(-(-rows // max(max_points // 2, 1)), 1)
+    buckets = max(-(-rows // width), 1)
+    low_y, high_y = np.full(buckets, np.inf), np.full(buckets, -np.inf)
+    low_x, high_x = np.zeros(buckets, dtype=np.int64), np.zeros(buckets, dtype=np.int64)
+    offset = 0
+    for values in chunks:
+        x = np.arange(offset, offset + len(values))
+        offset += len(values)
+        mask = ~np.isnan(values)
+        x, values = x[mask], values[mask]
+        bucket = np.minimum(x // width, buckets - 1)
+        # Ordered by (bucket, value), each bucket's lowest point comes first and its highest last
+        order = np.lexsort((values, bucket))
+        bucket, x, values = bucket[order], x[order], values[order]
+        starts = np.r_[True, bucket[1:] != bucket[:-1]]
+        ends = np.r_[bucket[1:] != bucket[:-1], True]
+        for pick, best_y, best_x, better in [(starts, low_y, low_x, np.less), (ends, high_y, high_x, np.greater)]:
+            b, y, px = bucket[pick], values[pick], x[pick]
+            won = better(y, best_y[b])
+            best_y[b[won]], best_x[b[won]] = y[won], px[won]
+
+    seen = np.isfinite(low_y)
+    x = np.concatenate([low_x[seen], high_x[seen]])
+    y = np.concatenate([low_y[seen], high_y[seen]])
+    x, first = np.unique(x, return_index=True)
+    return x.astype(float), y[first]
+
+
+def box_stats(chunks: Iterable[np.ndarray], quartiles: Tuple[float, float, float], mean: float, count: int,
+              label: str, max_fliers: int) -> List[Dict[str, Any]]:
+    """What `matplotlib.cbook.boxplot_stats` returns, from known quartiles and one pass over the values.
+
+    The whiskers follow matplotlib's 1.5 IQR rule. Of the outliers only the
+    `max_fliers` most extreme on each side are kept, so a long column with
+    many of them stays bounded in memory.
+    """
+    q1, med, q3 = quartiles
+    iqr = q3 - q1
+    low_limit, high_limit = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    whislo, whishi = np.inf, -np.inf
+    low, high = np.empty(0), np.empty(0)
+    for values in chunks:
+        inside = values[(values >= low_limit) & (values <= high_limit)]
+        if len(inside):
+            whislo, whishi = min(whislo, inside.min()), max(whishi, inside.max())
+        low = np.sort(np.concatenate([low, values[values < low_limit]]))[:max_fliers]
+        high = np.sort(np.concatenate([high, values[values > high_limit]]))[::-1][:max_fliers][::-1]
+    return [{
+        'label': label, 'mean': mean, 'med': med, 'q1': q1, 'q3': q3, 'iqr': iqr,
+        'whislo': q1 if whislo > q1 else whislo, 'whishi': q3 if whishi < q3 else whishi,
+        'fliers': np.concatenate([low, high]),
+        'cilo': med - 1.57 * iqr / np.sqrt(count), 'cihi': med + 1.57 * iqr / np.sqrt(count),
+    }]
+
+
+def scatter_bins(x: np.ndarray, y: np.ndarray, max_points: int,
+                 bounds: Optional[List[Tuple[float, float]]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """2-D histogram with about `max_points` cells, used in place of one marker per row.
+
+    With `bounds` ([(x_min, x_max), (y_min, y_max)]) the cells are fixed, so
+    counts from separate chunks of rows can be added up.
+    """
+    side = max(int(np.sqrt(max_points)), 2)
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=side, range=bounds)
+    return counts, x_edges, y_edges
+
+
+def top_k_counts(counts: pd.Series, k: int, other_label: str = 'Other') -> pd.Series:
+    """Keep the `k` largest value counts and fold the rest into one bucket."""
+    counts = counts[counts > 0]
+    if len(counts) <= k:
+        return counts
+    top = counts.iloc[:k].copy()
+    top.index = top.index.astype(object)
+    top[other_label] = counts.iloc[k:].sum()
+    return top
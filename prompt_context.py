@@ -0,0 +1,124 @@
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from correlation import top_pairs
+
+
+# From most to least detailed; the digest uses the first level that fits the token budget
+DETAIL_LEVELS = [
+    {'stats': ('mean', 'std', 'min', '50%', 'max'), 'top': 5, 'pairs': 3},
+    {'stats': ('mean', 'min', 'max'), 'top': 3, 'pairs': 1},
+    {'stats': ('mean',), 'top': 1, 'pairs': 0},
+    {'stats': (), 'top': 0, 'pairs': 0},
+]
+
+STAT_NAMES = {'mean': 'mean', 'std': 'std', 'min': 'min', '50%': 'median', 'max': 'max'}
+
+INSTRUCTIONS = 'You are a helpful data analysis assistant. Answer questions about this dataset.'
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English text and numbers
+    return (len(text) + 3) // 4
+
+
+def _number(value: float) -> str:
+    if not np.isfinite(value):
+        return 'n/a'
+    return f'{value:,.0f}' if abs(value) >= 1000 else f'{value:.4g}'
+
+
+def _type_name(summary_stats: Dict[str, Any], col: str) -> str:
+    if col in summary_stats['numeric_columns']:
+        return 'int' if pd.api.types.is_integer_dtype(summary_stats['data_types'][col]) else 'float'
+    if col in summary_stats['datetime_columns']:
+        return 'date'
+    if col in summary_stats['categorical_columns']:
+        return 'text'
+    return str(summary_stats['data_types'][col])
+
+
+def _column_line(summary_stats: Dict[str, Any], col: str, counts: Optional[pd.Series], level: Dict[str, Any]) -> str:
+    parts = [_type_name(summary_stats, col)]
+    missing = summary_stats['null_percentage'].get(col, 0)
+    if missing:
+        parts.append(f'{missing:.0f}% missing')
+    stats = summary_stats.get('numeric_stats', {}).get(col)
+    if stats is not None:
+        estimated = col in summary_stats.get('estimated_quantiles', ())
+        parts += [f"{STAT_NAMES[name]} {'≈' if estimated and name == '50%' else ''}{_number(stats[name])}"
+                  for name in level['stats']]
+    elif col in summary_stats['categorical_columns'] and level['top']:
+        if counts is None:
+            parts.append('many distinct values')
+        elif len(counts) and counts.iloc[0] == 1:
+            parts.append(f'{len(counts):,} distinct values, all different')
+        elif len(counts):
+            top = ', '.join(f'{label} ({n:,})' for label, n in counts.head(level['top']).items())
+            parts.append(f'{len(counts):,} distinct, most common {top}')
+    return f'- {col}: ' + ', '.join(parts)
+
+
+def build_digest(summary_stats: Dict[str, Any], category_counts: Dict[str, Optional[pd.Series]],
+                 max_tokens: int = 600) -> str:
+    """A compact description of the dataset for the LLM prompt, within about `max_tokens` tokens.
+
+    One line per column with its type, missing share and the key statistics
+    (numeric columns) or most common values (text columns), then the
+    strongest correlations. Detail is dropped level by level until the
+    digest fits; if even names and types do not, trailing columns are
+    summarized by count.
+    """
+    rows, cols = summary_stats['shape']
+    header = f'Dataset: {rows:,} rows x {cols} columns.\nColumns:'
+    corr = summary_stats.get('correlation')
+
+    for level in DETAIL_LEVELS:
+        lines = [header] + [_column_line(summary_stats, col, category_counts.get(col), level)
+                            for col in summary_stats['columns']]
+        pairs = top_pairs(corr, k=level['pairs']) if corr is not None and level['pairs'] else []
+        if pairs:
+            lines.append('Strongest correlations: ' + ', '.join(f'{a} and {b} {r:+.2f}' for a, b, r in pairs))
+        digest = '\n'.join(lines)
+        if estimate_tokens(digest) <= max_tokens:
+            return digest
+
+    kept = [header]
+    for i, line in enumerate(lines[1:]):
+        rest = f'- ... and {cols - i:,} more columns'
+        if estimate_tokens('\n'.join(kept + [line, rest])) > max_tokens:
+            return '\n'.join(kept + [rest])
+        kept.append(line)
+    return '\n'.join(kept)
+
+
+@dataclass
+class PromptContext:
+    """The static part of every LLM prompt for one dataset, built once and reused.
+
+    `key` identifies the digest in the response cache. `primed` holds, per
+    model, Ollama's encoded conversation after it has read the digest, so
+    questions send that instead of the digest text; an empty list means the
+    server returned none and the full prompt is sent.
+    """
+    digest: str
+    dataset: Any = None
+    primed: Dict[str, List[int]] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return hashlib.sha256(self.digest.encode()).hexdigest()
+
+    @property
+    def prefix(self) -> str:
+        return f'{INSTRUCTIONS}\n\n{self.digest}'
+
+    def priming_prompt(self) -> str:
+        return f'{self.prefix}\n\nReply with OK.'
+
+    def prompt(self, query: str) -> str:
+        return f'{self.prefix}\n\nUser: {query}\n\nAssistant:'
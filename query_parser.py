@@ -0,0 +1,197 @@
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple, Any
+
+
+# Checked in this order, mirroring the branches of get_statistical_answer
+STAT_OPERATIONS = [
+    ('mean', ['mean', 'average']),
+    ('median', ['median']),
+    ('min', ['min', 'lowest']),
+    ('max', ['max', 'highest']),
+    ('sum', ['sum']),
+    ('std', ['std']),
+    ('variance', ['variance']),
+    ('percentile', ['percentile', 'quantile']),
+]
+
+CHART_HINTS = ['chart', 'graph', 'visualize']
+FLAGS = ['heatmap', 'correlation']
+
+GROUP_WORDS = ['per', 'by', 'for each', 'for every', 'across', 'group by', 'grouped by', 'broken down by']
+FILTER_WORDS = ['where', 'when', 'with', 'for', 'if', 'and']
+SYMBOL_OPERATORS = ['>=', '<=', '!=', '==', '=', '>', '<']
+# Word operators only count right after a filter word, so "which channel_name is ..." is not a filter
+PERCENTILE_RE = re.compile(r'\b(\d{1,2}(?:\.\d+)?)(?:st|nd|rd|th)?[\s-]*percentile\b'
+                           r'|\bpercentile\s+(?:of\s+)?(\d{1,2}(?:\.\d+)?)\b', re.IGNORECASE)
+QUANTILE_RE = re.compile(r'\b(0?\.\d+)\s*quantile\b|\bquantile\s+(?:of\s+)?(0?\.\d+)\b', re.IGNORECASE)
+# "100,000" is one number, not the value 100 followed by a comma
+THOUSANDS_RE = re.compile(r'[-+]?\d{1,3}(?:,\d{3})+(?:\.\d+)?(?!\d|,\d)')
+EXACT_RE = re.compile(r'\b(?:exact|exactly|precise|precisely)\b', re.IGNORECASE)
+
+WORD_OPERATORS = {'is not': '!=', 'is': '=', 'equals': '=', 'above': '>', 'over': '>', 'below': '<', 'under': '<'}
+
+
+def parse_quantile(query: str) -> Optional[float]:
+    """The quantile a query asks for as a fraction: "90th percentile" and "0.9 quantile" are both 0.9."""
+    match = PERCENTILE_RE.search(query)
+    if match:
+        return float(match.group(1) or match.group(2)) / 100
+    match = QUANTILE_RE.search(query)
+    if match:
+        return float(match.group(1) or match.group(2))
+    return None
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher.
+
+    Reports every occurrence of every pattern, overlapping ones included, in
+    one pass over the text, so a set of matches equals running `p in text`
+    for each pattern separately.
+    """
+
+    def __init__(self, patterns: Dict[str, List[Any]]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[Any]] = [[]]
+
+        for word, payloads in patterns.items():
+            if not word:
+                continue
+            state = 0
+            for ch in word:
+                if ch not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[state][ch] = len(self.goto) - 1
+                state = self.goto[state][ch]
+            self.out[state].extend(payloads)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def search(self, text: str) -> Set[Any]:
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            found.update(self.out[state])
+        return found
+
+
+@dataclass
+class ParsedQuery:
+    intent: str
+    chart_type: Optional[str] = None
+    stat_op: Optional[str] = None
+    columns: List[str] = field(default_factory=list)
+    flags: Set[str] = field(default_factory=set)
+    group_by: Optional[str] = None
+    filters: List[Tuple[str, str, str]] = field(default_factory=list)  # (column, operator, value)
+    quantile: Optional[float] = None  # for stat_op 'percentile', as a fraction
+    exact: bool = False
+
+
+class QueryParser:
+    """Classifies a query and finds the columns it mentions in a single scan.
+
+    One automaton holds the chart keywords, statistic keywords, statistic
+    operation triggers and lowercased column names; it is built once per
+    loaded dataset.
+    """
+
+    def __init__(self, chart_keywords: Dict[str, List[str]], stat_keywords: List[str], columns: List[str]):
+        self.chart_order = list(chart_keywords)
+        self.columns = list(columns)
+
+        patterns: Dict[str, List[Tuple[str, Any]]] = {}
+        for chart_type, keywords in chart_keywords.items():
+            for word in keywords:
+                patterns.setdefault(word, []).append(('chart', chart_type))
+        for word in stat_keywords:
+            patterns.setdefault(word, []).append(('stat', word))
+        for op, words in STAT_OPERATIONS:
+            for word in words:
+                patterns.setdefault(word, []).append(('op', op))
+        for word in CHART_HINTS:
+            patterns.setdefault(word, []).append(('hint', word))
+        for word in FLAGS:
+            patterns.setdefault(word, []).append(('flag', word))
+        for idx, col in enumerate(self.columns):
+            patterns.setdefault(str(col).lower(), []).append(('column', idx))
+
+        self.automaton = AhoCorasick(patterns)
+
+        self._by_name = {str(col).lower(): col for col in self.columns}
+        names = '|'.join(re.escape(name) for name in sorted(self._by_name, key=len, reverse=True))
+        self._group_re = self._filter_re = None
+        if names:
+            column = rf'(?<![\w.])(?P<col>{names})(?![\w.])'
+            self._group_re = re.compile(
+                rf"\b(?:{'|'.join(GROUP_WORDS)})\s+(?:each\s+|the\s+)?{column}", re.IGNORECASE)
+            symbols = '|'.join(re.escape(op) for op in SYMBOL_OPERATORS)
+            words = '|'.join(WORD_OPERATORS)
+            self._filter_re = re.compile(
+                rf"(?:\b(?P<kw>{'|'.join(FILTER_WORDS)})\s+)?{column}"
+                rf"(?:\s*(?P<sym>{symbols})\s*|\s+(?P<word>{words})\s+)"
+                rf"""(?P<value>"[^"]*"|'[^']*'|{THOUSANDS_RE.pattern}|[^\s,?;]+)""", re.IGNORECASE)
+
+    def parse_conditions(self, query: str) -> Tuple[Optional[str], List[Tuple[str, str, str]]]:
+        """The group-by column and the (column, operator, value) filters a query asks for."""
+        if self._group_re is None:
+            return None, []
+        group = self._group_re.search(query)
+        filters = []
+        for match in self._filter_re.finditer(query):
+            if match.group('word') and not match.group('kw'):
+                continue
+            op = match.group('sym') or WORD_OPERATORS[match.group('word').lower()]
+            value = match.group('value')
+            value = value[1:-1] if value[0] in '"\'' else value.rstrip('.')
+            if THOUSANDS_RE.fullmatch(value):
+                value = value.replace(',', '')
+            filters.append((self._by_name[match.group('col').lower()], '=' if op == '==' else op, value))
+        return (self._by_name[group.group('col').lower()] if group else None), filters
+
+    def parse(self, query: str) -> ParsedQuery:
+        matches = self.automaton.search(query.lower())
+        kinds: Dict[str, Set[Any]] = {}
+        for kind, value in matches:
+            kinds.setdefault(kind, set()).add(value)
+
+        charts = kinds.get('chart', set())
+        chart_type = next((c for c in self.chart_order if c in charts), None)
+        ops = kinds.get('op', set())
+        stat_op = next((op for op, _ in STAT_OPERATIONS if op in ops), None)
+        columns = [self.columns[i] for i in sorted(kinds.get('column', set()))]
+
+        if charts:
+            intent = 'chart'
+        elif kinds.get('stat'):
+            intent = 'statistical'
+        elif kinds.get('hint'):
+            intent = 'chart'
+        else:
+            intent = 'textual'
+
+        quantile = parse_quantile(query) if stat_op == 'percentile' else None
+        if stat_op == 'percentile' and quantile is None:
+            stat_op = None  # "percentile of x" without a number gets the general stats
+        group_by, filters = self.parse_conditions(query) if columns else (None, [])
+        return ParsedQuery(intent=intent, chart_type=chart_type, stat_op=stat_op,
+                           columns=columns, flags=kinds.get('flag', set()),
+                           group_by=group_by, filters=filters, quantile=quantile,
+                           exact=bool(EXACT_RE.search(query)))
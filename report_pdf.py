@@ -0,0 +1,112 @@
+import io
+import zlib
+import base64
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+from PIL import Image
+import fpdf
+from fpdf import FPDF
+
+
+REPORT_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix='report')
+
+# fpdf2 takes file objects in image(); PyFPDF 1.7.x only reads images from paths
+FPDF2 = int(fpdf.__version__.split('.')[0]) >= 2
+
+
+def _latin1(text: str) -> str:
+    # The core PDF fonts only cover Latin-1
+    return text.encode('latin-1', 'replace').decode('latin-1')
+
+
+class ReportBuilder:
+    """Builds the chat summary PDF entirely in memory.
+
+    Charts are looked up by hash in the chat's ChartBlobStore (or decoded
+    from base64 when no store is given), downsampled to the pixels they
+    actually occupy on the page (`image_width` mm at `image_dpi`) and embedded
+    from buffers, so nothing is written to disk and concurrent exports cannot
+    collide.
+    """
+
+    def __init__(self, image_width: float = 120, image_dpi: int = 150):
+        self.image_width = image_width
+        self.image_dpi = image_dpi
+        self.pdf = FPDF()
+        self.pdf.add_page()
+        self.pdf.set_font('Arial', 'B', 16)
+        self.pdf.cell(0, 10, 'Data Summary Report', ln=True, align='C')
+        self.pdf.ln(10)
+
+    def add_summary(self, stats: Dict[str, Any]):
+        if not stats:
+            return
+        pdf = self.pdf
+        pdf.set_font('Arial', '', 12)
+        pdf.cell(0, 10, f"Rows × Cols: {stats['shape'][0]} × {stats['shape'][1]}", ln=True)
+        pdf.cell(0, 10, _latin1(f"Columns: {', '.join(map(str, stats['columns']))[:80]}..."), ln=True)
+        pdf.cell(0, 10, f"Numerics: {len(stats['numeric_columns'])}", ln=True)
+        pdf.cell(0, 10, f"Categoricals: {len(stats['categorical_columns'])}", ln=True)
+
+    def add_conversation(self, history: List[Any], charts: Optional[Any] = None):
+        pdf = self.pdf
+        pdf.ln(10)
+        pdf.set_font('Arial', 'B', 14)
+        pdf.cell(0, 10, 'Conversation Log', ln=True)
+
+        for i, item in enumerate(history, 1):
+            pdf.set_font('Arial', 'B', 10)
+            pdf.cell(0, 8, _latin1(f"Q{i}: {item['user']}"), ln=True)
+            pdf.set_font('Arial', '', 10)
+            reply = item.get('assistant', '')
+            pdf.multi_cell(0, 6, _latin1(f"A{i}: {reply[:500]}{'...' if len(reply) > 500 else ''}"))
+
+            if item.get('chart'):
+                try:
+                    png = charts.get(item['chart']) if charts is not None else base64.b64decode(item['chart'])
+                    if png is not None:
+                        self.add_chart(f'chart_{i}', png)
+                except (ValueError, OSError):
+                    pass
+            pdf.ln(3)
+
+    def _downsample(self, png: bytes) -> Image.Image:
+        img = Image.open(io.BytesIO(png)).convert('RGB')
+        width = round(self.image_width / 25.4 * self.image_dpi)
+        if img.width > width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.LANCZOS, reducing_gap=2.0)
+        return img
+
+    def add_chart(self, name: str, png: bytes):
+        img = self._downsample(png)
+        if FPDF2:
+            buf = io.BytesIO()
+            img.save(buf, format='PNG', optimize=True)
+            buf.seek(0)
+            self.pdf.image(buf, w=self.image_width)
+            return
+
+        # Register the decoded image the way PyFPDF's own parsers would, then place it by name
+        self.pdf.images[name] = {
+            'i': len(self.pdf.images) + 1, 'w': img.width, 'h': img.height,
+            'cs': 'DeviceRGB', 'bpc': 8, 'f': 'FlateDecode', 'data': zlib.compress(img.tobytes()),
+        }
+        self.pdf.image(name, w=self.image_width)
+
+    def to_bytes(self) -> bytes:
+        if FPDF2:
+            return bytes(self.pdf.output())
+        return self.pdf.output(dest='S').encode('latin-1')
+
+
+def build_report(summary_stats: Dict[str, Any], chat_history: List[Any], charts: Optional[Any] = None) -> bytes:
+    builder = ReportBuilder()
+    builder.add_summary(summary_stats)
+    builder.add_conversation(chat_history, charts)
+    return builder.to_bytes()
+
+
+def start_report(summary_stats: Dict[str, Any], chat_history: List[Any], charts: Optional[Any] = None) -> Future:
+    # Snapshot the history so later chat turns do not change a report being built
+    return REPORT_EXECUTOR.submit(build_report, dict(summary_stats), list(chat_history), charts)
@@ -0,0 +1,134 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Optional, FrozenSet
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'insightbot')
+
+STOPWORDS = frozenset([
+    'a', 'an', 'the', 'is', 'are', 'was', 'be', 'of', 'in', 'on', 'for', 'to', 'and', 'or',
+    'me', 'my', 'i', 'you', 'can', 'could', 'please', 'this', 'that', 'it', 'there', 'any', 'do', 'does'
+])
+
+
+# Prompts comparing things depend on which side is which, so they are never matched by similarity
+COMPARATIVES = frozenset([
+    'than', 'vs', 'versus', 'compared', 'compare', 'higher', 'lower', 'greater', 'bigger', 'smaller', 'larger',
+    'more', 'less', 'fewer', 'above', 'below', 'before', 'after', 'exceed', 'exceeds', 'outperform', 'outperforms'
+])
+
+
+def normalize_prompt(text: str) -> str:
+    return ' '.join(re.findall(r'[a-z0-9_]+', text.lower()))
+
+
+def token_set(text: str) -> FrozenSet[str]:
+    """The prompt's content words plus each adjacent pair of them, so a reordered prompt does not look alike."""
+    words = [t for t in normalize_prompt(text).split() if t not in STOPWORDS]
+    return frozenset(words + [f'{a}>{b}' for a, b in zip(words, words[1:])])
+
+
+class ResponseCache:
+    """SQLite-backed cache of LLM answers.
+
+    Entries are keyed on (model, dataset schema fingerprint, normalized
+    prompt), expire after `ttl` seconds and are evicted least recently used
+    beyond `max_entries`. Setting `similarity_threshold` adds an opt-in second
+    tier that returns the answer of a previous prompt whose words and word
+    pairs have at least that Jaccard similarity, which catches simple
+    paraphrases. Prompts with comparatives ("higher than") are left out of it.
+    """
+
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600, max_entries: int = 5000,
+                 similarity_threshold: Optional[float] = None, max_candidates: int = 500):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.max_candidates = max_candidates
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            with conn:
+                conn.execute('''CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY, model TEXT, schema TEXT, tokens TEXT,
+                    response TEXT, created REAL, accessed REAL)''')
+                conn.execute('CREATE INDEX IF NOT EXISTS responses_scope ON responses (model, schema, accessed)')
+            conn.close()
+            self._ready = True
+        return sqlite3.connect(self.path, timeout=10)
+
+    @staticmethod
+    def make_key(model: str, schema: str, prompt: str) -> str:
+        return hashlib.sha256(f'{model}\0{schema}\0{normalize_prompt(prompt)}'.encode()).hexdigest()
+
+    def get(self, model: str, schema: str, prompt: str) -> Optional[str]:
+        now = time.time()
+        key = self.make_key(model, schema, prompt)
+        with self._connect() as conn:
+            row = conn.execute('SELECT response, key FROM responses WHERE key = ? AND created >= ?',
+                               (key, now - self.ttl)).fetchone()
+            counter = 'hits'
+            if row is None and self.similarity_threshold is not None:
+                row = self._similar(conn, model, schema, prompt, now)
+                counter = 'similar_hits'
+            if row is not None:
+                conn.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, row[1]))
+        conn.close()
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            setattr(self, counter, getattr(self, counter) + 1)
+        return row[0]
+
+    def _similar(self, conn: sqlite3.Connection, model: str, schema: str, prompt: str, now: float):
+        wanted = token_set(prompt)
+        if not wanted or wanted & COMPARATIVES:
+            return None
+        candidates = conn.execute(
+            'SELECT response, tokens, key FROM responses WHERE model = ? AND schema = ? AND created >= ? '
+            'ORDER BY accessed DESC LIMIT ?', (model, schema, now - self.ttl, self.max_candidates)).fetchall()
+
+        best, best_score = None, self.similarity_threshold
+        for response, tokens, key in candidates:
+            seen = frozenset(tokens.split())
+            if seen & COMPARATIVES:
+                continue
+            score = len(wanted & seen) / len(wanted | seen) if seen else 0.0
+            if score >= best_score:
+                best, best_score = (response, key), score
+        return best
+
+    def put(self, model: str, schema: str, prompt: str, response: str):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                         (self.make_key(model, schema, prompt), model, schema,
+                          ' '.join(sorted(token_set(prompt))), response, now, now))
+            conn.execute('DELETE FROM responses WHERE created < ?', (now - self.ttl,))
+            conn.execute('DELETE FROM responses WHERE key IN (SELECT key FROM responses '
+                         'ORDER BY accessed DESC LIMIT -1 OFFSET ?)', (self.max_entries,))
+        conn.close()
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM responses')
+        conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'similar_hits': self.similar_hits, 'misses': self.misses}
@@ -0,0 +1,102 @@
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_SAMPLE_SIZE = 100_000
+
+
+class RowSample:
+    """Uniform random sample of up to `size` rows of the numeric columns.
+
+    Chunks are folded in one at a time, reservoir style: a hypergeometric
+    draw decides how many of a chunk's rows belong in a uniform sample of
+    everything seen so far, and those replace randomly chosen members. After
+    any sequence of chunks every set of `size` rows is equally likely, so the
+    sample can be built during the streaming scan and extended on appends.
+    While fewer than `size` rows have been seen it holds all of them.
+    """
+
+    def __init__(self, columns: List[str], size: int = DEFAULT_SAMPLE_SIZE, seed: Optional[int] = 0):
+        self.columns = list(columns)
+        self.size = size
+        self.rows_seen = 0
+        self.values = np.empty((0, len(self.columns)))
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def of(cls, df: pd.DataFrame, columns: List[str], size: int = DEFAULT_SAMPLE_SIZE,
+           seed: Optional[int] = 0) -> 'RowSample':
+        sample = cls(columns, size, seed)
+        sample.update(df)
+        return sample
+
+    def _numeric(self, chunk: pd.DataFrame) -> np.ndarray:
+        if not self.columns:
+            return np.empty((len(chunk), 0))
+        return np.column_stack([
+            pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            if col in chunk.columns else np.full(len(chunk), np.nan)
+            for col in self.columns
+        ])
+
+    def update(self, chunk: pd.DataFrame):
+        m, seen = len(chunk), self.rows_seen
+        if m == 0:
+            return
+        self.rows_seen += m
+        if seen + m <= self.size:
+            self.values = np.vstack([self.values, self._numeric(chunk)])
+            return
+
+        taken = int(self._rng.hypergeometric(m, seen, self.size))
+        new = self._numeric(chunk.iloc[np.sort(self._rng.choice(m, taken, replace=False))])
+        if len(self.values) < self.size:
+            # Still holding every earlier row; a uniform subset of them makes up the rest
+            keep = np.sort(self._rng.choice(len(self.values), self.size - taken, replace=False))
+            self.values = np.vstack([self.values[keep], new])
+        else:
+            self.values[self._rng.choice(self.size, taken, replace=False)] = new
+
+    @property
+    def exact(self) -> bool:
+        return self.rows_seen <= self.size
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def column(self, col: str) -> np.ndarray:
+        values = self.values[:, self.columns.index(col)]
+        return values[~np.isnan(values)]
+
+    def quantile(self, col: str, q: float, z: float = 1.96) -> Tuple[float, float, float]:
+        """Estimate of the q-quantile of `col` with a distribution-free confidence interval.
+
+        The interval is bounded by the sample order statistics whose ranks
+        lie z binomial standard deviations either side of n * q (z = 1.96
+        for 95%). Once the sample holds every row the interval is the value.
+        """
+        values = np.sort(self.column(col))
+        n = len(values)
+        if n == 0:
+            return np.nan, np.nan, np.nan
+        estimate = float(np.quantile(values, q))
+        if self.exact:
+            return estimate, estimate, estimate
+        half = z * math.sqrt(n * q * (1 - q))
+        low = values[max(0, int(math.floor(n * q - half)))]
+        high = values[min(n - 1, int(math.ceil(n * q + half)))]
+        return estimate, float(low), float(high)
+
+    def correlation(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        columns = columns or self.columns
+        frame = pd.DataFrame(self.values[:, [self.columns.index(c) for c in columns]], columns=columns)
+        return frame.corr()
+
+    def correlation_margin(self, z: float = 1.96) -> float:
+        """Widest half-width of a correlation's confidence interval (at r = 0, by the Fisher transform)."""
+        if self.exact or len(self) <= 3:
+            return 0.0
+        return math.tanh(z / math.sqrt(len(self) - 3))
@@ -0,0 +1,157 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Any, Iterator
+from column_stats import ColumnAccumulator
+from sampling import RowSample
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+DEFAULT_CHUNKSIZE = 100_000
+STREAMABLE_EXTENSIONS = ['csv', 'tsv', 'json', 'jsonl', 'ndjson', 'parquet']
+
+
+def _is_json_lines(file_path: str) -> bool:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        while True:
+            ch = f.read(1)
+            if not ch:
+                return False
+            if not ch.isspace():
+                return ch == '{'
+
+
+def iter_chunks(file_path: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                usecols: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Yield the file as DataFrames of at most `chunksize` rows."""
+    ext = file_path.split('.')[-1].lower()
+    if ext == 'csv':
+        reader = pd.read_csv(file_path, chunksize=chunksize, usecols=usecols)
+    elif ext == 'tsv':
+        reader = pd.read_csv(file_path, sep='\t', chunksize=chunksize, usecols=usecols)
+    elif ext in ['jsonl', 'ndjson'] or (ext == 'json' and _is_json_lines(file_path)):
+        reader = pd.read_json(file_path, lines=True, chunksize=chunksize)
+    elif ext == 'json':
+        raise ValueError('Streaming mode needs JSON Lines input (one object per line).')
+    elif ext == 'parquet':
+        if pq is None:
+            raise ValueError('Reading Parquet files needs pyarrow.')
+        # Row groups are read in batches of only the requested columns
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunksize, columns=usecols):
+            yield batch.to_pandas()
+        return
+    else:
+        raise ValueError(f"Streaming is not supported for .{ext} files")
+
+    with reader:
+        for chunk in reader:
+            if usecols is not None and ext not in ['csv', 'tsv']:
+                chunk = chunk[[c for c in usecols if c in chunk.columns]]
+            yield chunk
+
+
+def _merge_dtype(current, new):
+    if current is None or current == new:
+        return new
+    if pd.api.types.is_numeric_dtype(current) and pd.api.types.is_numeric_dtype(new):
+        try:
+            return np.result_type(current, new)
+        except TypeError:
+            pass
+    return np.dtype(object)
+
+
+class StreamingEDA:
+    """Builds the same summary as DataSummaryChatbot._run_eda one chunk at a time.
+
+    Memory is bounded by the chunk size and the per-column quantile sketches,
+    so quartiles are exact for small files and estimated beyond that. With
+    `sample_size` set, a uniform sample of that many rows of the numeric
+    columns is drawn in the same pass.
+    """
+
+    def __init__(self, sample_size: int = 0):
+        self.sample_size = sample_size
+        self.sample: Optional[RowSample] = None
+        self.rows = 0
+        self.columns: List[str] = []
+        self.dtypes: Dict[str, Any] = {}
+        self.null_counts: Dict[str, int] = {}
+        self.numeric: Dict[str, ColumnAccumulator] = {}
+
+    def update(self, chunk: pd.DataFrame):
+        for col in chunk.columns:
+            if col not in self.dtypes:
+                self.columns.append(col)
+                self.dtypes[col] = None
+                self.null_counts[col] = self.rows
+
+        nulls = chunk.isnull().sum()
+        for col in self.columns:
+            if col not in chunk.columns:
+                self.null_counts[col] += len(chunk)
+                continue
+            self.dtypes[col] = _merge_dtype(self.dtypes[col], chunk[col].dtype)
+            self.null_counts[col] += int(nulls[col])
+            if pd.api.types.is_numeric_dtype(self.dtypes[col]) and not pd.api.types.is_bool_dtype(self.dtypes[col]):
+                stats = self.numeric.setdefault(col, ColumnAccumulator(seed=0))
+                stats.update(chunk[col].to_numpy(dtype=float, na_value=np.nan))
+            else:
+                self.numeric.pop(col, None)
+
+        if self.sample_size:
+            if self.sample is None:
+                self.sample = RowSample(list(self.numeric), self.sample_size)
+            self.sample.update(chunk)
+        self.rows += len(chunk)
+
+    def accumulators(self) -> Dict[str, ColumnAccumulator]:
+        return {c: self.numeric[c] for c in self.columns if c in self.numeric}
+
+    def summary(self) -> Dict[str, Any]:
+        numeric_columns = [c for c in self.columns if c in self.numeric]
+        categorical_columns = [c for c in self.columns
+                               if pd.api.types.is_object_dtype(self.dtypes[c]) or pd.api.types.is_string_dtype(self.dtypes[c])]
+        datetime_columns = [c for c in self.columns if pd.api.types.is_datetime64_any_dtype(self.dtypes[c])]
+
+        summary = {
+            'shape': (self.rows, len(self.columns)),
+            'columns': list(self.columns),
+            'data_types': dict(self.dtypes),
+            'null_counts': dict(self.null_counts),
+            'null_percentage': {c: (n / self.rows * 100 if self.rows else np.nan) for c, n in self.null_counts.items()},
+            'numeric_columns': numeric_columns,
+            'categorical_columns': categorical_columns,
+            'datetime_columns': datetime_columns
+        }
+
+        if numeric_columns:
+            summary['numeric_stats'] = {c: self.numeric[c].describe() for c in numeric_columns}
+
+        return summary
+
+
+def read_columns(file_path: str, columns: List[str], chunksize: int = DEFAULT_CHUNKSIZE) -> pd.DataFrame:
+    """Materialize only the requested columns, reading the file chunk by chunk."""
+    parts = [chunk for chunk in iter_chunks(file_path, chunksize, usecols=columns)]
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(parts, ignore_index=True)[columns]
+
+
+def value_counts(file_path: str, column: str, chunksize: int = DEFAULT_CHUNKSIZE) -> pd.Series:
+    counts = None
+    for chunk in iter_chunks(file_path, chunksize, usecols=[column]):
+        part = chunk[column].value_counts(sort=False)
+        if counts is None:
+            counts = part
+            continue
+        # Keep first-seen order so ties rank like Series.value_counts does
+        order = counts.index.append(part.index.difference(counts.index, sort=False))
+        counts = counts.add(part, fill_value=0).reindex(order)
+    if counts is None:
+        return pd.Series(dtype='int64')
+    return counts.astype('int64').sort_values(ascending=False, kind='stable')
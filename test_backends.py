@@ -0,0 +1,123 @@
+"""
+Tests for the compute backends behind streaming mode.
+Every backend must give the same answers as the data loaded into memory.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import backends
+from chatbot_agent import DataSummaryChatbot
+
+QUERIES = ["average views per channel_name",
+           "max likes where category_id = Education and views > 80000",
+           "count of likes where channel_name != ChefMaster",
+           "max likes where category_id = Nothing"]
+
+
+def _streamed(path, backend=None):
+    chatbot = DataSummaryChatbot()
+    chatbot.chunksize = 4
+    if backend is not None:
+        chatbot.backend = backend
+    assert chatbot.load_data(path, streaming_mode=True)['success']
+    return chatbot
+
+
+def test_grouped_and_filtered_questions_in_streaming_mode():
+    eager = DataSummaryChatbot()
+    eager.load_data("sample_data.csv")
+    streamed = _streamed("sample_data.csv")
+    for query in QUERIES:
+        assert streamed.process_user_input(query)['message'] == eager.process_user_input(query)['message'], query
+
+
+def test_parquet_streams_with_projection(tmp_path):
+    df = pd.read_csv("sample_data.csv")
+    path = tmp_path / "sample.parquet"
+    df.to_parquet(path, row_group_size=5)
+    streamed = _streamed(str(path))
+    assert streamed.summary_stats['shape'] == df.shape
+    assert streamed.get_statistical_answer("sum of likes") == f"Sum of likes: {df['likes'].sum():.2f}"
+
+    chunks = list(streamed.backend.iter_chunks(str(path), 4, ['views']))
+    assert [list(chunk.columns) for chunk in chunks] == [['views']] * len(chunks)
+    assert streamed.backend.quantile(str(path), 'views', 0.5) == df['views'].median()
+
+
+def test_duckdb_matches_pandas(tmp_path):
+    pytest.importorskip('duckdb')
+    df = pd.read_csv("sample_data.csv")
+    for path in ["sample_data.csv", str(tmp_path / "sample.parquet")]:
+        df.to_parquet(tmp_path / "sample.parquet")
+        pandas_backend, duck = backends.make_backend('pandas'), backends.make_backend('duckdb')
+        assert list(duck.value_counts(path, 'channel_name').items()) == list(pandas_backend.value_counts(path, 'channel_name').items())
+        edges = np.histogram_bin_edges([], bins=7, range=(df['views'].min(), df['views'].max()))
+        assert duck.histogram(path, 'views', edges).tolist() == pandas_backend.histogram(path, 'views', edges).tolist()
+        assert np.isclose(duck.quantile(path, 'likes', 0.9), pandas_backend.quantile(path, 'likes', 0.9))
+        filters = [('category_id', '=', 'education'), ('views', '>', 80000.0)]
+        for column, group_by in [('likes', 'channel_name'), ('likes', None), (None, 'channel_name')]:
+            (labels, rows, accs), (duck_labels, duck_rows, duck_accs) = (
+                backend.group_accumulators(path, column, group_by, filters, 4, [0.5]) for backend in (pandas_backend, duck))
+            assert duck_labels == labels and duck_rows.tolist() == rows.tolist()
+            for acc, duck_acc in zip(accs or [], duck_accs or []):
+                assert duck_acc.count == acc.count and np.isclose(duck_acc.variance, acc.variance, equal_nan=True)
+                assert np.isclose(duck_acc.median, acc.median, equal_nan=True)
+
+    eager = DataSummaryChatbot()
+    eager.load_data("sample_data.csv")
+    streamed = _streamed("sample_data.csv", backends.make_backend('duckdb'))
+    for query in QUERIES + ["median of views per category_id"]:
+        assert streamed.process_user_input(query)['message'] == eager.process_user_input(query)['message'], query
+
+
+def test_streaming_questions_do_not_collect_rows(monkeypatch):
+    def collect_rows(*args, **kwargs):
+        raise AssertionError("streaming answers should aggregate chunk by chunk")
+
+    eager = DataSummaryChatbot()
+    eager.load_data("sample_data.csv")
+    streamed = _streamed("sample_data.csv")
+    monkeypatch.setattr(streamed.backend, 'read_columns', collect_rows)
+    for query in QUERIES + ["median of views per category_id"]:
+        assert streamed.process_user_input(query)['message'] == eager.process_user_input(query)['message'], query
+    assert streamed.backend.quantile("sample_data.csv", 'likes', 0.9, 4) == eager.df['likes'].quantile(0.9)
+
+
+def test_order_statistics_narrow_to_the_exact_values():
+    rng = np.random.default_rng(0)
+    for values in [rng.lognormal(0, 3, 5000), rng.integers(0, 5, 5000).astype(float)]:
+        chunks = lambda: (values[i:i + 97] for i in range(0, len(values), 97))
+        for q in [0.0, 0.1, 0.5, 0.93, 1.0]:
+            position = (len(values) - 1) * q
+            ranks = (int(np.floor(position)), int(np.ceil(position)))
+            low, high = backends.order_statistics(chunks, ranks, limit=50, bins=16)
+            assert (low, high) == tuple(np.sort(values)[list(ranks)])
+
+
+def test_streamed_charts_match_in_memory_charts():
+    eager = DataSummaryChatbot()
+    eager.load_data("sample_data.csv")
+    streamed = _streamed("sample_data.csv")
+    for chatbot in (eager, streamed):
+        chatbot.chart_settings['max_points'] = 8
+
+    box, streamed_box = (c._chart_spec('box', 'views').data['stats'][0] for c in (eager, streamed))
+    for key in ['q1', 'med', 'q3', 'whislo', 'whishi', 'mean']:
+        assert np.isclose(streamed_box[key], box[key]), key
+    assert sorted(streamed_box['fliers']) == sorted(box['fliers'])
+
+    scatter, streamed_scatter = (c._chart_spec('scatter', None).data for c in (eager, streamed))
+    assert np.array_equal(streamed_scatter['counts'], scatter['counts'])
+
+    line = streamed._chart_spec('line', 'views').data
+    views = eager.df['views']
+    assert len(line['x']) <= 8 and views.max() in line['y'] and views.min() in line['y']
+    assert list(line['y']) == [views[int(x)] for x in line['x']]
+
+    # Tied channels keep their first-seen order in both modes
+    bar, streamed_bar = (c._chart_spec('bar', 'channel_name').data['counts'] for c in (eager, streamed))
+    assert list(streamed_bar.items()) == list(bar.items())
+    pie, streamed_pie = (c._chart_spec('pie', 'channel_name').data for c in (eager, streamed))
+    assert list(streamed_pie['labels']) == list(pie['labels']) and list(streamed_pie['values']) == list(pie['values'])
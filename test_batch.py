@@ -0,0 +1,45 @@
+"""
+Tests for answering many queries in one batch.
+"""
+
+from chatbot_agent import DataSummaryChatbot
+from chart_cache import ChartCache
+
+QUERIES = [
+    "bar chart of channel_name", "What is the average of views?", "median likes", "max views",
+    "pie chart of category_id", "bar chart of channel_name", "box plot of comments", "std of views",
+    "mean of title", "heatmap", "line chart of views", "hist of likes", "what is the sum of dislikes",
+]
+
+
+def _chatbot():
+    chatbot = DataSummaryChatbot()
+    chatbot.chart_cache = ChartCache(max_bytes=0)
+    chatbot.ollama_available = False
+    chatbot.load_data("sample_data.csv")
+    return chatbot
+
+
+def test_batch_matches_one_at_a_time():
+    sequential = _chatbot()
+    expected = [sequential.process_user_input(query) for query in QUERIES]
+
+    chatbot = _chatbot()
+    assert chatbot.process_batch(QUERIES) == expected
+    assert chatbot.chat_history == []
+
+
+def test_batch_renders_each_chart_once_and_aggregates_per_column():
+    chatbot = _chatbot()
+    rendered = []
+    render_chart = chatbot.render_chart
+    chatbot.render_chart = lambda chart_type, col: rendered.append((chart_type, col)) or render_chart(chart_type, col)
+    aggregated = []
+    aggregate = chatbot._aggregate
+    chatbot._aggregate = lambda col, ops: aggregated.append(col) or aggregate(col, ops)
+
+    results = chatbot.process_batch(QUERIES, record_history=True)
+    assert results[0] == results[5] and results[0]['success']
+    assert sorted(rendered) == sorted(set(rendered)) and len(rendered) == 6
+    assert sorted(aggregated) == ['likes', 'views']
+    assert [entry['user'] for entry in chatbot.chat_history] == QUERIES
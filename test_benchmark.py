@@ -0,0 +1,33 @@
+"""
+Smoke tests for the benchmark suite.
+"""
+
+import json
+import benchmark
+
+
+def test_make_dataset_shape_and_nulls():
+    df = benchmark.make_dataset(1000, numeric=4, categorical=2, null_rate=0.1)
+    assert list(df.columns) == ['num_0', 'num_1', 'num_2', 'num_3', 'cat_0', 'cat_1']
+    assert 0.05 < df['num_0'].isna().mean() < 0.15
+    assert df['cat_0'].nunique() <= 50
+
+
+def test_benchmark_writes_results_and_compares(tmp_path):
+    output = tmp_path / 'results.json'
+    assert benchmark.main(['--rows', '500', '--repeat', '1', '--no-memory', '--output', str(output)]) == 0
+
+    results = json.loads(output.read_text())['results']
+    names = {r['name'] for r in results}
+    assert {'load_data', 'run_eda', 'stat_median', 'chart_heatmap', 'export_pdf'} <= names
+    assert all(r['seconds'] > 0 for r in results)
+
+    slower = [dict(r, seconds=r['seconds'] * 2 + 0.01) for r in results]
+    assert len(benchmark.compare(slower, results)) == len(results)
+    assert benchmark.compare(results, results) == []
+
+
+def test_new_session_starts_without_plotting_or_http_modules():
+    startup = benchmark.measure_startup(repeat=1)
+    # Timing is left to benchmark.py --max-startup-ms; this only checks what gets imported
+    assert startup['loaded'] == []
@@ -0,0 +1,36 @@
+"""
+Tests for the chart render cache.
+Checks that equivalent chart queries are served from cache and that the byte budget and disk tier work.
+"""
+
+from chatbot_agent import DataSummaryChatbot
+from chart_cache import ChartCache
+
+
+def test_equivalent_queries_hit_cache(monkeypatch):
+    chatbot = DataSummaryChatbot()
+    chatbot.load_data("sample_data.csv")
+
+    first = chatbot.generate_chart("Show box plot of views")
+    assert first['success'], first['message']
+
+    def no_render(*args, **kwargs):
+        raise AssertionError("matplotlib should not be called on a cache hit")
+
+    monkeypatch.setattr(chatbot.renderer, 'render', no_render)
+    second = chatbot.generate_chart("views boxplot")
+    assert second['image_base64'] == first['image_base64']
+    assert chatbot.chart_cache.stats()['hits'] == 1
+
+
+def test_lru_byte_budget_and_disk_tier(tmp_path):
+    cache = ChartCache(max_bytes=10, disk_dir=str(tmp_path))
+    cache.put('a', b'12345')
+    cache.put('b', b'67890')
+    cache.get('a')
+    cache.put('c', b'abcde')
+
+    assert cache.stats()['entries'] == 2
+    assert set(cache._entries) == {'a', 'c'}
+    # 'b' was evicted from memory but is still on disk
+    assert cache.get('b') == b'67890'
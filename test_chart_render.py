@@ -0,0 +1,76 @@
+"""
+Tests for rendering chart specs off the request thread.
+"""
+
+import os
+import sys
+import subprocess
+import numpy as np
+import pandas as pd
+from chart_render import ChartRenderer, ChartSpec, render
+from chatbot_agent import DataSummaryChatbot
+from chart_cache import ChartCache
+
+
+def _spec():
+    counts = pd.Series([5, 3, 1], index=pd.Index(['a', 'b', 'c'], name='channel'), name='count')
+    return ChartSpec('bar', 'Bar Chart: channel', {'counts': counts}, figsize=(4, 3), dpi=50)
+
+
+def test_process_pool_matches_in_process_rendering():
+    renderer = ChartRenderer(max_workers=2)
+    try:
+        futures = [renderer.submit(_spec()) for _ in range(4)]
+        expected = render(_spec())
+        assert expected.startswith(b'\x89PNG')
+        assert all(f.result(timeout=60) == expected for f in futures)
+    finally:
+        renderer.shutdown()
+
+
+def test_chatbot_charts_render_through_the_pool():
+    chatbot = DataSummaryChatbot()
+    chatbot.chart_cache = ChartCache(max_bytes=0)
+    chatbot.load_data("sample_data.csv")
+    local = DataSummaryChatbot()
+    local.chart_cache = ChartCache(max_bytes=0)
+    local.renderer = ChartRenderer(processes=False)
+    local.load_data("sample_data.csv")
+
+    for query in ["box plot of views", "scatter plot of likes", "pie chart of channel_name", "heatmap"]:
+        assert chatbot.generate_chart(query) == local.generate_chart(query)
+
+
+def test_broken_pool_falls_back_to_local_rendering(monkeypatch):
+    from concurrent.futures.process import BrokenProcessPool
+    renderer = ChartRenderer(processes=False)
+
+    def broken(spec):
+        raise BrokenProcessPool('worker died')
+
+    monkeypatch.setattr(renderer, 'submit', broken)
+    assert renderer.render(_spec()) == render(_spec())
+
+
+def test_unknown_chart_type_raises():
+    try:
+        render(ChartSpec('radar', 'Radar', {'x': np.arange(3)}))
+    except ValueError as e:
+        assert 'radar' in str(e)
+    else:
+        raise AssertionError('expected ValueError')
+
+
+def test_script_without_main_guard_runs_once(tmp_path):
+    # The default renderer and shard reader use threads, so nothing re-imports the script
+    script = tmp_path / "report.py"
+    script.write_text(
+        "from chatbot_agent import DataSummaryChatbot\n"
+        "print('RUN')\n"
+        "chatbot = DataSummaryChatbot()\n"
+        "chatbot.load_data('sample_data.csv')\n"
+        "print(chatbot.generate_chart('bar chart of channel_name')['success'])\n")
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    out = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, env=env, timeout=120)
+    assert out.stdout.split() == ['RUN', 'True'], out.stderr
+    assert 'bootstrapping' not in out.stderr and 'leaked' not in out.stderr
@@ -0,0 +1,50 @@
+"""
+Tests for the compact chat history and its chart store.
+"""
+
+import io
+from PIL import Image
+
+from chat_history import ChatTurn, ChartBlobStore
+from chatbot_agent import DataSummaryChatbot
+
+
+def _png(width=1200, color=(200, 30, 30)):
+    buf = io.BytesIO()
+    Image.new('RGB', (width, width // 2), color).save(buf, format='PNG')
+    return buf.getvalue()
+
+
+def test_turn_reads_like_a_dict():
+    turn = ChatTurn('mean of views?', intent='statistical')
+    turn['assistant'] = 'Mean of views: 1.00'
+    assert turn['user'] == 'mean of views?' and turn.get('chart') is None
+    assert 'assistant' in turn and 'timings' not in turn
+    assert not hasattr(turn, '__dict__')
+
+
+def test_store_keeps_each_chart_once_and_memoizes_thumbnails(tmp_path):
+    store = ChartBlobStore(max_bytes=len(_png()) + 10, disk_dir=str(tmp_path))
+    first = store.put(_png())
+    assert store.put(_png()) == first and store.stats()['charts'] == 1
+
+    thumb = store.thumbnail(first)
+    assert Image.open(io.BytesIO(thumb)).width == 480
+    assert store.thumbnail(first) is thumb
+
+    # Over budget the older chart leaves memory but is read back from disk
+    second = store.put(_png(color=(0, 0, 200)))
+    assert store.stats()['charts'] == 1
+    assert store.get(first) == _png()
+    assert store.get(second) == _png(color=(0, 0, 200))
+
+
+def test_history_references_charts_by_hash():
+    chatbot = DataSummaryChatbot()
+    chatbot.load_data("sample_data.csv")
+    chatbot.process_user_input("bar chart of channel_name")
+    chatbot.process_user_input("bar chart of channel_name")
+    first, second = chatbot.chat_history
+    assert first['chart'] == second['chart'] and len(first['chart']) == 64
+    assert chatbot.charts.get(first['chart']).startswith(b'\x89PNG')
+    assert chatbot.charts.stats()['charts'] == 1
@@ -0,0 +1,37 @@
+"""
+Tests for the mergeable column statistics engine.
+Checks accumulators against pandas and that merged partial accumulators agree with a single pass.
+"""
+
+import numpy as np
+import pandas as pd
+from column_stats import ColumnAccumulator, build_accumulators, merge_accumulators
+
+
+def test_accumulator_matches_pandas_on_small_column():
+    series = pd.Series([3.0, 1.0, np.nan, 7.0, 2.0, 10.0])
+    acc = ColumnAccumulator.from_values(series.to_numpy())
+    clean = series.dropna()
+
+    assert acc.count == 5
+    assert np.isclose(acc.mean, clean.mean())
+    assert np.isclose(acc.std, clean.std())
+    assert np.isclose(acc.variance, clean.var())
+    assert acc.median == clean.median()
+    assert (acc.min, acc.max, acc.total) == (1.0, 10.0, 23.0)
+
+
+def test_merged_chunks_match_single_pass():
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({'a': rng.normal(1e6, 5, 50_000), 'b': rng.exponential(3, 50_000)})
+    whole = build_accumulators(df, ['a', 'b'])
+    parts = merge_accumulators(build_accumulators(df.iloc[i:i + 8_000], ['a', 'b']) for i in range(0, len(df), 8_000))
+
+    for col in ['a', 'b']:
+        assert parts[col].count == whole[col].count
+        assert np.isclose(parts[col].mean, df[col].mean())
+        assert np.isclose(parts[col].std, df[col].std())
+        # Sketched quantiles stay within a small rank error of the exact value
+        for q in [0.1, 0.5, 0.9]:
+            rank = (df[col] <= parts[col].quantile(q)).mean()
+            assert abs(rank - q) < 0.01
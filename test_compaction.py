@@ -0,0 +1,63 @@
+"""
+Tests for the optional dtype compaction stage.
+"""
+
+import numpy as np
+import pandas as pd
+from chatbot_agent import DataSummaryChatbot
+from compaction import compact_frame
+from dataset_cache import DatasetCache
+
+
+def test_compact_frame_keeps_values():
+    df = pd.DataFrame({
+        'small': np.arange(1000) % 100,
+        'halves': (np.arange(1000) % 10) / 2,
+        'precise': np.linspace(0, 1, 1000),
+        'channel': ['a', 'b', None, 'c'] * 250,
+        'title': [f'video {i}' for i in range(1000)],
+    })
+    compacted, report = compact_frame(df)
+
+    assert compacted['small'].dtype == np.int8
+    assert compacted['halves'].dtype == np.float32
+    assert compacted['precise'].dtype == np.float64
+    assert isinstance(compacted['channel'].dtype, pd.CategoricalDtype)
+    assert 'title' not in report['converted']
+    assert report['after_bytes'] < report['before_bytes']
+    pd.testing.assert_frame_equal(compacted.astype(object), df.astype(object))
+
+
+def test_compacted_load_gives_identical_answers(tmp_path):
+    bots = []
+    for compact in (False, True):
+        chatbot = DataSummaryChatbot()
+        chatbot.dataset_cache = DatasetCache(str(tmp_path))
+        chatbot.compact_memory = compact
+        chatbot.load_data("sample_data.csv")
+        bots.append(chatbot)
+    plain, compacted = bots
+
+    assert 'memory' in compacted.summary_stats and 'memory' not in plain.summary_stats
+    assert plain.summary_stats['categorical_columns'] == compacted.summary_stats['categorical_columns']
+    for query in ["bar chart of channel_name", "pie chart of category_id", "histogram of views",
+                  "average likes", "median views", "max comments"]:
+        assert plain.process_user_input(query) == compacted.process_user_input(query)
+
+
+def test_compacted_upload_round_trips_through_cache(tmp_path):
+    with open("sample_data.csv", "rb") as f:
+        data = f.read()
+
+    first = DataSummaryChatbot()
+    first.dataset_cache = DatasetCache(str(tmp_path))
+    first.compact_memory = True
+    first.load_upload(data, "sample_data.csv")
+
+    second = DataSummaryChatbot()
+    second.dataset_cache = DatasetCache(str(tmp_path))
+    second.compact_memory = True
+    result = second.load_upload(data, "sample_data.csv")
+    assert result['message'].startswith("Data loaded from cache")
+    assert isinstance(second.df['channel_name'].dtype, pd.CategoricalDtype)
+    assert second.summary_stats['memory'] == first.summary_stats['memory']
@@ -0,0 +1,50 @@
+"""
+Tests for the chunked correlation matrix and the pairs picked from it.
+"""
+
+import numpy as np
+import pandas as pd
+
+from correlation import correlation_accumulator, frame_chunks, relevant_columns, top_pairs
+from chatbot_agent import DataSummaryChatbot
+
+
+def _frame(rows=2000, columns=8):
+    rng = np.random.default_rng(0)
+    base = rng.normal(size=(rows, 1))
+    return pd.DataFrame(rng.normal(size=(rows, columns)) + base * np.linspace(0, 2, columns),
+                        columns=[f'c{i}' for i in range(columns)])
+
+
+def test_chunked_matrix_matches_pandas():
+    df = _frame()
+    df.iloc[::5, 2] = np.nan
+    acc = correlation_accumulator(frame_chunks(df, list(df.columns), 300), list(df.columns))
+    np.testing.assert_allclose(acc.matrix().to_numpy(), df.corr().to_numpy(), atol=1e-12)
+
+    acc32 = correlation_accumulator(frame_chunks(df, list(df.columns), 300), list(df.columns), np.float32)
+    np.testing.assert_allclose(acc32.matrix().to_numpy(), df.corr().to_numpy(), atol=1e-5)
+
+
+def test_top_pairs_and_relevant_columns():
+    corr = _frame().corr()
+    a, b, r = top_pairs(corr, 1)[0]
+    assert (a, b) == ('c6', 'c7') and r > 0.7
+    assert top_pairs(corr, 1, 'c0')[0][0] == 'c0'
+    assert relevant_columns(corr, 3) == ['c5', 'c6', 'c7']
+    assert relevant_columns(corr, 20) == list(corr.columns)
+
+
+def test_wide_tables_compute_correlation_on_first_use(tmp_path):
+    path = tmp_path / "wide.csv"
+    _frame().to_csv(path, index=False)
+    chatbot = DataSummaryChatbot()
+    chatbot.correlation_settings['eager_columns'] = 4
+    chatbot.chart_settings['heatmap_columns'] = 5
+    chatbot.load_data(str(path))
+    assert 'correlation' not in chatbot.summary_stats
+
+    assert chatbot._chart_spec('scatter', None).title == 'Scatter: c6 vs c7'
+    spec = chatbot._chart_spec('heatmap', None)
+    assert list(spec.data['corr'].columns) == ['c3', 'c4', 'c5', 'c6', 'c7']
+    assert '5 most correlated of 8 columns' in spec.title
@@ -0,0 +1,95 @@
+"""
+Tests for the parsed-dataset cache keyed by upload hash.
+"""
+
+import pandas as pd
+import dataset_cache
+from chatbot_agent import DataSummaryChatbot
+from dataset_cache import DatasetCache
+from dataset_store import DatasetStore
+
+
+def _chatbot(root):
+    chatbot = DataSummaryChatbot()
+    chatbot.dataset_cache = DatasetCache(str(root))
+    chatbot.datasets = DatasetStore()
+    return chatbot
+
+
+def test_reupload_skips_parsing(tmp_path, monkeypatch):
+    with open("sample_data.csv", "rb") as f:
+        data = f.read()
+
+    first = _chatbot(tmp_path)
+    result = first.load_upload(data, "sample_data.csv")
+    assert result['success'] and result['source_file']
+    # load_upload's lookup is the only one; the parse stage does not count a second miss
+    assert first.dataset_cache.stats() == {'hits': 0, 'misses': 1}
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError("a cache hit should not parse the file")
+
+    monkeypatch.setattr(pd, 'read_csv', no_parse)
+    second = _chatbot(tmp_path)
+    result = second.load_upload(data, "sample_data.csv")
+    assert result['success'] and result['source_file'] is None
+    assert second.dataset_cache.stats()['hits'] == 1
+    assert second.summary_stats['shape'] == first.summary_stats['shape']
+    assert second.fingerprint == first.fingerprint
+    assert second.get_statistical_answer("median of likes") == first.get_statistical_answer("median of likes")
+
+
+def test_pickle_fallback_and_eviction(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_cache, 'pa', None)
+    cache = DatasetCache(str(tmp_path))
+    df = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']})
+    cache.put('old', df, {'summary_stats': {}})
+    restored, stats = cache.get('old')
+    pd.testing.assert_frame_equal(restored, df)
+
+    # Room for one entry only: the least recently used one goes
+    cache.max_bytes = sum(p.stat().st_size for p in tmp_path.iterdir())
+    cache.put('new', df, {'summary_stats': {}})
+    assert cache.get('old') is None
+    assert cache.get('new') is not None
+
+
+def test_entries_evicted_by_another_session_are_misses(tmp_path, monkeypatch):
+    cache = DatasetCache(str(tmp_path))
+    df = pd.DataFrame({'a': [1, 2, 3]})
+    cache.put('one', df, {'summary_stats': {}})
+
+    def evicted(path, *args, **kwargs):
+        raise FileNotFoundError(path)
+
+    with monkeypatch.context() as m:
+        m.setattr(dataset_cache.os, 'utime', evicted)
+        assert cache.get('one') is None
+    assert cache.stats() == {'hits': 0, 'misses': 1}
+
+    # A file listed for eviction but already removed is skipped
+    listdir = dataset_cache.os.listdir
+    cache.max_bytes = 0
+    with monkeypatch.context() as m:
+        m.setattr(dataset_cache.os, 'listdir', lambda root: listdir(root) + ['gone.arrow'])
+        cache.put('two', df, {'summary_stats': {}})
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_corrupt_entry_falls_back_to_parsing(tmp_path):
+    with open("sample_data.csv", "rb") as f:
+        data = f.read()
+    first = _chatbot(tmp_path)
+    assert first.load_upload(data, "sample_data.csv")['success']
+
+    key = DatasetCache.key_for(data)
+    with open(tmp_path / f"{key}.arrow", "wb") as f:
+        f.write(b"not an arrow file")
+
+    second = _chatbot(tmp_path)
+    result = second.load_upload(data, "sample_data.csv")
+    assert result['success'] and result['source_file']
+    assert second.dataset_cache.stats() == {'hits': 0, 'misses': 1}
+    assert second.summary_stats['shape'] == first.summary_stats['shape']
+    # The parse rewrote a readable entry
+    assert second.dataset_cache.get(key) is not None
@@ -0,0 +1,54 @@
+"""
+Tests for the process-wide shared dataset registry.
+"""
+
+import gc
+import numpy as np
+from chatbot_agent import DataSummaryChatbot
+from dataset_store import DatasetStore
+
+
+def _chatbot(store):
+    chatbot = DataSummaryChatbot()
+    chatbot.dataset_cache = None
+    chatbot.datasets = store
+    return chatbot
+
+
+def test_sessions_share_one_frame():
+    store = DatasetStore()
+    first = _chatbot(store)
+    second = _chatbot(store)
+    first.load_data("sample_data.csv")
+    second.load_data("sample_data.csv")
+
+    assert store.stats()['datasets'] == 1 and store.stats()['leases'] == 2
+    assert np.shares_memory(first.df['views'].to_numpy(), second.df['views'].to_numpy())
+    assert second.summary_stats['numeric_stats'] == first.summary_stats['numeric_stats']
+    assert second.process_user_input("average views") == first.process_user_input("average views")
+
+
+def test_writes_stay_private_to_a_session():
+    store = DatasetStore()
+    first = _chatbot(store)
+    second = _chatbot(store)
+    first.load_data("sample_data.csv")
+    second.load_data("sample_data.csv")
+
+    first.df.loc[0, 'views'] = -1
+    assert second.df.loc[0, 'views'] != -1
+
+
+def test_entry_evicted_after_last_release():
+    store = DatasetStore()
+    first = _chatbot(store)
+    second = _chatbot(store)
+    first.load_data("sample_data.csv")
+    second.load_data("sample_data.csv")
+
+    first.reset()
+    assert store.stats()['leases'] == 1
+    # A session that is dropped without reset releases its lease when collected
+    del second
+    gc.collect()
+    assert store.stats() == {'datasets': 0, 'leases': 0, 'bytes': 0}
@@ -0,0 +1,61 @@
+"""
+Tests for background, staged EDA.
+"""
+
+import threading
+import pandas as pd
+
+import ingest
+from chatbot_agent import DataSummaryChatbot
+
+
+def test_background_load_matches_synchronous_load():
+    eager = DataSummaryChatbot()
+    eager.load_data("sample_data.csv")
+
+    chatbot = DataSummaryChatbot()
+    result = chatbot.load_data("sample_data.csv", background=True)
+    assert result['success']
+
+    # Chat turns wait for EDA instead of failing while stages are pending
+    reply = chatbot.process_user_input("What is the average of views?")
+    assert reply['message'] == 'Mean of views: 115400.00'
+
+    progress = chatbot.eda_progress()
+    assert progress['done'] and progress['error'] is None
+    assert progress['ready'] == ['parse', 'schema', 'nulls', 'numeric', 'correlation', 'groups', 'share']
+    assert chatbot.summary_stats['shape'] == eager.summary_stats['shape']
+    assert chatbot.summary_stats['null_counts'] == eager.summary_stats['null_counts']
+    assert chatbot.summary_stats['numeric_stats'] == eager.summary_stats['numeric_stats']
+
+
+def test_background_load_reports_errors():
+    chatbot = DataSummaryChatbot()
+    chatbot.load_data("missing_file.csv", background=True)
+    chatbot.wait_for_eda(timeout=10)
+    assert chatbot.eda_progress()['error']
+
+
+def test_newer_load_supersedes_a_running_background_load(tmp_path, monkeypatch):
+    small = tmp_path / "small.csv"
+    pd.read_csv("sample_data.csv").head(5).to_csv(small, index=False)
+
+    release = threading.Event()
+    read_frame = ingest.read_frame
+
+    def slow_read(source, ext, sheet=None):
+        if source == "sample_data.csv":
+            release.wait(10)
+        return read_frame(source, ext, sheet)
+
+    monkeypatch.setattr(ingest, 'read_frame', slow_read)
+    chatbot = DataSummaryChatbot()
+    chatbot.dataset_cache = None
+    chatbot.load_data("sample_data.csv", background=True)
+    old_job = chatbot.eda_job
+    assert chatbot.load_data(str(small))['success']
+
+    release.set()
+    old_job.wait(10)
+    assert old_job.cancelled and old_job.ready == []
+    assert chatbot.summary_stats['shape'] == (5, 10) and chatbot.df.shape == (5, 10)
@@ -0,0 +1,133 @@
+"""
+Tests for grouped and filtered statistics.
+"""
+
+import numpy as np
+import pandas as pd
+
+from group_index import CategoryIndex, SortedIndex, grouped_reduce
+from query_parser import QueryParser
+from chatbot_agent import DataSummaryChatbot
+
+
+def _frame(rows=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'group': rng.choice(['a', 'b', 'c', 'd'], rows).astype(object),
+        'value': rng.normal(100, 20, rows).round(1),
+    })
+    df.loc[rng.random(rows) < 0.05, 'group'] = None
+    df.loc[rng.random(rows) < 0.05, 'value'] = np.nan
+    return df
+
+
+def test_grouped_reduce_matches_pandas_groupby():
+    df = _frame()
+    index = CategoryIndex.of(df['group'])
+    values = df['value'].to_numpy(dtype=float)
+    grouped = df.groupby('group')['value']
+    expected = {'count': grouped.count(), 'sum': grouped.sum(), 'mean': grouped.mean(), 'median': grouped.median(),
+                'min': grouped.min(), 'max': grouped.max(), 'std': grouped.std(), 'variance': grouped.var()}
+
+    for op, series in expected.items():
+        result, _ = grouped_reduce(index.codes, len(index), values, op)
+        actual = pd.Series(result, index=index.labels).loc[series.index]
+        np.testing.assert_allclose(actual.to_numpy(), series.to_numpy(), rtol=1e-9, err_msg=op)
+
+    for q in [0.0, 0.1, 0.9, 1.0]:
+        result, _ = grouped_reduce(index.codes, len(index), values, 'percentile', q)
+        series = grouped.quantile(q)
+        np.testing.assert_allclose(pd.Series(result, index=index.labels).loc[series.index].to_numpy(),
+                                   series.to_numpy(), rtol=1e-9, err_msg=q)
+
+
+def test_indexes_select_the_same_rows_as_masks():
+    df = _frame()
+    index = CategoryIndex.of(df['group'])
+    assert list(index.rows('=', 'B')) == list(np.flatnonzero(df['group'] == 'b'))
+    assert list(index.rows('!=', 'b')) == list(np.flatnonzero(df['group'].notna() & (df['group'] != 'b')))
+
+    values = df['value'].to_numpy(dtype=float)
+    sorted_index = SortedIndex(values)
+    for op, mask in [('>', values > 100), ('>=', values >= 100), ('<', values < 100),
+                     ('<=', values <= 100), ('=', values == 100.0), ('!=', ~np.isnan(values) & (values != 100.0))]:
+        assert list(sorted_index.rows(op, 100.0)) == list(np.flatnonzero(mask)), op
+
+
+def test_parser_finds_group_by_and_filters():
+    parser = QueryParser({'bar': ['bar']}, ['average', 'max'], ['views', 'likes', 'channel_name', 'category_id'])
+    parsed = parser.parse("average views per channel_name")
+    assert parsed.group_by == 'channel_name' and parsed.filters == []
+
+    parsed = parser.parse('max likes where category_id = 10 and channel_name is "Sony Music"')
+    assert parsed.group_by is None
+    assert parsed.filters == [('category_id', '=', '10'), ('channel_name', '=', 'Sony Music')]
+
+    # "is" only reads as an operator after a filter word
+    assert parser.parse("Which channel_name is most viewed?").filters == []
+
+
+def test_chatbot_answers_grouped_and_filtered_questions():
+    chatbot = DataSummaryChatbot()
+    chatbot.ollama_available = False
+    chatbot.load_data("sample_data.csv")
+    df = chatbot.df
+
+    reply = chatbot.process_user_input("average views per channel_name")['message']
+    lines = reply.split('\n')
+    expected = df.groupby('channel_name')['views'].mean().sort_values(ascending=False)
+    assert lines[0] == 'Mean of views by channel_name:'
+    assert lines[1:] == [f'- {name}: {value:.2f}' for name, value in expected.items()]
+
+    reply = chatbot.process_user_input("max likes where category_id = Education and views > 80000")['message']
+    subset = df[(df['category_id'] == 'Education') & (df['views'] > 80000)]
+    assert reply == (f"Maximum of likes where category_id = Education and views > 80000: "
+                     f"{subset['likes'].max():.2f} ({len(subset)} rows)")
+
+    assert chatbot.process_user_input("max likes where category_id = Nothing")['message'] == \
+        'No rows match category_id = Nothing.'
+    assert chatbot.process_user_input("What is the average of views?")['message'] == 'Mean of views: 115400.00'
+
+
+def test_percentiles_rankings_and_single_rows():
+    chatbot = DataSummaryChatbot()
+    chatbot.ollama_available = False
+    chatbot.load_data("sample_data.csv")
+    df = chatbot.df
+
+    lines = chatbot.process_user_input("90th percentile of views per channel_name")['message'].split('\n')
+    expected = df.groupby('channel_name')['views'].quantile(0.9).sort_values(ascending=False)
+    assert lines[0] == '90th percentile of views by channel_name:'
+    assert lines[1:] == [f'- {name}: {value:.2f}' for name, value in expected.items()]
+
+    assert chatbot.process_user_input("highest views by title")['message'].startswith('Maximum of views by title:')
+    assert chatbot.process_user_input("lowest likes per channel_name")['message'].startswith('Minimum of likes by channel_name:')
+    assert chatbot.process_user_input("top views by title")['message'].startswith('Which statistic of views')
+
+    top = df.loc[df['views'].idxmax()]
+    reply = chatbot.process_user_input(f"max likes where views >= {top['views']}")['message']
+    assert reply == f"Maximum of likes where views >= {top['views']}: {top['likes']:.2f} (1 row)"
+
+
+def test_grouping_by_the_aggregated_column_is_ignored():
+    chatbot = DataSummaryChatbot()
+    chatbot.ollama_available = False
+    chatbot.load_data("sample_data.csv")
+    df = chatbot.df
+    reply = chatbot.process_user_input("top channels by views")['message']
+    assert reply.startswith('Stats for views:') and f"Max: {df['views'].max():.2f}" in reply
+    assert chatbot.process_user_input("max views by views")['message'] == f"Maximum of views: {df['views'].max():.2f}"
+
+
+def test_filter_values_with_thousands_separators():
+    parser = QueryParser({'bar': ['bar']}, ['mean'], ['views', 'likes'])
+    assert parser.parse("mean likes where views > 100,000").filters == [('views', '>', '100000')]
+    assert parser.parse("mean likes where views > 1,250.5, likes < 9,000").filters == [
+        ('views', '>', '1250.5'), ('likes', '<', '9000')]
+
+    chatbot = DataSummaryChatbot()
+    chatbot.ollama_available = False
+    chatbot.load_data("sample_data.csv")
+    subset = chatbot.df[chatbot.df['views'] > 100000]
+    assert chatbot.process_user_input("mean likes where views > 100,000")['message'] == (
+        f"Mean of likes where views > 100000: {subset['likes'].mean():.2f} ({len(subset)} rows)")
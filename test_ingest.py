@@ -0,0 +1,97 @@
+"""
+Tests for loading folders, patterns and zip archives as one dataset.
+"""
+
+import os
+import zipfile
+import numpy as np
+import pandas as pd
+
+import ingest
+from column_stats import build_accumulators
+from dataset_cache import DatasetCache
+from dataset_store import DatasetStore
+from chatbot_agent import DataSummaryChatbot
+
+
+def _shards(tmp_path):
+    df = pd.read_csv("sample_data.csv")
+    folder = tmp_path / "exports"
+    folder.mkdir()
+    df.iloc[:8].to_csv(folder / "2024-01.csv", index=False)
+    df.iloc[8:15].to_json(folder / "2024-02.jsonl", orient='records', lines=True)
+    # A later export renames a column's case and adds one
+    df.iloc[15:].rename(columns={'views': 'Views'}).assign(region='EU').to_csv(folder / "2024-03.csv", index=False)
+    (folder / "notes.txt").write_text("not data")
+    return df, folder
+
+
+def test_folder_loads_as_one_dataset(tmp_path):
+    df, folder = _shards(tmp_path)
+    chatbot = DataSummaryChatbot()
+    result = chatbot.load_data(str(folder))
+    assert result['success'] and 'from 3 sources' in result['message']
+
+    assert chatbot.summary_stats['shape'] == (len(df), len(df.columns) + 1)
+    assert chatbot.summary_stats['null_counts']['region'] == 15
+    assert chatbot.summary_stats['sources'] == ['2024-01.csv', '2024-02.jsonl', '2024-03.csv']
+    # Merged from the shards' accumulators, matching the whole file
+    for col in ['views', 'likes']:
+        stats = chatbot.summary_stats['numeric_stats'][col]
+        assert np.isclose(stats['mean'], df[col].mean()) and np.isclose(stats['std'], df[col].std())
+        assert stats['min'] == df[col].min() and stats['50%'] == df[col].median()
+
+
+def test_pattern_and_zip_select_shards(tmp_path):
+    df, folder = _shards(tmp_path)
+    assert [s.name for s in ingest.expand(str(folder / "*.csv"))] == ['2024-01.csv', '2024-03.csv']
+
+    archive = tmp_path / "exports.zip"
+    with zipfile.ZipFile(archive, 'w') as z:
+        for name in ['2024-01.csv', '2024-02.jsonl']:
+            z.write(folder / name, f"exports/{name}")
+    chatbot = DataSummaryChatbot()
+    assert chatbot.load_data(str(archive))['success']
+    assert chatbot.summary_stats['shape'][0] == 15
+    assert chatbot.get_statistical_answer("sum of likes") == f"Sum of likes: {df['likes'].iloc[:15].sum():.2f}"
+
+
+def test_text_shard_of_a_numeric_column_is_converted():
+    numbers = pd.DataFrame({'n': [1, 2]})
+    text = pd.DataFrame({'n': pd.Series(['3', None], dtype=object)})
+    parts = [(frame, {'rows': len(frame), 'null_counts': frame.isnull().sum().to_dict(),
+                      'numeric': build_accumulators(frame, frame.select_dtypes('number').columns)})
+             for frame in (numbers, text)]
+    df, stats = ingest.combine(parts)
+    assert df['n'].dtype == float and stats['numeric']['n'].total == 6 and stats['null_counts']['n'] == 1
+
+
+def test_arrow_csv_reader_matches_the_c_parser(tmp_path):
+    path = tmp_path / "gaps.csv"
+    path.write_text("name,empty,views,published\na,,10,2024-01-02\nb,,,2024-01-03\n")
+    arrow, c_parser = ingest.read_frame(str(path), 'csv'), pd.read_csv(path)
+    assert arrow.dtypes.to_dict() == c_parser.dtypes.to_dict()
+    pd.testing.assert_frame_equal(arrow, c_parser)
+
+
+def test_reuploaded_archive_hits_the_cache(tmp_path):
+    df, folder = _shards(tmp_path)
+    archive = tmp_path / "exports.zip"
+    with zipfile.ZipFile(archive, 'w') as z:
+        for name in ['2024-01.csv', '2024-02.jsonl']:
+            z.write(folder / name, name)
+    data = archive.read_bytes()
+
+    cache = DatasetCache(str(tmp_path / "cache"))
+    first = DataSummaryChatbot()
+    first.dataset_cache, first.datasets = cache, DatasetStore()
+    result = first.load_upload(data, "exports.zip")
+    assert result['success']
+    os.unlink(result['source_file'])
+    second = DataSummaryChatbot()
+    second.dataset_cache, second.datasets = cache, DatasetStore()
+    result = second.load_upload(data, "exports.zip")
+    assert result['success'] and result['source_file'] is None
+    assert second.fingerprint == first.fingerprint == DatasetCache.key_for(data)
+    assert cache.stats()['hits'] == 1
+    assert len({p.name.split('.')[0] for p in (tmp_path / "cache").iterdir()}) == 1
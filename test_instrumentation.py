@@ -0,0 +1,52 @@
+"""
+Tests for per-stage chat turn instrumentation.
+"""
+
+import json
+import time
+import requests
+from chatbot_agent import DataSummaryChatbot
+from instrumentation import StageMetrics, TurnTrace, serve_metrics
+
+
+def test_nested_stages_are_charged_exclusively():
+    trace = TurnTrace()
+    with trace.stage('render'):
+        time.sleep(0.02)
+        with trace.stage('compute'):
+            time.sleep(0.05)
+    stages = trace.summary()['stages']
+    assert stages['compute']['seconds'] >= 0.05
+    assert 0.02 <= stages['render']['seconds'] < stages['compute']['seconds']
+
+
+def test_turns_record_timings(tmp_path):
+    chatbot = DataSummaryChatbot()
+    chatbot.metrics = StageMetrics(json_log=str(tmp_path / 'turns.jsonl'))
+    chatbot.load_data("sample_data.csv")
+
+    chatbot.process_user_input("bar chart of channel_name")
+    chart = chatbot.chat_history[-1]['timings']
+    assert {'parse', 'extract_column', 'compute', 'render', 'encode'} <= set(chart['stages'])
+    assert sum(s['seconds'] for s in chart['stages'].values()) <= chart['total_seconds']
+
+    chatbot.process_user_input("What is the average of views?")
+    assert 'compute' in chatbot.chat_history[-1]['timings']['stages']
+
+    summary = chatbot.metrics.summary()
+    assert summary['total']['count'] == 2 and summary['render']['count'] == 1
+    lines = (tmp_path / 'turns.jsonl').read_text().splitlines()
+    assert [json.loads(line)['intent'] for line in lines] == ['chart', 'statistical']
+
+
+def test_prometheus_endpoint():
+    metrics = StageMetrics()
+    metrics.observe({'total_seconds': 0.2, 'stages': {'llm': {'seconds': 0.003, 'memory_bytes': 0}}})
+    server = serve_metrics(0, metrics)
+    assert serve_metrics(0, metrics) is server
+
+    text = requests.get(f'http://127.0.0.1:{server.server_address[1]}/metrics', timeout=5).text
+    assert 'insightbot_stage_seconds_bucket{stage="llm",le="0.001"} 0' in text
+    assert 'insightbot_stage_seconds_bucket{stage="llm",le="0.005"} 1' in text
+    assert 'insightbot_stage_seconds_count{stage="total"} 1' in text
+    server.shutdown()
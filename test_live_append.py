@@ -0,0 +1,136 @@
+"""
+Tests for following a growing data file and merging its new rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+from column_stats import CorrelationAccumulator
+from live_append import AppendReader, FileWatcher, append_frame
+from chatbot_agent import DataSummaryChatbot
+
+
+def _lines():
+    with open("sample_data.csv") as f:
+        return f.readlines()
+
+
+def test_reader_returns_only_complete_new_lines(tmp_path):
+    lines = _lines()
+    path = tmp_path / "data.csv"
+    path.write_text(''.join(lines[:5]))
+    reader = AppendReader(str(path), path.stat().st_size)
+    assert reader.read_new() is None
+
+    with open(path, 'a') as f:
+        f.write(lines[5] + lines[6][:8])
+    rows = reader.read_new()
+    assert list(rows['video_id']) == ['vid005']
+
+    with open(path, 'a') as f:
+        f.write(lines[6][8:])
+    assert list(reader.read_new()['video_id']) == ['vid006']
+
+
+def test_watching_a_folder_appends_new_files(tmp_path):
+    lines = _lines()
+    (tmp_path / "old.csv").write_text(''.join(lines[:3]))
+    watcher = FileWatcher(str(tmp_path), interval=60)
+    (tmp_path / "new.csv").write_text(lines[0] + ''.join(lines[10:12]))
+    assert watcher.poll() == 2
+    assert list(pd.concat(watcher.drain())['video_id']) == ['vid010', 'vid011']
+    watcher.stop()
+
+
+def test_append_frame_keeps_dtypes():
+    df = pd.DataFrame({'n': np.array([1, 2], dtype=np.int16), 'c': pd.Categorical(['a', 'b'])})
+    out = append_frame(df, pd.DataFrame({'n': [3], 'c': ['z']}))
+    assert out['n'].dtype == np.int16
+    assert isinstance(out['c'].dtype, pd.CategoricalDtype) and list(out['c']) == ['a', 'b', 'z']
+
+
+def test_correlation_accumulator_matches_pandas():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(1e6, 5, (3000, 3)), columns=['a', 'b', 'c'])
+    df['b'] += df['a']
+    df = df.mask(rng.random(df.shape) < 0.1)
+    acc = CorrelationAccumulator(list(df.columns))
+    for start in range(0, len(df), 700):
+        acc.update(df.iloc[start:start + 700].to_numpy())
+    np.testing.assert_allclose(acc.matrix().to_numpy(), df.corr().to_numpy(), atol=1e-9)
+
+
+def test_appended_rows_match_a_full_reload(tmp_path):
+    lines = _lines()
+    path = tmp_path / "live.csv"
+    path.write_text(''.join(lines[:8]))
+
+    chatbot = DataSummaryChatbot()
+    chatbot.ollama_available = False
+    assert chatbot.watch(str(path), interval=60)['success']
+    before = chatbot.fingerprint
+    with open(path, 'a') as f:
+        f.writelines(lines[8:])
+    chatbot.watcher.poll()
+    assert chatbot.refresh() == len(lines) - 8
+    assert chatbot.fingerprint != before
+
+    full = DataSummaryChatbot()
+    full.ollama_available = False
+    full.load_data(str(path))
+    pd.testing.assert_frame_equal(chatbot.df, full.df)
+    for key in ['shape', 'null_counts', 'numeric_columns', 'categorical_columns']:
+        assert chatbot.summary_stats[key] == full.summary_stats[key]
+    for col, stats in full.summary_stats['numeric_stats'].items():
+        assert chatbot.summary_stats['numeric_stats'][col] == stats
+    np.testing.assert_allclose(chatbot.summary_stats['correlation'].to_numpy(),
+                               full.summary_stats['correlation'].to_numpy(), atol=1e-9)
+    for query in ["What is the average of views?", "max likes per channel_name"]:
+        assert chatbot.process_user_input(query)['message'] == full.process_user_input(query)['message']
+    chatbot.stop_watching()
+
+
+def test_follow_starts_after_the_last_complete_row(tmp_path):
+    lines = _lines()
+    path = tmp_path / "live.csv"
+    path.write_text(''.join(lines[:8]) + lines[8][:10])
+
+    chatbot = DataSummaryChatbot()
+    chatbot.ollama_available = False
+    assert chatbot.watch(str(path), interval=60)['success']
+    assert chatbot.summary_stats['shape'][0] == 7
+
+    with open(path, 'a') as f:
+        f.write(lines[8][10:] + ''.join(lines[9:]))
+    chatbot.watcher.poll()
+    chatbot.refresh(force=True)
+    full = DataSummaryChatbot()
+    full.load_data(str(path))
+    pd.testing.assert_frame_equal(chatbot.df, full.df)
+    chatbot.stop_watching()
+
+
+def test_small_appends_are_batched_until_a_chat_turn(tmp_path):
+    lines = _lines()
+    path = tmp_path / "live.csv"
+    path.write_text(''.join(lines[:8]))
+
+    chatbot = DataSummaryChatbot()
+    chatbot.ollama_available = False
+    chatbot.live_settings = {'batch_fraction': 1.0, 'max_delay': 60.0}
+    assert chatbot.watch(str(path), interval=60)['success']
+    for line in lines[8:10]:
+        with open(path, 'a') as f:
+            f.write(line)
+        chatbot.watcher.poll()
+        assert chatbot.refresh() == 0
+    assert chatbot.summary_stats['shape'][0] == 7
+
+    assert chatbot.process_user_input("How many rows?") is not None
+    assert chatbot.summary_stats['shape'][0] == 9
+    chatbot.live_settings['max_delay'] = 0.0
+    with open(path, 'a') as f:
+        f.write(lines[10])
+    chatbot.watcher.poll()
+    assert chatbot.refresh() == 1
+    chatbot.stop_watching()
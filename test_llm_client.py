@@ -0,0 +1,214 @@
+"""
+Tests for the pooled, streaming Ollama client.
+Runs against a local stub HTTP server that mimics /api/tags and /api/generate.
+"""
+
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from chatbot_agent import DataSummaryChatbot
+from llm_client import OllamaClient, AsyncOllamaClient, OllamaStatus
+from response_cache import ResponseCache
+from prompt_context import estimate_tokens
+
+TOKENS = ['The ', 'data ', 'looks ', 'fine.']
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    delay = 0.0
+    probe_delay = 0.0
+    context = None
+    payloads = []
+    failures = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(self.probe_delay)
+        body = json.dumps({'models': [{'name': 'gemma:2b'}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        StubOllama.payloads.append(payload)
+        if StubOllama.failures:
+            StubOllama.failures -= 1
+            self.send_response(500)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if payload['stream']:
+            lines = [json.dumps({'response': t, 'done': False}) for t in TOKENS]
+            lines.append(json.dumps({'response': '', 'done': True}))
+        else:
+            lines = [json.dumps({'response': ''.join(TOKENS), 'done': True, 'context': self.context})]
+        body = ('\n'.join(lines) + '\n').encode()
+        time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _serve():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def test_generate_and_stream():
+    server, url = _serve()
+    try:
+        client = OllamaClient(url)
+        assert client.is_available()
+        assert client.generate('hi') == ''.join(TOKENS)
+        assert list(client.stream('hi')) == TOKENS
+    finally:
+        server.shutdown()
+
+
+def test_async_client_serves_sessions_concurrently():
+    server, url = _serve()
+    StubOllama.delay = 0.3
+    try:
+        client = AsyncOllamaClient(OllamaClient(url), max_concurrency=4)
+
+        async def session():
+            return [t async for t in client.stream('hi')]
+
+        async def run():
+            return await asyncio.gather(*[session() for _ in range(4)])
+
+        start = time.perf_counter()
+        results = asyncio.run(run())
+        assert results == [TOKENS] * 4
+        assert time.perf_counter() - start < 4 * StubOllama.delay
+        client.close()
+    finally:
+        StubOllama.delay = 0.0
+        server.shutdown()
+
+
+def test_chatbot_streams_textual_answers(tmp_path):
+    server, url = _serve()
+    try:
+        chatbot = DataSummaryChatbot()
+        chatbot.llm = OllamaClient(url)
+        chatbot.response_cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+        chatbot.ollama_available = True
+        chatbot.load_data("sample_data.csv")
+
+        reply = chatbot.process_user_input("What insights can you find in this data?", stream=True)
+        assert list(reply['stream']) == TOKENS
+        assert chatbot.chat_history[-1]['assistant'] == ''.join(TOKENS)
+
+        # The second ask is answered from the response cache in one piece
+        reply = chatbot.process_user_input("what insights can you find in this data", stream=True)
+        assert list(reply['stream']) == [''.join(TOKENS)]
+        assert chatbot.response_cache.stats()['hits'] == 1
+    finally:
+        server.shutdown()
+
+
+class SlowProbe:
+    base_url = 'http://ollama.invalid'
+
+    def __init__(self):
+        self.calls = 0
+
+    def is_available(self):
+        time.sleep(0.2)
+        self.calls += 1
+        return True
+
+
+def test_status_is_probed_in_the_background():
+    probe = SlowProbe()
+    status = OllamaStatus(probe, refresh_seconds=60)
+    start = time.perf_counter()
+    assert status.available is False and not status.checked
+    assert time.perf_counter() - start < 0.1
+
+    assert status.wait(timeout=5) is True and probe.calls == 1
+    # Still fresh, so reading it again does not probe
+    assert status.available and probe.calls == 1
+    status.refresh(force=True).wait(timeout=5)
+    assert probe.calls == 2
+
+
+def test_digest_is_sent_once_and_continued_from_context(tmp_path):
+    server, url = _serve()
+    StubOllama.context, StubOllama.payloads = [7, 8, 9], []
+    try:
+        chatbot = DataSummaryChatbot()
+        chatbot.llm = OllamaClient(url)
+        chatbot.response_cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+        chatbot.ollama_available = True
+        chatbot.load_data("sample_data.csv")
+        assert 'channel_name: text, 6 distinct, most common ChefMaster (4)' in chatbot._llm_context().digest
+
+        chatbot.get_llm_response("What insights can you find?")
+        chatbot.get_llm_response("Which channel should we grow?")
+        priming, first, second = StubOllama.payloads
+        assert 'views: int, mean 115,400' in priming['prompt'] and priming['keep_alive'] == '30m'
+        assert first == {'model': 'gemma:2b', 'prompt': 'What insights can you find?', 'stream': False,
+                         'keep_alive': '30m', 'context': [7, 8, 9]}
+        assert second['context'] == [7, 8, 9]
+    finally:
+        StubOllama.context = None
+        server.shutdown()
+
+
+def test_failed_priming_is_retried_on_the_next_question(tmp_path):
+    server, url = _serve()
+    StubOllama.context, StubOllama.payloads, StubOllama.failures = [7, 8, 9], [], 1
+    try:
+        chatbot = DataSummaryChatbot()
+        chatbot.llm = OllamaClient(url)
+        chatbot.response_cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+        chatbot.ollama_available = True
+        chatbot.load_data("sample_data.csv")
+
+        assert chatbot.get_llm_response("What insights can you find?") == ''.join(TOKENS)
+        assert 'gemma:2b' not in chatbot._llm_context().primed
+        chatbot.get_llm_response("Which channel should we grow?")
+        failed, first, priming, second = StubOllama.payloads
+        assert 'views: int' in failed['prompt'] and 'views: int' in first['prompt']
+        assert 'views: int' in priming['prompt'] and second['context'] == [7, 8, 9]
+    finally:
+        StubOllama.context, StubOllama.failures = None, 0
+        server.shutdown()
+
+
+def test_digest_fits_the_token_budget():
+    chatbot = DataSummaryChatbot()
+    chatbot.load_data("sample_data.csv")
+    full = chatbot._llm_context().digest
+    for budget in (150, 60):
+        chatbot.llm_settings['digest_tokens'] = budget
+        chatbot._prompt_context = None
+        digest = chatbot._llm_context().digest
+        assert estimate_tokens(digest) <= budget and len(digest) < len(full)
+        assert digest.startswith('Dataset: 20 rows x 10 columns.')
+
+
+def test_first_question_waits_for_the_probe(tmp_path):
+    server, url = _serve()
+    StubOllama.probe_delay = 0.5
+    try:
+        chatbot = DataSummaryChatbot()
+        chatbot.llm = OllamaClient(url)
+        chatbot.response_cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+        chatbot.load_data("sample_data.csv")
+        assert chatbot.get_llm_response("What insights can you find?") == ''.join(TOKENS)
+    finally:
+        StubOllama.probe_delay = 0.0
+        server.shutdown()
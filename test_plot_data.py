@@ -0,0 +1,26 @@
+"""
+Tests for the chart pre-aggregation helpers.
+"""
+
+import numpy as np
+import pandas as pd
+from plot_data import lttb, top_k_counts
+
+
+def test_lttb_respects_point_budget():
+    x = np.arange(100_000, dtype=float)
+    y = np.sin(x / 500) + (x == 4_321) * 50
+    sx, sy = lttb(x, y, 500)
+
+    assert len(sx) == 500
+    assert (sx[0], sx[-1]) == (x[0], x[-1])
+    # A single spike survives downsampling
+    assert sy.max() == y.max()
+
+
+def test_top_k_counts_folds_tail_into_other():
+    counts = pd.Series(list('aaaabbbccd')).astype('category').value_counts()
+    top = top_k_counts(counts, 2)
+
+    assert list(top.index) == ['a', 'b', 'Other']
+    assert top.sum() == counts.sum()
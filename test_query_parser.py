@@ -0,0 +1,40 @@
+"""
+Tests for the single-pass query parser.
+"""
+
+from query_parser import AhoCorasick, QueryParser
+from chatbot_agent import DataSummaryChatbot
+
+
+def test_automaton_reports_overlapping_matches():
+    automaton = AhoCorasick({'max': ['max'], 'max_views': ['col'], 'views': ['views'], 'view': ['view']})
+    assert automaton.search('plot max_views') == {'max', 'col', 'views', 'view'}
+
+
+def test_parser_matches_keyword_scan_semantics():
+    chatbot = DataSummaryChatbot()
+    parser = QueryParser(chatbot.chart_keywords, chatbot.stat_keywords, ['views', 'likes', 'dislikes'])
+
+    parsed = parser.parse('Show the MAXIMUM of dislikes and views')
+    assert parsed.intent == 'statistical'
+    assert parsed.stat_op == 'max'
+    assert parsed.columns == ['views', 'likes', 'dislikes']
+
+    # Substring semantics: 'mean' inside 'meaningful' still counts, as with `in` checks
+    assert parser.parse('most meaningful sum of likes').stat_op == 'mean'
+
+    parsed = parser.parse('box plot distribution of likes')
+    assert (parsed.intent, parsed.chart_type) == ('chart', 'box')
+    assert parser.parse('visualize this please').intent == 'chart'
+    assert parser.parse('what stands out here?').intent == 'textual'
+
+
+def test_parser_reads_percentiles_and_exact_requests():
+    chatbot = DataSummaryChatbot()
+    parser = QueryParser(chatbot.chart_keywords, chatbot.stat_keywords, ['views'])
+
+    parsed = parser.parse('exact 90th percentile of views')
+    assert (parsed.stat_op, parsed.quantile, parsed.exact) == ('percentile', 0.9, True)
+    assert parser.parse('0.25 quantile of views').quantile == 0.25
+    # Without a number it falls back to the general stats, as before
+    assert parser.parse('percentile of views').stat_op is None
@@ -0,0 +1,34 @@
+"""
+Tests for the in-memory PDF report builder.
+"""
+
+import os
+from chatbot_agent import DataSummaryChatbot
+from report_pdf import build_report, start_report
+
+
+def _chatbot():
+    chatbot = DataSummaryChatbot()
+    chatbot.load_data("sample_data.csv")
+    chatbot.process_user_input("bar chart of channel_name")
+    chatbot.process_user_input("What is the average of views?")
+    chatbot.chat_history.append({'user': 'trend?', 'assistant': 'Views rise → then fall'})
+    return chatbot
+
+
+def test_report_is_built_in_memory(tmp_path, monkeypatch):
+    chatbot = _chatbot()
+    monkeypatch.chdir(tmp_path)
+    pdf = build_report(chatbot.summary_stats, chatbot.chat_history, chatbot.charts)
+
+    assert pdf.startswith(b'%PDF') and pdf.rstrip().endswith(b'%%EOF')
+    assert os.listdir(tmp_path) == []
+    # The 3000px chart is embedded at the 150 dpi it occupies at 120mm
+    assert b'/Width 709' in pdf
+
+
+def test_report_runs_in_background():
+    chatbot = _chatbot()
+    job = start_report(chatbot.summary_stats, chatbot.chat_history, chatbot.charts)
+    chatbot.chat_history.clear()
+    assert job.result(timeout=30).startswith(b'%PDF')
@@ -0,0 +1,41 @@
+"""
+Tests for the SQLite-backed LLM response cache.
+"""
+
+from response_cache import ResponseCache
+
+
+def test_exact_hit_survives_restart(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    ResponseCache(path).put('gemma:2b', 'schema-1', 'What insights can you find?', 'Views vary a lot.')
+
+    cache = ResponseCache(path)
+    assert cache.get('gemma:2b', 'schema-1', '  what INSIGHTS can you find ') == 'Views vary a lot.'
+    assert cache.get('gemma:2b', 'schema-2', 'What insights can you find?') is None
+    assert cache.stats() == {'hits': 1, 'similar_hits': 0, 'misses': 1}
+
+
+def test_similarity_tier_ttl_and_lru(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), max_entries=2, similarity_threshold=0.75)
+    cache.put('m', 's', 'Which channel gets the most engagement overall?', 'ChefMaster')
+    assert cache.get('m', 's', 'which channel gets most engagement overall') == 'ChefMaster'
+    assert cache.get('m', 's', 'which category is growing fastest') is None
+    assert cache.stats()['similar_hits'] == 1
+
+    cache.put('m', 's', 'second question', 'two')
+    cache.put('m', 's', 'third question', 'three')
+    assert cache.get('m', 's', 'second question') == 'two'
+    assert cache.get('m', 's', 'Which channel gets the most engagement overall?') is None
+
+    cache.ttl = -1
+    assert cache.get('m', 's', 'third question') is None
+
+
+def test_similarity_tier_keeps_operands_apart(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), similarity_threshold=0.85)
+    cache.put('m', 's', 'is views higher than likes', 'Yes')
+    assert cache.get('m', 's', 'is likes higher than views') is None
+
+    cache.put('m', 's', 'views per channel broken down', 'by channel')
+    assert cache.get('m', 's', 'channel per views broken down') is None
+    assert cache.stats()['similar_hits'] == 0
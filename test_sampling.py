@@ -0,0 +1,57 @@
+"""
+Tests for the row sample behind approximate mode.
+"""
+
+import numpy as np
+import pandas as pd
+
+from sampling import RowSample
+from chatbot_agent import DataSummaryChatbot
+
+
+def test_chunked_sample_is_uniform():
+    counts = np.zeros(30)
+    for seed in range(2000):
+        sample = RowSample(['x'], size=6, seed=seed)
+        for start in range(0, 30, 4):
+            sample.update(pd.DataFrame({'x': np.arange(start, min(start + 4, 30))}))
+        assert len(sample) == 6 and sample.rows_seen == 30
+        counts[sample.values[:, 0].astype(int)] += 1
+    # Every row should be kept in 6 of 30 samples
+    assert np.abs(counts / 2000 - 0.2).max() < 0.04
+
+
+def test_quantile_interval_covers_the_true_value():
+    values = np.random.default_rng(0).lognormal(3, 1, 50_000)
+    truth = np.quantile(values, 0.9)
+    covered = 0
+    for seed in range(200):
+        _, low, high = RowSample.of(pd.DataFrame({'x': values}), ['x'], 2000, seed).quantile('x', 0.9)
+        covered += low <= truth <= high
+    assert 0.9 <= covered / 200 <= 0.99
+
+
+def test_small_data_is_answered_exactly():
+    sample = RowSample.of(pd.DataFrame({'x': [3.0, 1.0, np.nan, 2.0]}), ['x'], size=10)
+    assert sample.exact
+    assert sample.quantile('x', 0.5) == (2.0, 2.0, 2.0)
+
+
+def test_approximate_mode_answers_with_bounds_and_exact_on_request():
+    chatbot = DataSummaryChatbot()
+    chatbot.ollama_available = False
+    chatbot.approximate = True
+    chatbot.sample_size = 10
+    chatbot.load_data("sample_data.csv")
+    assert chatbot.summary_stats['approximate']['sample_rows'] == 10
+
+    reply = chatbot.process_user_input("median views")['message']
+    assert reply.startswith('Median of views: ') and '95% CI' in reply
+    assert chatbot.process_user_input("What is the average of views?")['message'] == 'Mean of views: 115400.00'
+    assert 'approximate' in chatbot.process_user_input("correlation heatmap")['message']
+
+    reply = chatbot.process_user_input("exact median of views")['message']
+    assert 'background' in reply
+    chatbot._exact_jobs[0]['future'].result(timeout=30)
+    assert chatbot.poll_exact() == 1
+    assert chatbot.chat_history[-1]['assistant'] == f"Median of views: {chatbot.df['views'].median():.2f} (exact)"
@@ -0,0 +1,72 @@
+"""
+Tests for the chunked streaming load mode.
+Streams sample_data.csv in tiny chunks and checks the results match an eager load.
+"""
+
+import numpy as np
+import pandas as pd
+from chatbot_agent import DataSummaryChatbot
+
+
+def _load_pair():
+    eager = DataSummaryChatbot()
+    eager.load_data("sample_data.csv")
+
+    streamed = DataSummaryChatbot()
+    streamed.chunksize = 3
+    result = streamed.load_data("sample_data.csv", streaming_mode=True)
+    assert result['success'], result['message']
+    return eager, streamed
+
+
+def test_streaming_summary_matches_eager():
+    eager, streamed = _load_pair()
+    assert streamed.df is None
+
+    expected, actual = eager.summary_stats, streamed.summary_stats
+    assert actual['shape'] == expected['shape']
+    assert actual['columns'] == expected['columns']
+    assert actual['null_counts'] == expected['null_counts']
+    assert actual['numeric_columns'] == expected['numeric_columns']
+    for col in expected['numeric_columns']:
+        for stat, value in expected['numeric_stats'][col].items():
+            assert np.isclose(actual['numeric_stats'][col][stat], value), (col, stat)
+
+
+def test_streaming_answers_match_eager(tmp_path):
+    eager, streamed = _load_pair()
+    for query in ["What is the average of views?", "median of likes", "What's the standard deviation of subscribers?"]:
+        assert streamed.get_statistical_answer(query) == eager.get_statistical_answer(query)
+
+    lines = tmp_path / "sample.jsonl"
+    eager.df.to_json(lines, orient='records', lines=True)
+    jsonl = DataSummaryChatbot()
+    jsonl.chunksize = 4
+    assert jsonl.load_data(str(lines), streaming_mode=True)['success']
+    assert jsonl.summary_stats['shape'] == eager.summary_stats['shape']
+    assert jsonl.get_statistical_answer("max of views") == eager.get_statistical_answer("max of views")
+
+
+def test_quantiles_are_exact_in_memory_and_marked_when_sketched(tmp_path):
+    values = np.random.default_rng(0).lognormal(3, 1, 5000)
+    path = tmp_path / "large.csv"
+    pd.DataFrame({'x': values, 'y': values * 2}).to_csv(path, index=False)
+
+    eager = DataSummaryChatbot()
+    eager.load_data(str(path))
+    frame = eager.df
+    assert eager.get_statistical_answer("median of x") == f"Median of x: {frame['x'].median():.2f}"
+    assert eager.get_statistical_answer("90th percentile of x") == f"90th percentile of x: {frame['x'].quantile(0.9):.2f}"
+    assert eager.summary_stats['numeric_stats']['x']['75%'] == frame['x'].quantile(0.75)
+    assert 'estimated_quantiles' not in eager.summary_stats
+
+    streamed = DataSummaryChatbot()
+    streamed.chunksize = 500
+    streamed.load_data(str(path), streaming_mode=True)
+    assert streamed.summary_stats['estimated_quantiles'] == ['x', 'y']
+    assert streamed.get_statistical_answer("median of x").startswith('Median of x: ≈')
+
+    assert 'background' in streamed.get_statistical_answer("exact median of x")
+    streamed._exact_jobs[0]['future'].result(timeout=30)
+    assert streamed.poll_exact() == 1
+    assert streamed.chat_history[-1]['assistant'] == f"Median of x: {frame['x'].median():.2f} (exact)"